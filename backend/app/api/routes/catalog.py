@@ -0,0 +1,101 @@
+"""
+Catalog browsing API endpoints (paginated JSON and NDJSON stream)
+"""
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from app.core.database import get_db
+from app.services.catalog import catalog_page, course_record, iter_catalog
+from pydantic import BaseModel
+from app.core.security import get_current_user, User
+
+
+class CatalogCourse(BaseModel):
+    program_id: str
+    code: str
+    title: str
+    credits: int
+    terms: List[str]
+    prereqs: List[str]
+    tags: List[str]
+    description: str
+
+
+class CatalogPage(BaseModel):
+    items: List[CatalogCourse]
+    next_cursor: Optional[str] = None
+
+
+router = APIRouter()
+
+
+def catalog_filters(
+    program_id: Optional[str] = Query(None, description="Only this program"),
+    university: Optional[str] = Query(None, description="Only programs at this university"),
+    tag: List[str] = Query([], description="Required tag (repeatable; all must match)"),
+    term: List[str] = Query([], description="Offered term (repeatable; any may match)"),
+    min_credits: Optional[int] = Query(None, ge=0),
+    max_credits: Optional[int] = Query(None, ge=0),
+) -> Dict[str, Any]:
+    return {
+        "program_id": program_id,
+        "university": university,
+        "tags": tag,
+        "terms": term,
+        "min_credits": min_credits,
+        "max_credits": max_credits,
+    }
+
+
+@router.get("/catalog", response_model=CatalogPage)
+async def browse_catalog(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    filters: Dict[str, Any] = Depends(catalog_filters),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Browse courses across programs in (program_id, code) order
+
+    Args:
+        cursor: Opaque position returned as next_cursor; omit for the first page
+        limit: Page size
+        filters: program_id, university, tag, term, min_credits, max_credits
+
+    Returns:
+        A page of courses and the cursor for the next page (null on the last page)
+    """
+    try:
+        courses, next_cursor = catalog_page(db, limit, cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CatalogPage(
+        items=[CatalogCourse(**course_record(c)) for c in courses],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/catalog/stream")
+async def stream_catalog(
+    filters: Dict[str, Any] = Depends(catalog_filters),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Every matching course as newline-delimited JSON, for bulk export
+
+    Rows are read page by page with the same keyset order as /catalog,
+    so memory stays flat regardless of catalog size.
+    """
+    def lines():
+        try:
+            for course in iter_catalog(db, **filters):
+                yield json.dumps(course_record(course)) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,45 @@
+"""
+Course autocomplete API endpoint
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import List
+from app.core.database import get_db
+from app.services.autocomplete import autocomplete_indexes
+from pydantic import BaseModel
+from app.core.security import get_current_user, User
+
+
+class CourseSuggestion(BaseModel):
+    code: str
+    title: str
+
+
+router = APIRouter()
+
+
+@router.get("/courses/autocomplete", response_model=List[CourseSuggestion])
+async def autocomplete_courses(
+    program_id: str = Query(..., description="Program ID to complete within"),
+    q: str = Query(..., description="Prefix of a course code or title words"),
+    limit: int = Query(8, ge=1, le=20, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Type-ahead suggestions for course codes and titles
+
+    Served from an in-memory prefix index; the database is only read
+    when a program's index is (re)built, in the threadpool.
+
+    Args:
+        program_id: Program to complete within
+        q: Typed prefix, e.g. "bioe 3" or "biomech"
+        limit: Maximum suggestions to return
+
+    Returns:
+        Matching courses, code-prefix matches first
+    """
+    index = await run_in_threadpool(autocomplete_indexes.get, db, program_id)
+    return index.complete(q, limit)
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app.core.database import get_db
+from app.core.metrics import metrics_registry
 
 router = APIRouter()
 
@@ -147,4 +148,5 @@ async def metrics(db: Session = Depends(get_db)) -> Dict[str, Any]:
             },
         },
         "database": db_stats,
+        "application": metrics_registry.collect(),
     }
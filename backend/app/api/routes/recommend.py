@@ -1,27 +1,97 @@
 """
-Course recommendation API endpoint
+Course recommendation API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import time
+from typing import Any, Callable, Dict
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.schemas.recommend import RecommendRequest, RecommendResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import get_db, get_session_factory
+from app.schemas.recommend import CourseRecommendation, RecommendRequest, RecommendResponse
 from app.services.rag import RAGService
 from app.services.ai import AIService
+from app.services.providers import Providers, get_providers
+from app.services.response_cache import response_cache
+from app.services.single_flight import recommendation_flights
+from app.services.streaming import stream_metrics
 from app.models import Program
 from app.core.security import get_current_user, User
 
 router = APIRouter()
 
 
+async def generation_inputs(
+    request: RecommendRequest,
+    db: Session,
+    providers: Providers,
+) -> Dict[str, Any]:
+    """
+    Validate the program and retrieve context; returns the keyword
+    arguments for AIService generation
+
+    Every blocking step (database reads, index scoring) runs in the
+    threadpool and provider calls are awaited, so a slow model response
+    does not stall other requests on this worker.
+    """
+    # Validate program exists; plain columns, not the instance: retrieval may
+    # commit the session, and an expired attribute would then lazy-load on the loop
+    program = await run_in_threadpool(
+        lambda: db.query(Program.degree, Program.major).filter(
+            Program.program_id == request.program_id
+        ).first()
+    )
+
+    if not program:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Program {request.program_id} not found"
+        )
+
+    rag_service = RAGService(db, providers)
+
+    # Retrieve relevant context using RAG
+    retrieved = await rag_service.retrieve_context_async(
+        program_id=request.program_id,
+        completed_courses=request.completed,
+        query=f"next semester courses after completing {', '.join(request.completed)}" if request.completed else None
+    )
+
+    return {
+        "university": request.university,
+        "program_id": request.program_id,
+        "degree": program.degree,
+        "major": program.major,
+        "completed": request.completed,
+        "credits_target": request.credits_target,
+        "track": request.track,
+        "preferences": request.preferences,
+        # Format context for prompt
+        "context_snippets": rag_service.format_context_snippets(retrieved),
+    }
+
+
 @router.post("/recommend", response_model=RecommendResponse)
 async def recommend_courses(
     request: RecommendRequest,
+    response: Response,
     db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory),
+    providers: Providers = Depends(get_providers),
     current_user: User = Depends(get_current_user),
 ):
     """
     Generate course recommendations for next semester
 
+    Identical requests (see response_cache.canonical_request) against the
+    same catalog and model are answered from the response cache without
+    retrieval or a model call; `X-Cache` reports HIT or MISS. Identical
+    requests that arrive while one is being generated wait for that
+    generation instead of starting their own.
+
     Args:
         request: RecommendRequest with university, program, completed courses, etc.
         db: Database session
@@ -29,43 +99,90 @@ async def recommend_courses(
     Returns:
         RecommendResponse with recommendations, notes, assumptions, and warnings
     """
+    key = await run_in_threadpool(response_cache.key, db, request)
+    if response_cache.enabled:
+        cached = await run_in_threadpool(response_cache.get, db, key)
+        response.headers["X-Cache"] = "HIT" if cached is not None else "MISS"
+        if cached is not None:
+            return RecommendResponse(**cached)
 
-    # Validate program exists
-    program = db.query(Program).filter(
-        Program.program_id == request.program_id
-    ).first()
+    async def generate() -> Dict[str, Any]:
+        # Coalesced requests share this task, which can outlive the request
+        # that started it (and its get_db session), so it opens its own
+        generation_db = session_factory()
+        try:
+            inputs = await generation_inputs(request, generation_db, providers)
 
-    if not program:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Program {request.program_id} not found"
-        )
+            # Generate recommendations using AI
+            result = await AIService(providers).generate_recommendations_async(**inputs)
+            recommendations = RecommendResponse(**result).model_dump()
 
-    # Initialize services
-    rag_service = RAGService(db)
-    ai_service = AIService()
+            await run_in_threadpool(
+                response_cache.store, generation_db, key, request.program_id, recommendations
+            )
+            return recommendations
+        finally:
+            await run_in_threadpool(generation_db.close)
 
-    # Retrieve relevant context using RAG
-    retrieved = rag_service.retrieve_context(
-        program_id=request.program_id,
-        completed_courses=request.completed,
-        query=f"next semester courses after completing {', '.join(request.completed)}" if request.completed else None
-    )
+    if settings.RECOMMEND_SINGLE_FLIGHT:
+        result = await recommendation_flights.run(key, generate)
+    else:
+        result = await generate()
+    return RecommendResponse(**result)
 
-    # Format context for prompt
-    context_snippets = rag_service.format_context_snippets(retrieved)
 
-    # Generate recommendations using AI
-    result = ai_service.generate_recommendations(
-        university=request.university,
-        program_id=request.program_id,
-        degree=program.degree,
-        major=program.major,
-        completed=request.completed,
-        credits_target=request.credits_target,
-        track=request.track,
-        preferences=request.preferences,
-        context_snippets=context_snippets
-    )
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    return RecommendResponse(**result)
+
+@router.post("/recommend/stream")
+async def recommend_courses_stream(
+    request: RecommendRequest,
+    db: Session = Depends(get_db),
+    providers: Providers = Depends(get_providers),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream course recommendations as Server-Sent Events
+
+    Emits one `recommendation` event (a CourseRecommendation) as soon as
+    each recommendation is complete in the model's output, then a single
+    `done` event with notes, assumptions and warnings. If generation
+    fails, an `error` event precedes `done`.
+
+    Args:
+        request: RecommendRequest with university, program, completed courses, etc.
+        db: Database session
+
+    Returns:
+        text/event-stream response
+    """
+    start = time.perf_counter()
+    inputs = await generation_inputs(request, db, providers)
+    ai_service = AIService(providers)
+
+    async def events():
+        first = None
+        count = 0
+        error = False
+        try:
+            async for event, data in ai_service.stream_recommendations(**inputs):
+                if event == "recommendation":
+                    try:
+                        data = CourseRecommendation(**data).model_dump()
+                    except ValidationError:
+                        continue
+                    count += 1
+                    if first is None:
+                        first = time.perf_counter() - start
+                elif event == "error":
+                    error = True
+                yield sse_event(event, data)
+        finally:
+            stream_metrics.record(first, time.perf_counter() - start, count, error=error)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,7 +3,7 @@ Course search API endpoint
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 from app.core.database import get_db
 from app.services.rag import RAGService
 from pydantic import BaseModel
@@ -29,22 +29,27 @@ async def search_courses(
     program_id: str = Query(..., description="Program ID to search within"),
     q: str = Query(..., description="Search query (course code or title)"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    mode: Literal["fuzzy", "fulltext"] = Query(
+        "fuzzy", description="fuzzy: typo-tolerant code/title match; fulltext: topic search incl. descriptions"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Fuzzy search for courses by code or title
+    Search for courses by code, title or topic
 
     Args:
         program_id: Program to search within
         q: Search query string
         limit: Maximum results to return
+        mode: "fuzzy" (code/title similarity) or "fulltext" (code, title,
+            description and tags)
 
     Returns:
         List of matching courses
     """
     rag_service = RAGService(db)
-    courses = rag_service.search_courses(program_id, q, limit)
+    courses = rag_service.search_courses(program_id, q, limit, mode=mode)
 
     return [
         CourseSearchResult(
@@ -8,6 +8,12 @@ from app.core.config import settings
 import subprocess
 from pathlib import Path
 from app.core.security import require_roles, User
+from app.services.autocomplete import autocomplete_indexes
+from app.services.course_search import course_search_indexes
+from app.services.precomputed import precomputed_results
+from app.services.reduction import embedding_reducer
+from app.services.response_cache import response_cache
+from app.services.vector_index import index_registry
 
 router = APIRouter()
 
@@ -41,6 +47,14 @@ async def seed_database(
             check=True
         )
 
+        # Drop in-memory indexes, results, projection and cached responses so they reload from the new catalog
+        index_registry.invalidate()
+        precomputed_results.invalidate()
+        embedding_reducer.invalidate()
+        course_search_indexes.invalidate()
+        autocomplete_indexes.invalidate()
+        response_cache.invalidate()
+
         return {
             "status": "success",
             "message": "Database seeded successfully",
@@ -1,5 +1,8 @@
+from pathlib import Path
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
 
 
 class Settings(BaseSettings):
@@ -28,14 +31,90 @@ class Settings(BaseSettings):
     DEMO_USER_USERNAME: str = "demo"
     DEMO_USER_PASSWORD: str = "demo123"  # For demo only – override via .env
 
+    # Provider HTTP clients (one pool per worker, shared by all requests)
+    PROVIDER_TIMEOUT_SECONDS: float = 60.0
+    PROVIDER_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    PROVIDER_MAX_CONNECTIONS: int = 100
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PROVIDER_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    PROVIDER_MAX_RETRIES: int = 2
+    PROVIDER_HTTP2: bool = True  # Used when the h2 package is installed (httpx[http2])
+
     # Model Config
     OPENAI_MODEL: str = "gpt-4o"  # Will swap to gpt-5 when available
     CLAUDE_MODEL: str = "claude-sonnet-4-20250514"
     EMBEDDING_MODEL: str = "text-embedding-3-small"
-    EMBEDDING_DIMENSION: int = 1536
+    EMBEDDING_DIMENSION: int = 1536  # Dimension returned by EMBEDDING_MODEL
+    # Seed-time dimensionality reduction of stored vectors: "none", "truncate"
+    # (Matryoshka prefix of text-embedding-3-* outputs, renormalized) or "pca"
+    # (projection fitted over the catalog); queries use the same projection
+    EMBEDDING_REDUCTION: str = "none"
+    REDUCED_DIMENSION: int = 256
+    VECTOR_STORAGE: str = "binary"  # "binary" (float32 bytes) or "pgvector" (Postgres only)
 
     # RAG Config
     RETRIEVAL_K: int = 12
+    RETRIEVAL_MODE: str = "vector"  # "vector" or "hybrid" (vector + BM25 via rank fusion)
+    RRF_K: int = 60  # Reciprocal rank fusion constant
+    # Reserved top-k slots per embedding type, e.g. {"requirement": 4};
+    # -1 always includes every row of the type. Types are searched separately.
+    RETRIEVAL_TYPE_QUOTAS: Dict[str, int] = {}
+    PARTITION_CACHE_MAX_ROWS: int = 200  # Type partitions this small keep their text in memory
+    LEXICAL_FAST_PATH: bool = False  # Answer code-only queries with BM25, skipping embeddings
+    # Extra per-program queries precomputed at seed time, e.g.
+    # ["required core courses for {program_id}"] (the default query is always included)
+    WARM_QUERIES: List[str] = []
+
+    # Course search: minimum trigram similarity (0-1) for a fuzzy match
+    COURSE_SEARCH_THRESHOLD: float = 0.3
+    # Autocomplete: re-check a cached program's catalog version at most this often
+    AUTOCOMPLETE_VERSION_CHECK_SECONDS: float = 5.0
+
+    # Prerequisite re-ranking: distance reduction per completed course referenced
+    RERANK_OWN_CODE_BOOST: float = 0.1  # The result is the completed course itself
+    RERANK_PREREQ_BOOST: float = 0.1  # Listed as a prerequisite
+    RERANK_RULE_BOOST: float = 0.1  # Named in a requirement rule
+    RERANK_MENTION_BOOST: float = 0.1  # Mentioned anywhere else
+
+    # Query embedding cache
+    EMBEDDING_CACHE_SIZE: int = 1024  # Entries per worker (0 disables caching)
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_CACHE_SHARED: bool = False  # Also share entries across workers via the database
+
+    # Recommendation response cache
+    RECOMMEND_CACHE_SIZE: int = 512  # Responses per worker (0 disables caching)
+    RECOMMEND_CACHE_TTL_SECONDS: int = 3600
+    RECOMMEND_CACHE_SHARED: bool = False  # Also share responses across workers via the database
+    RECOMMEND_SINGLE_FLIGHT: bool = True  # Identical concurrent requests share one generation
+
+    # Query embedding micro-batching
+    EMBEDDING_BATCH_WINDOW_MS: float = 0  # Wait this long to coalesce concurrent calls (0 disables)
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+
+    # Vector index Config
+    RETRIEVAL_BACKEND: str = "exact"  # "exact" or "ivf" (approximate)
+    ANN_MIN_VECTORS: int = 5000  # Smaller programs always use exact search
+    IVF_NLIST: int = 0  # Number of inverted lists (0 = sqrt of program size)
+    IVF_NPROBE: int = 8  # Lists scanned per query: higher = better recall, slower
+    IVF_TRAIN_ITERATIONS: int = 10
+    INDEX_DIR: str = str(BACKEND_DIR / "data" / "indexes")
+    INDEX_VERSIONS_KEPT: int = 2  # On-disk index versions kept after a re-seed
+    INDEX_MEMORY_CAP_MB: float = 0  # Evict least-recently-used program indexes above this (0 = no cap)
+    # Compressed in-memory vectors: "none", "int8" (4x smaller) or "pq" (product
+    # quantization); full-precision vectors are memory-mapped from INDEX_DIR
+    VECTOR_QUANTIZATION: str = "none"
+    QUANTIZATION_RESCORE_FACTOR: int = 4  # Re-score the best k * factor rows at full precision
+    PQ_SUBVECTORS: int = 0  # Bytes per vector in "pq" mode (0 = one per 16 dimensions)
+    QUANTIZATION_RECALL_SAMPLE: int = 32  # Sample queries for the recall@k estimate (0 disables)
+    PGVECTOR_INDEX: str = "hnsw"  # "hnsw" or "ivfflat" (used when pgvector is detected)
+    PGVECTOR_IVFFLAT_LISTS: int = 100
+
+    @property
+    def STORED_EMBEDDING_DIMENSION(self) -> int:
+        """Dimension of stored (and searched) vectors after EMBEDDING_REDUCTION"""
+        if self.EMBEDDING_REDUCTION == "none":
+            return self.EMBEDDING_DIMENSION
+        return min(self.REDUCED_DIMENSION, self.EMBEDDING_DIMENSION)
 
     class Config:
         env_file = ".env"
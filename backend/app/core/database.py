@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -18,7 +18,25 @@ def get_db():
         db.close()
 
 
+def get_session_factory():
+    """
+    Dependency for work that must open its own sessions, e.g. a task that
+    outlives the request whose get_db session it would otherwise borrow
+    """
+    return SessionLocal
+
+
 def init_db():
     """Initialize database and create tables"""
+    # pgvector storage needs the extension before the embeddings table exists
+    if engine.dialect.name == "postgresql" and settings.VECTOR_STORAGE == "pgvector":
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+
     # Create all tables
     Base.metadata.create_all(bind=engine)
+
+    # create_all skips existing tables, so add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
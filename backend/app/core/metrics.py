@@ -0,0 +1,39 @@
+"""
+In-process registry of application metrics exposed on /metrics
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("navio")
+
+
+class MetricsRegistry:
+    """
+    Components register a zero-argument collector returning a dict of stats;
+    the /metrics endpoint calls every collector on each scrape.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        with self._lock:
+            self._collectors[name] = collector
+
+    def collect(self) -> Dict[str, Any]:
+        with self._lock:
+            collectors = dict(self._collectors)
+
+        snapshot = {}
+        for name, collector in collectors.items():
+            try:
+                snapshot[name] = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+
+metrics_registry = MetricsRegistry()
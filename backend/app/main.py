@@ -8,11 +8,16 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import SessionLocal, engine, init_db
 from app.core.rate_limit import InMemoryRateLimiter, RateLimitRule, rate_limit_key_from_request
 from app.core.logging_config import setup_logging
 from app.core.middleware import RequestIDMiddleware, RequestLoggingMiddleware
-from app.api.routes import recommend, search, seed, auth, health
+from app.api.routes import recommend, search, courses, catalog, seed, auth, health
+from app.services.autocomplete import autocomplete_indexes
+from app.services.course_search import pg_trgm_search
+from app.services.fulltext import fulltext_search
+from app.services.pgvector_search import pgvector_search
+from app.services.providers import http2_enabled, providers
 
 # Configure structured logging
 # Set use_json=True in production for structured JSON logs
@@ -130,6 +135,8 @@ app.include_router(health.router, tags=["health"])
 app.include_router(auth.router, tags=["auth"])
 app.include_router(recommend.router, prefix="/api", tags=["recommend"])
 app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(courses.router, prefix="/api", tags=["courses"])
+app.include_router(catalog.router, prefix="/api", tags=["catalog"])
 app.include_router(seed.router, prefix="/api", tags=["seed"])
 
 
@@ -140,6 +147,48 @@ async def startup_event():
     init_db()
     logger.info("Database initialization complete.")
 
+    # One pooled client per provider for the whole worker
+    providers.start()
+    logger.info(
+        f"Provider clients ready (http2={http2_enabled()}, "
+        f"max_connections={settings.PROVIDER_MAX_CONNECTIONS})"
+    )
+
+    # Pick the retrieval backend: pgvector in the database, or in-process
+    if pgvector_search.detect(engine):
+        logger.info("Vector search backend: pgvector")
+    else:
+        logger.info("Vector search backend: in-process")
+
+    # Course search: pg_trgm GIN indexes, or in-process trigram index
+    if pg_trgm_search.detect(engine):
+        logger.info("Course search backend: pg_trgm")
+    else:
+        logger.info("Course search backend: in-process")
+
+    # Full-text search: tsvector/GIN on Postgres, FTS5 on SQLite
+    backend = fulltext_search.detect(engine)
+    if backend:
+        logger.info(f"Full-text search backend: {backend}")
+    else:
+        logger.info("Full-text search backend: unavailable, using fuzzy search")
+
+    # Autocomplete answers from memory, so build every program's index up front
+    db = SessionLocal()
+    try:
+        count = autocomplete_indexes.build_all(db)
+        logger.info(f"Built autocomplete indexes for {count} programs")
+    except Exception as e:
+        logger.warning(f"Autocomplete indexes will be built on first use: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close provider connection pools."""
+    await providers.aclose()
+
 
 @app.get("/")
 async def root():
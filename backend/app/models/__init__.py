@@ -3,5 +3,21 @@ from app.models.course import Course
 from app.models.requirement import Requirement
 from app.models.track import TrackRequirement
 from app.models.embedding import Embedding
+from app.models.query_embedding import QueryEmbedding
+from app.models.precomputed_retrieval import PrecomputedRetrieval
+from app.models.embedding_projection import EmbeddingProjection
+from app.models.recommendation_cache import RecommendationCacheEntry
+from app.models.catalog_version import CatalogVersion
 
-__all__ = ["Program", "Course", "Requirement", "TrackRequirement", "Embedding"]
+__all__ = [
+    "Program",
+    "Course",
+    "Requirement",
+    "TrackRequirement",
+    "Embedding",
+    "QueryEmbedding",
+    "PrecomputedRetrieval",
+    "EmbeddingProjection",
+    "RecommendationCacheEntry",
+    "CatalogVersion",
+]
@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import Column, String, DateTime, event, inspect
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.program import Program
+from app.models.course import Course
+from app.models.requirement import Requirement
+from app.models.embedding import Embedding
+
+
+class CatalogVersion(Base):
+    """
+    Opaque version of one program's catalog, replaced on every change.
+
+    Caches built from a program's catalog (index shards and files,
+    precomputed results, search indexes, responses) are keyed on it.
+    """
+
+    __tablename__ = "catalog_versions"
+
+    program_id = Column(String, primary_key=True)
+    version = Column(String(32), nullable=False)  # Random hex, never reused
+    updated_at = Column(DateTime, nullable=False)
+
+
+# Rows whose program_id identifies the catalog they belong to
+VERSIONED_MODELS = (Program, Course, Requirement, Embedding)
+
+
+def catalog_version(db: Session, program_id: str) -> Optional[str]:
+    """Current version of a program's catalog (None if it was never written)"""
+    return db.query(CatalogVersion.version).filter(
+        CatalogVersion.program_id == program_id
+    ).scalar()
+
+
+def bump_catalog_versions(db: Session, program_ids: Iterable[str]) -> None:
+    """
+    Give each program a new catalog version (flushed with the session)
+
+    ORM writes to VERSIONED_MODELS bump automatically; bulk query
+    updates and deletes bypass the session and must call this.
+    """
+    now = datetime.utcnow()
+    with db.no_autoflush:
+        for program_id in set(program_ids):
+            row = db.get(CatalogVersion, program_id)
+            if row is None:
+                row = CatalogVersion(program_id=program_id)
+                db.add(row)
+            row.version = uuid.uuid4().hex
+            row.updated_at = now
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_changed_catalogs(session, flush_context, instances):
+    program_ids = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, VERSIONED_MODELS):
+            program_ids.add(obj.program_id)
+    for obj in session.dirty:
+        if isinstance(obj, VERSIONED_MODELS) and session.is_modified(obj):
+            program_ids.add(obj.program_id)
+            # A row moved between programs changes both catalogs; the old
+            # value is not in the history if the attribute was expired
+            if inspect(obj).attrs.program_id.history.has_changes():
+                model = type(obj)
+                program_ids.update(
+                    row.program_id
+                    for row in session.query(model.program_id).filter(model.id == obj.id)
+                )
+    program_ids.discard(None)
+    if program_ids:
+        bump_catalog_versions(session, program_ids)
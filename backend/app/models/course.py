@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, ARRAY, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Text, ARRAY, ForeignKey, JSON, Index, event
 from app.core.database import Base
 
 
@@ -15,3 +15,44 @@ class Course(Base):
     description = Column(Text)
     tags = Column(JSON)  # Store as JSON array: ["core", "bioe"]
     source_url = Column(Text)
+
+    # Keyset order for catalog browsing (see app/services/catalog.py)
+    __table_args__ = (Index("ix_courses_program_code", "program_id", "code", "id"),)
+
+
+# SQLite full-text index: an external-content FTS5 table kept in sync by triggers
+# (Postgres uses a generated tsvector column, see app/services/fulltext.py)
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5("
+    "code, title, description, tags, "
+    "content='courses', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_insert AFTER INSERT ON courses BEGIN "
+    "INSERT INTO courses_fts(rowid, code, title, description, tags) "
+    "VALUES (new.id, new.code, new.title, new.description, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_delete AFTER DELETE ON courses BEGIN "
+    "INSERT INTO courses_fts(courses_fts, rowid, code, title, description, tags) "
+    "VALUES ('delete', old.id, old.code, old.title, old.description, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS courses_fts_update AFTER UPDATE ON courses BEGIN "
+    "INSERT INTO courses_fts(courses_fts, rowid, code, title, description, tags) "
+    "VALUES ('delete', old.id, old.code, old.title, old.description, old.tags); "
+    "INSERT INTO courses_fts(rowid, code, title, description, tags) "
+    "VALUES (new.id, new.code, new.title, new.description, new.tags); END",
+)
+
+
+def sqlite_has_fts5(connection) -> bool:
+    options = connection.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+@event.listens_for(Course.__table__, "after_create")
+def _create_fts_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite" and sqlite_has_fts5(connection):
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Course.__table__, "before_drop")
+def _drop_fts_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS courses_fts")
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Integer, Text, JSON
 from app.core.database import Base
-from app.core.config import settings
+from app.models.types import VectorType
 
 
 class Embedding(Base):
@@ -10,5 +10,5 @@ class Embedding(Base):
     program_id = Column(String, nullable=False, index=True)
     type = Column(String, nullable=False, index=True)  # "course" or "requirement"
     content_text = Column(Text, nullable=False)  # The text that was embedded
-    vector = Column(JSON, nullable=False)  # The embedding vector stored as JSON array
+    vector = Column(VectorType(), nullable=False)  # float32 bytes, or pgvector on Postgres
     meta_data = Column(JSON)  # {code?, requirement_id?, source_url, etc.}
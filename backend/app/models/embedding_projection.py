@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from app.core.database import Base
+
+
+class EmbeddingProjection(Base):
+    """PCA projection applied to catalog and query embeddings (fitted at seed time)"""
+
+    __tablename__ = "embedding_projections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    method = Column(String, nullable=False)  # "pca"
+    model = Column(String, nullable=False)  # Embedding model the projection was fitted on
+    source_dimension = Column(Integer, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    mean = Column(LargeBinary, nullable=False)  # float32 (source_dimension,)
+    components = Column(LargeBinary, nullable=False)  # float32 (dimension, source_dimension)
+    created_at = Column(DateTime, nullable=False)
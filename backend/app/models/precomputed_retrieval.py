@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, JSON, UniqueConstraint
+from app.core.database import Base
+
+
+class PrecomputedRetrieval(Base):
+    """Ranked retrieval candidates for a constant per-program query"""
+
+    __tablename__ = "precomputed_retrievals"
+    __table_args__ = (UniqueConstraint("program_id", "query_text"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    program_id = Column(String, nullable=False, index=True)
+    query_text = Column(Text, nullable=False)  # Normalized query text
+    depth = Column(Integer, nullable=False)  # Number of candidates requested
+    candidates = Column(JSON, nullable=False)  # [{"id": ..., "distance": ...}, ...]
+    fingerprint = Column(JSON, nullable=False)  # [catalog version, retrieval settings hash] when computed
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, UniqueConstraint
+from app.core.database import Base
+from app.models.types import VectorType
+
+
+class QueryEmbedding(Base):
+    """Shared (cross-worker) tier of the query embedding cache"""
+
+    __tablename__ = "query_embeddings"
+    __table_args__ = (UniqueConstraint("model", "text_hash"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    model = Column(String, nullable=False)
+    text_hash = Column(String(64), nullable=False, index=True)  # sha256 of normalized text
+    vector = Column(VectorType(reduced=False), nullable=False)  # Raw model output
+    created_at = Column(DateTime, nullable=False)
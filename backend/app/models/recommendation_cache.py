@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from app.core.database import Base
+
+
+class RecommendationCacheEntry(Base):
+    """Shared (cross-worker) tier of the recommendation response cache"""
+
+    __tablename__ = "recommendation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key_hash = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of the cache key
+    program_id = Column(String, nullable=False, index=True)
+    response = Column(JSON, nullable=False)  # RecommendResponse as a dict
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,73 @@
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.core.config import settings
+
+
+def uses_pgvector(dialect) -> bool:
+    """True if vectors are stored in a native pgvector column on this dialect"""
+    return dialect.name == "postgresql" and settings.VECTOR_STORAGE == "pgvector"
+
+
+class VectorType(TypeDecorator):
+    """
+    Float32 embedding vector column.
+
+    Stored as raw little-endian float32 bytes (BYTEA/BLOB), or as a pgvector
+    `vector(n)` column on Postgres when VECTOR_STORAGE is "pgvector". Values
+    are returned as 1-D float32 NumPy arrays. The dimension defaults to
+    settings.STORED_EMBEDDING_DIMENSION (or EMBEDDING_DIMENSION for raw,
+    unreduced model output) and is checked on every write.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dimension: Optional[int] = None, reduced: bool = True):
+        super().__init__()
+        self.dimension = dimension
+        self.reduced = reduced
+
+    @property
+    def expected_dimension(self) -> int:
+        if self.dimension:
+            return self.dimension
+        if self.reduced:
+            return settings.STORED_EMBEDDING_DIMENSION
+        return settings.EMBEDDING_DIMENSION
+
+    def load_dialect_impl(self, dialect):
+        if uses_pgvector(dialect):
+            from pgvector.sqlalchemy import Vector
+
+            return dialect.type_descriptor(Vector(self.expected_dimension))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        array = np.asarray(value, dtype="<f4")
+        if array.ndim != 1 or array.shape[0] != self.expected_dimension:
+            raise ValueError(
+                f"Embedding vector must have {self.expected_dimension} "
+                f"dimensions, got shape {array.shape}"
+            )
+
+        if uses_pgvector(dialect):
+            return array
+        return array.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return np.frombuffer(value, dtype="<f4")
+        return np.asarray(value, dtype=np.float32)
+
+    def compare_values(self, x, y):
+        if x is None or y is None:
+            return x is y
+        return np.array_equal(np.asarray(x), np.asarray(y))
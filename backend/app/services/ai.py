@@ -2,17 +2,39 @@
 AI service for generating course recommendations
 """
 import json
-from typing import Dict, Any, List
-from openai import OpenAI
-from anthropic import Anthropic
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
+from anthropic import Anthropic, AsyncAnthropic
 from app.core.config import settings
 from app.services.prompts import SYSTEM_PROMPT, create_user_prompt
+from app.services.providers import Providers, providers as default_providers
+from app.services.streaming import RecommendationStreamParser
+
+logger = logging.getLogger("navio")
 
 
 class AIService:
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.anthropic_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    def __init__(self, providers: Optional[Providers] = None):
+        # Clients come from the worker's shared pool and are resolved on first use
+        self.providers = providers if providers is not None else default_providers
+
+    @property
+    def openai_client(self) -> OpenAI:
+        return self.providers.openai
+
+    @property
+    def anthropic_client(self) -> Anthropic:
+        return self.providers.anthropic
+
+    @property
+    def async_openai_client(self) -> AsyncOpenAI:
+        """Async clients let request handlers await the provider without blocking the event loop"""
+        return self.providers.async_openai
+
+    @property
+    def async_anthropic_client(self) -> AsyncAnthropic:
+        return self.providers.async_anthropic
 
     def generate_recommendations(
         self,
@@ -32,8 +54,104 @@ class AIService:
         Returns:
             Dictionary with recommendations, notes, assumptions, and warnings
         """
+        try:
+            response = self.openai_client.chat.completions.create(
+                **self._completion_args(
+                    university, program_id, degree, major, completed,
+                    credits_target, track, preferences, context_snippets
+                )
+            )
+            return self._parse_recommendations(response.choices[0].message.content)
+
+        except Exception as e:
+            logger.exception("Error generating recommendations")
+            return self._error_result(e)
+
+    async def generate_recommendations_async(
+        self,
+        university: str,
+        program_id: str,
+        degree: str,
+        major: str,
+        completed: List[str],
+        credits_target: int,
+        track: str = None,
+        preferences: dict = None,
+        context_snippets: List[str] = None
+    ) -> Dict[str, Any]:
+        """generate_recommendations, awaiting the model instead of blocking"""
+        try:
+            response = await self.async_openai_client.chat.completions.create(
+                **self._completion_args(
+                    university, program_id, degree, major, completed,
+                    credits_target, track, preferences, context_snippets
+                )
+            )
+            return self._parse_recommendations(response.choices[0].message.content)
+
+        except Exception as e:
+            logger.exception("Error generating recommendations")
+            return self._error_result(e)
+
+    async def stream_recommendations(
+        self,
+        university: str,
+        program_id: str,
+        degree: str,
+        major: str,
+        completed: List[str],
+        credits_target: int,
+        track: str = None,
+        preferences: dict = None,
+        context_snippets: List[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream course recommendations from GPT-4o as they are generated
 
-        # Create user prompt
+        Yields ("recommendation", {...}) for each recommendation object as
+        soon as the model closes it, then one ("done", {...}) with notes,
+        assumptions and warnings once the completion ends. A failure yields
+        ("error", {"message": ...}) before "done".
+        """
+        parser = RecommendationStreamParser()
+        try:
+            stream = await self.async_openai_client.chat.completions.create(
+                stream=True,
+                **self._completion_args(
+                    university, program_id, degree, major, completed,
+                    credits_target, track, preferences, context_snippets
+                )
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    for recommendation in parser.feed(delta):
+                        yield "recommendation", recommendation
+
+            result = self._parse_recommendations(parser.text)
+
+        except Exception as e:
+            logger.exception("Error generating recommendations")
+            result = self._error_result(e)
+            yield "error", {"message": str(e)}
+
+        yield "done", {key: result[key] for key in ("notes", "assumptions", "warnings")}
+
+    def _completion_args(
+        self,
+        university: str,
+        program_id: str,
+        degree: str,
+        major: str,
+        completed: List[str],
+        credits_target: int,
+        track: str = None,
+        preferences: dict = None,
+        context_snippets: List[str] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for GPT-4o"""
         user_prompt = create_user_prompt(
             university=university,
             program_id=program_id,
@@ -45,40 +163,37 @@ class AIService:
             preferences=preferences,
             context_snippets=context_snippets
         )
+        return {
+            "model": settings.OPENAI_MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.3,  # Lower temperature for more consistent outputs
+            "response_format": {"type": "json_object"},
+        }
 
-        # Call GPT-4o
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent outputs
-                response_format={"type": "json_object"}
-            )
-
-            # Parse JSON response
-            result = json.loads(response.choices[0].message.content)
+    def _parse_recommendations(self, content: str) -> Dict[str, Any]:
+        """Parse the model's JSON and fill in missing fields"""
+        result = json.loads(content)
 
-            # Validate required fields
-            if "recommendations" not in result:
-                result["recommendations"] = []
+        # Validate required fields
+        if "recommendations" not in result:
+            result["recommendations"] = []
 
-            for key in ["notes", "assumptions", "warnings"]:
-                if key not in result:
-                    result[key] = []
+        for key in ["notes", "assumptions", "warnings"]:
+            if key not in result:
+                result[key] = []
 
-            return result
+        return result
 
-        except Exception as e:
-            print(f"Error generating recommendations: {e}")
-            return {
-                "recommendations": [],
-                "notes": [],
-                "assumptions": [],
-                "warnings": [f"Error generating recommendations: {str(e)}"]
-            }
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "recommendations": [],
+            "notes": [],
+            "assumptions": [],
+            "warnings": [f"Error generating recommendations: {str(error)}"]
+        }
 
     def summarize_catalog(self, text: str, max_tokens: int = 4000) -> str:
         """
@@ -99,6 +214,26 @@ class AIService:
 
             return response.content[0].text
 
-        except Exception as e:
-            print(f"Error summarizing with Claude: {e}")
+        except Exception:
+            logger.exception("Error summarizing with Claude")
+            return text  # Return original if summarization fails
+
+    async def summarize_catalog_async(self, text: str, max_tokens: int = 4000) -> str:
+        """summarize_catalog, awaiting Claude instead of blocking"""
+        try:
+            response = await self.async_anthropic_client.messages.create(
+                model=settings.CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": f"Summarize the following course catalog information, preserving all course codes, prerequisites, and requirements:\n\n{text}"
+                    }
+                ]
+            )
+
+            return response.content[0].text
+
+        except Exception:
+            logger.exception("Error summarizing with Claude")
             return text  # Return original if summarization fails
@@ -0,0 +1,150 @@
+"""
+Approximate nearest-neighbour (IVF) index for large program catalogs
+"""
+import logging
+import math
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger("navio")
+
+
+def ann_index_path(program_id: str) -> Path:
+    """On-disk location of a program's IVF index"""
+    return Path(settings.INDEX_DIR) / f"{program_id}.ivf.npz"
+
+
+class IVFIndex:
+    """
+    Inverted-file index over unit-normalized vectors.
+
+    Vectors are clustered with spherical k-means; each query only scores the
+    members of the `nprobe` closest clusters. Row positions refer to the
+    owning ProgramIndex matrix, which still holds the vectors themselves.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+    ):
+        self.ids = ids
+        self.centroids = centroids
+        self.order = order  # Row positions grouped by list
+        self.offsets = offsets  # List i spans order[offsets[i]:offsets[i + 1]]
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.centroids.nbytes + self.order.nbytes + self.offsets.nbytes
+
+    @classmethod
+    def train(
+        cls,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        nlist: int = 0,
+        iterations: Optional[int] = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Cluster unit vectors into `nlist` lists with spherical k-means"""
+        n = len(vectors)
+        if nlist <= 0:
+            nlist = max(1, int(math.sqrt(n)))
+        nlist = min(nlist, n)
+        if iterations is None:
+            iterations = settings.IVF_TRAIN_ITERATIONS
+
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = cls._assign(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            counts = np.bincount(assignments, minlength=nlist)
+
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty lists from random rows
+                sums[empty] = vectors[rng.choice(n, size=int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            np.divide(sums, norms, out=sums, where=norms > 0)
+            centroids = sums
+
+        assignments = cls._assign(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=nlist), out=offsets[1:])
+
+        return cls(ids=ids.copy(), centroids=centroids, order=order, offsets=offsets)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        """Nearest centroid (by inner product) for every row, in chunks"""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk] @ centroids.T
+            assignments[start:start + chunk] = block.argmax(axis=1)
+        return assignments
+
+    def probe(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Row positions of the members of the `nprobe` closest lists"""
+        if nprobe is None:
+            nprobe = settings.IVF_NPROBE
+        nprobe = max(1, min(nprobe, self.nlist))
+
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probed = np.arange(self.nlist)
+
+        return np.concatenate(
+            [self.order[self.offsets[i]:self.offsets[i + 1]] for i in probed]
+        )
+
+    def matches(self, ids: np.ndarray) -> bool:
+        """True if the index was trained on exactly these rows"""
+        return np.array_equal(self.ids, ids)
+
+    def save(self, path: Path) -> None:
+        """Persist the index (written to a temp file, then renamed)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                ids=self.ids,
+                centroids=self.centroids,
+                order=self.order,
+                offsets=self.offsets,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IVFIndex"]:
+        """Load a persisted index, or None if it is missing or unreadable"""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(
+                    ids=data["ids"],
+                    centroids=data["centroids"],
+                    order=data["order"],
+                    offsets=data["offsets"],
+                )
+        except Exception as e:
+            logger.warning(f"Could not load IVF index {path}: {e}")
+            return None
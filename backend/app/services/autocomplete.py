@@ -0,0 +1,182 @@
+"""
+Prefix index for course-code and title-word autocomplete
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import Course
+from app.models.catalog_version import catalog_version
+from app.services.course_search import compact_code
+from app.services.lexical import WORD_PATTERN
+
+logger = logging.getLogger("navio")
+
+
+class AutocompleteIndex:
+    """
+    Sorted arrays of compacted course codes ("BIOE252") and lowercased title
+    words, each paired with the course's position.
+
+    A prefix lookup is a binary search plus a scan of the matching run, so
+    completion cost depends on the number of matches, not the catalog size.
+    """
+
+    def __init__(
+        self,
+        codes: Sequence[str],
+        titles: Sequence[str],
+        version: Optional[str] = None,
+    ):
+        self.codes = list(codes)
+        self.titles = list(titles)
+        self.version = version  # Catalog version the index was built from
+
+        code_entries = sorted(
+            (compact_code(code), position) for position, code in enumerate(self.codes)
+        )
+        self._code_keys = [key for key, _ in code_entries]
+        self._code_positions = [position for _, position in code_entries]
+
+        word_entries = sorted(
+            (word, position)
+            for position, title in enumerate(self.titles)
+            for word in set(WORD_PATTERN.findall(title.lower()))
+        )
+        self._word_keys = [key for key, _ in word_entries]
+        self._word_positions = [position for _, position in word_entries]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @staticmethod
+    def _prefixed(keys: List[str], positions: List[int], prefix: str):
+        """Positions whose key starts with `prefix`, in key order"""
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield positions[i]
+            i += 1
+
+    def _title_matches(self, words: List[str]) -> Set[int]:
+        """Courses with a title word starting with each query word"""
+        matches: Optional[Set[int]] = None
+        for word in words:
+            found = set(self._prefixed(self._word_keys, self._word_positions, word))
+            matches = found if matches is None else matches & found
+            if not matches:
+                return set()
+        return matches or set()
+
+    def complete(self, query: str, limit: int = 8) -> List[Dict[str, str]]:
+        """Code-prefix matches first (in code order), then title-word matches"""
+        prefix = compact_code(query)
+        if not prefix or limit <= 0:
+            return []
+
+        positions: List[int] = []
+        for position in self._prefixed(self._code_keys, self._code_positions, prefix):
+            positions.append(position)
+            if len(positions) == limit:
+                break
+
+        if len(positions) < limit:
+            seen = set(positions)
+            title_positions = sorted(
+                self._title_matches(WORD_PATTERN.findall(query.lower())) - seen,
+                key=lambda position: self.codes[position],
+            )
+            positions.extend(title_positions[:limit - len(positions)])
+
+        return [
+            {"code": self.codes[position], "title": self.titles[position]}
+            for position in positions
+        ]
+
+
+class AutocompleteIndexes:
+    """
+    Per-program autocomplete indexes, rebuilt when the program's catalog
+    version changes.
+
+    Lookups are on the keystroke path, so a cached index is served without
+    a database round trip and its version is re-checked at most once per
+    `check_interval` seconds (AUTOCOMPLETE_VERSION_CHECK_SECONDS).
+    """
+
+    def __init__(
+        self,
+        check_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if check_interval is None:
+            check_interval = settings.AUTOCOMPLETE_VERSION_CHECK_SECONDS
+        self.check_interval = check_interval
+        self._clock = clock
+        self._indexes: Dict[str, AutocompleteIndex] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _build(self, db: Session, program_id: str, version: Optional[str], now: float) -> AutocompleteIndex:
+        rows = db.query(Course.code, Course.title).filter(
+            Course.program_id == program_id
+        ).all()
+        index = AutocompleteIndex(
+            [row.code for row in rows], [row.title for row in rows], version=version
+        )
+        # Unknown program ids come from clients: never keep an index for them
+        if rows:
+            self._indexes[program_id] = index
+            self._checked[program_id] = now
+            self.builds += 1
+        else:
+            self._indexes.pop(program_id, None)
+            self._checked.pop(program_id, None)
+        return index
+
+    def get(self, db: Session, program_id: str) -> AutocompleteIndex:
+        now = self._clock()
+        index = self._indexes.get(program_id)
+        if index is not None and now - self._checked.get(program_id, float("-inf")) < self.check_interval:
+            return index
+
+        version = catalog_version(db, program_id)
+        with self._lock:
+            index = self._indexes.get(program_id)
+            if index is not None and index.version == version:
+                self._checked[program_id] = now
+                return index
+            return self._build(db, program_id, version, now)
+
+    def build_all(self, db: Session) -> int:
+        """Build every program's index (called at startup); returns the count"""
+        program_ids = [row[0] for row in db.query(Course.program_id).distinct()]
+        now = self._clock()
+        with self._lock:
+            self._indexes.clear()
+            self._checked.clear()
+            for program_id in program_ids:
+                self._build(db, program_id, catalog_version(db, program_id), now)
+        return len(program_ids)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._checked.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "programs": len(self._indexes),
+            "courses": sum(len(index) for index in self._indexes.values()),
+            "builds": self.builds,
+        }
+
+
+autocomplete_indexes = AutocompleteIndexes()
+metrics_registry.register("autocomplete", autocomplete_indexes.stats)
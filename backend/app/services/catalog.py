@@ -0,0 +1,122 @@
+"""
+Cross-program catalog browsing with keyset (cursor) pagination
+"""
+import base64
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Text, cast, or_, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import Course, Program
+
+# Sort key of a course: the (program_id, code, id) index order
+Cursor = Tuple[str, str, int]
+
+
+def encode_cursor(course: Course) -> str:
+    """Opaque cursor pointing just past `course`"""
+    key = [course.program_id, course.code, course.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        program_id, code, id_ = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(program_id, str) or not isinstance(code, str) or not isinstance(id_, int):
+            raise TypeError
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return program_id, code, id_
+
+
+def _json_array_contains(column, value: str):
+    """Portable test for a string in a JSON array column (stored as JSON text)"""
+    return cast(column, Text).contains(json.dumps(value), autoescape=True)
+
+
+def catalog_query(
+    db: Session,
+    program_id: Optional[str] = None,
+    university: Optional[str] = None,
+    tags: Sequence[str] = (),
+    terms: Sequence[str] = (),
+    min_credits: Optional[int] = None,
+    max_credits: Optional[int] = None,
+):
+    """
+    Courses matching the filters, in (program_id, code, id) order
+
+    Every tag must be present; any of the terms may match.
+    """
+    query = db.query(Course)
+    if program_id is not None:
+        query = query.filter(Course.program_id == program_id)
+    if university is not None:
+        query = query.filter(Course.program_id.in_(
+            db.query(Program.program_id).filter(Program.university == university)
+        ))
+    for tag in tags:
+        query = query.filter(_json_array_contains(Course.tags, tag))
+    if terms:
+        query = query.filter(or_(*(_json_array_contains(Course.terms, term) for term in terms)))
+    if min_credits is not None:
+        query = query.filter(Course.credits >= min_credits)
+    if max_credits is not None:
+        query = query.filter(Course.credits <= max_credits)
+    return query.order_by(Course.program_id, Course.code, Course.id)
+
+
+def catalog_page(
+    db: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    **filters: Any,
+) -> Tuple[List[Course], Optional[str]]:
+    """
+    One page of courses and the cursor for the next page (None at the end)
+
+    The cursor is a keyset position, so the database seeks straight to it
+    on the (program_id, code, id) index: deep pages cost the same as the first.
+    """
+    query = catalog_query(db, **filters)
+    if cursor is not None:
+        query = query.filter(
+            tuple_(Course.program_id, Course.code, Course.id) > tuple_(*decode_cursor(cursor))
+        )
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def iter_catalog(db: Session, batch_size: int = 500, **filters: Any) -> Iterator[Course]:
+    """
+    Every matching course, fetched page by page
+
+    Yielded rows are expunged so the session does not accumulate the catalog.
+    """
+    cursor = None
+    while True:
+        rows, cursor = catalog_page(db, batch_size, cursor, **filters)
+        for row in rows:
+            yield row
+            db.expunge(row)
+        if cursor is None:
+            return
+
+
+def course_record(course: Course) -> Dict[str, Any]:
+    return {
+        "program_id": course.program_id,
+        "code": course.code,
+        "title": course.title,
+        "credits": course.credits,
+        "terms": course.terms or [],
+        "prereqs": course.prereqs or [],
+        "tags": course.tags or [],
+        "description": course.description or "",
+    }
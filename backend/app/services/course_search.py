@@ -0,0 +1,285 @@
+"""
+Typo-tolerant course search by trigram similarity (pg_trgm or in-memory)
+"""
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import case, func, literal, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Course
+from app.models.catalog_version import catalog_version
+from app.services.lexical import COURSE_CODE_PATTERN, WORD_PATTERN, normalize_course_code
+
+logger = logging.getLogger("navio")
+
+# Added to the similarity score; an exact code beats any fuzzy match
+EXACT_CODE_BOOST = 1.0
+CODE_PREFIX_BOOST = 0.5
+TITLE_PREFIX_BOOST = 0.2
+
+def trigrams(value: str) -> frozenset:
+    """pg_trgm-style trigrams: each word padded with two leading blanks and one trailing"""
+    grams = set()
+    for word in WORD_PATTERN.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def compact_code(value: str) -> str:
+    """Code with spaces removed, for prefix matching ("bioe 2" -> "BIOE2")"""
+    return "".join(value.split()).upper()
+
+
+def exact_code(query: str) -> Optional[str]:
+    """Normalized course code if the whole query is one code"""
+    match = COURSE_CODE_PATTERN.fullmatch(query.strip())
+    return normalize_course_code(query) if match else None
+
+
+class CourseTrigramIndex:
+    """
+    In-memory trigram index over one program's course codes and titles.
+
+    Title scores follow pg_trgm word_similarity (share of the query's
+    trigrams found in the title); code scores follow similarity (trigram
+    Jaccard). Exact codes and code/title prefixes are boosted.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        codes: Sequence[str],
+        titles: Sequence[str],
+        version: Optional[str] = None,
+    ):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.codes = list(codes)
+        self.titles = list(titles)
+        self.version = version  # Catalog version the index was built from
+        self._compact_codes = [compact_code(code) for code in self.codes]
+        self._lower_titles = [title.lower() for title in self.titles]
+        self._code_sizes = np.array([len(trigrams(code)) for code in self.codes], dtype=np.float32)
+        self._code_postings = self._invert([trigrams(code) for code in self.codes])
+        self._title_postings = self._invert([trigrams(title) for title in self.titles])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _invert(gram_sets: List[frozenset]) -> Dict[str, np.ndarray]:
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for position, grams in enumerate(gram_sets):
+            for gram in grams:
+                postings[gram].append(position)
+        return {gram: np.asarray(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+    def _shared(self, postings: Dict[str, np.ndarray], grams: frozenset) -> np.ndarray:
+        """Number of query trigrams each row shares"""
+        hits = [postings[gram] for gram in grams if gram in postings]
+        if not hits:
+            return np.zeros(len(self), dtype=np.float32)
+        return np.bincount(np.concatenate(hits), minlength=len(self)).astype(np.float32)
+
+    def similarities(self, query: str) -> np.ndarray:
+        """Trigram similarity of every course: the better of code and title"""
+        grams = trigrams(query)
+        if not grams or len(self) == 0:
+            return np.zeros(len(self), dtype=np.float32)
+
+        title_scores = self._shared(self._title_postings, grams) / len(grams)
+        code_shared = self._shared(self._code_postings, grams)
+        code_scores = code_shared / np.maximum(self._code_sizes + len(grams) - code_shared, 1)
+        return np.maximum(title_scores, code_scores)
+
+    def scores(self, query: str, similarities: np.ndarray) -> np.ndarray:
+        """Similarities plus boosts, the ranking score"""
+        scores = similarities.copy()
+        # Boosts only for trigram hits: any code or title prefix of the query
+        # shares at least its leading trigram, so nothing else can qualify
+        code = exact_code(query)
+        prefix = compact_code(query)
+        title_prefix = " ".join(query.lower().split())
+        for position in np.flatnonzero(scores > 0):
+            if code is not None and self.codes[position].upper() == code:
+                scores[position] += EXACT_CODE_BOOST
+            if prefix and self._compact_codes[position].startswith(prefix):
+                scores[position] += CODE_PREFIX_BOOST
+            if title_prefix and self._lower_titles[position].startswith(title_prefix):
+                scores[position] += TITLE_PREFIX_BOOST
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        threshold: Optional[float] = None,
+    ) -> List[int]:
+        """
+        Ids of the courses with similarity at least `threshold`, best score first
+
+        As with pg_trgm's `%` and `<%`, the threshold applies to the plain
+        similarity; boosts only order the matches.
+        """
+        if threshold is None:
+            threshold = settings.COURSE_SEARCH_THRESHOLD
+        similarities = self.similarities(query)
+        scores = self.scores(query, similarities)
+        matched = np.flatnonzero(similarities >= threshold)
+        # Best score first, then catalog code order
+        order = sorted(matched, key=lambda position: (-scores[position], self.codes[position]))
+        return [int(self.ids[position]) for position in order[:limit]]
+
+
+class CourseSearchIndexes:
+    """
+    Per-program trigram indexes, rebuilt when the program's courses change.
+
+    Only programs with courses are kept, so arbitrary program ids sent by
+    clients cannot grow the cache.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, CourseTrigramIndex] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def get(self, db: Session, program_id: str) -> CourseTrigramIndex:
+        version = catalog_version(db, program_id)
+        index = self._indexes.get(program_id)
+        if index is not None and index.version == version:
+            return index
+
+        with self._lock:
+            index = self._indexes.get(program_id)
+            if index is None or index.version != version:
+                rows = db.query(Course.id, Course.code, Course.title).filter(
+                    Course.program_id == program_id
+                ).order_by(Course.id).all()
+                index = CourseTrigramIndex(
+                    ids=[row.id for row in rows],
+                    codes=[row.code for row in rows],
+                    titles=[row.title for row in rows],
+                    version=version,
+                )
+                # Unknown program ids come from clients: never keep an index for them
+                if rows:
+                    self._indexes[program_id] = index
+                else:
+                    self._indexes.pop(program_id, None)
+            return index
+
+    def invalidate(self, program_id: Optional[str] = None) -> None:
+        with self._lock:
+            if program_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(program_id, None)
+
+
+course_search_indexes = CourseSearchIndexes()
+
+
+def trigram_threshold_statement(threshold: float):
+    """
+    Set the `%` and `<%` thresholds for the current transaction
+
+    Both default to server settings (0.3 and 0.6) otherwise, which would
+    filter differently from the in-memory index.
+    """
+    return select(
+        func.set_config("pg_trgm.similarity_threshold", str(threshold), True),
+        func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True),
+    )
+
+
+def build_trigram_query(program_id: str, query: str, limit: int):
+    """
+    Ranked course ids via pg_trgm
+
+    Rows are filtered only with `%` (similarity) and `<%` (word_similarity),
+    which the GIN trigram indexes serve, at the thresholds set by
+    trigram_threshold_statement; exact codes and prefixes are boosts in the
+    ranking, not filters.
+    """
+    q = literal(query)
+    code = exact_code(query)
+    prefix = compact_code(query)
+    title_prefix = " ".join(query.lower().split())
+    compact = func.upper(func.replace(Course.code, " ", ""))
+
+    score = (
+        func.greatest(func.similarity(Course.code, q), func.word_similarity(q, Course.title))
+        + case((func.upper(Course.code) == (code or ""), EXACT_CODE_BOOST), else_=0.0)
+        # autoescape: % and _ typed by the user are literal characters
+        + case((compact.startswith(prefix, autoescape=True), CODE_PREFIX_BOOST), else_=0.0)
+        + case(
+            (func.lower(Course.title).startswith(title_prefix, autoescape=True), TITLE_PREFIX_BOOST),
+            else_=0.0,
+        )
+    ).label("score")
+
+    return (
+        select(Course.id, score)
+        .where(Course.program_id == program_id)
+        .where(or_(Course.code.op("%")(q), q.op("<%")(Course.title)))
+        .order_by(score.desc(), Course.code)
+        .limit(limit)
+    )
+
+
+class PgTrgmSearch:
+    """
+    Course search inside Postgres using pg_trgm GIN indexes.
+
+    Disabled unless `detect` can enable the extension and create the
+    indexes; callers use the in-memory trigram index otherwise.
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def detect(self, engine: Engine) -> bool:
+        self.enabled = False
+        if engine.dialect.name != "postgresql":
+            return False
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_courses_code_trgm "
+                    "ON courses USING gin (code gin_trgm_ops)"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_courses_title_trgm "
+                    "ON courses USING gin (title gin_trgm_ops)"
+                ))
+            self.enabled = True
+        except Exception as e:
+            logger.warning(f"pg_trgm unavailable, using in-memory course search: {e}")
+
+        return self.enabled
+
+    def search(self, db: Session, program_id: str, query: str, limit: int) -> List[int]:
+        db.execute(trigram_threshold_statement(settings.COURSE_SEARCH_THRESHOLD))
+        statement = build_trigram_query(program_id, query, limit)
+        return [row.id for row in db.execute(statement).all()]
+
+
+pg_trgm_search = PgTrgmSearch()
+
+
+def search_course_ids(db: Session, program_id: str, query: str, limit: int) -> List[int]:
+    """Ranked ids of courses matching the query (pg_trgm when available)"""
+    if pg_trgm_search.enabled:
+        return pg_trgm_search.search(db, program_id, query, limit)
+    return course_search_indexes.get(db, program_id).search(query, limit)
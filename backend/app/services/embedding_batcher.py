@@ -0,0 +1,176 @@
+"""
+Micro-batching of concurrent query-embedding requests
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openai import OpenAI
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.services.providers import providers
+
+logger = logging.getLogger("navio")
+
+EmbedBatchFn = Callable[[List[str]], List[List[float]]]
+
+
+def embed_texts(client: OpenAI, texts: List[str]) -> List[List[float]]:
+    """Embed several texts in one API call, preserving input order"""
+    response = client.embeddings.create(
+        model=settings.EMBEDDING_MODEL,
+        input=texts
+    )
+    data = sorted(response.data, key=lambda item: item.index)
+    return [item.embedding for item in data]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched calls.
+
+    Callers `submit` a text and get a Future. A background thread waits up to
+    `max_wait_seconds` after the first pending request (or until
+    `max_batch_size` texts are queued), sends one batched request for the
+    unique texts, and resolves every waiter with its vector or the error.
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        max_batch_size: int = 64,
+        max_wait_seconds: float = 0.005,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[str, Future]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.requests = 0
+        self.batches = 0
+        self.upstream_texts = 0
+        self.largest_batch = 0
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding; the Future resolves to its vector"""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._pending.append((text, future))
+            self.requests += 1
+            self._ensure_worker()
+            self._cond.notify()
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(text).result(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop the worker thread after draining queued requests"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="embedding-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """Block until a batch is ready (or the batcher closes)"""
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # Closed and drained
+            try:
+                self._dispatch(batch)
+            except Exception:
+                # Never let one batch kill the thread and strand later callers
+                logger.exception("Embedding batch dispatch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Embedding batch dispatch failed"))
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]) -> None:
+        # Drop futures cancelled by their caller (e.g. a client disconnect);
+        # the rest are marked running and can no longer be cancelled
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.upstream_texts += len(unique_texts)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        try:
+            vectors = self.embed_batch(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise RuntimeError(
+                    f"Embedding API returned {len(vectors)} vectors "
+                    f"for {len(unique_texts)} inputs"
+                )
+        except Exception as e:
+            logger.warning(f"Batched embedding request failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            future.set_result(by_text[text])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "upstream_texts": self.upstream_texts,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Process-wide batcher, created on first use"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = EmbeddingBatcher(
+                # Resolved per batch so a client rebuilt after shutdown is picked up
+                embed_batch=lambda texts: embed_texts(providers.openai, texts),
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_seconds=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+            )
+            metrics_registry.register("embedding_batcher", _batcher.stats)
+        return _batcher
@@ -0,0 +1,79 @@
+"""
+Caching for query embeddings (per-worker LRU + optional shared database tier)
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import QueryEmbedding
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger("navio")
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_query_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query string"""
+    return " ".join(text.split()).casefold()
+
+
+def query_cache_key(text: str, model: Optional[str] = None) -> CacheKey:
+    """(embedding model, normalized text) cache key"""
+    return (model or settings.EMBEDDING_MODEL, normalize_query_text(text))
+
+
+def text_hash(key: CacheKey) -> str:
+    """Stable hash of a cache key's text, used by the shared tier"""
+    return hashlib.sha256(key[1].encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(TTLCache[CacheKey, List[float]]):
+    """Per-worker LRU + TTL tier for query embeddings, keyed by `query_cache_key`"""
+
+
+def load_shared_embedding(db: Session, key: CacheKey) -> Optional[List[float]]:
+    """Read a non-expired entry from the shared (database) tier"""
+    row = db.query(QueryEmbedding).filter(
+        QueryEmbedding.model == key[0],
+        QueryEmbedding.text_hash == text_hash(key),
+    ).first()
+    if row is None:
+        return None
+
+    age = datetime.utcnow() - row.created_at
+    if age > timedelta(seconds=settings.EMBEDDING_CACHE_TTL_SECONDS):
+        return None
+    return row.vector.tolist()
+
+
+def store_shared_embedding(db: Session, key: CacheKey, vector: List[float]) -> None:
+    """Upsert an entry into the shared tier (best-effort)"""
+    try:
+        row = db.query(QueryEmbedding).filter(
+            QueryEmbedding.model == key[0],
+            QueryEmbedding.text_hash == text_hash(key),
+        ).first()
+        if row is None:
+            row = QueryEmbedding(model=key[0], text_hash=text_hash(key))
+            db.add(row)
+        row.vector = vector
+        row.created_at = datetime.utcnow()
+        db.commit()
+    except (SQLAlchemyError, ValueError) as e:
+        # Another worker may have inserted the same key first
+        db.rollback()
+        logger.warning(f"Could not store shared query embedding: {e}")
+
+
+query_embedding_cache = EmbeddingCache(
+    max_size=settings.EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+)
+metrics_registry.register("query_embedding_cache", query_embedding_cache.stats)
@@ -0,0 +1,128 @@
+"""
+Full-text course search over code, title, description and tags
+(Postgres tsvector + GIN, or SQLite FTS5)
+"""
+import logging
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.course import SQLITE_FTS_DDL, sqlite_has_fts5
+from app.services.lexical import WORD_PATTERN
+
+logger = logging.getLogger("navio")
+
+# Codes and titles outweigh descriptions; tags sit in between
+POSTGRES_FTS_DDL = (
+    "ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(tags::text, '')), 'C')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)",
+)
+
+POSTGRES_SEARCH_SQL = (
+    "SELECT id, ts_rank(search_vector, query) AS rank "
+    "FROM courses, to_tsquery('english', :query) AS query "
+    "WHERE program_id = :program_id AND search_vector @@ query "
+    "ORDER BY rank DESC, code LIMIT :limit"
+)
+
+# bm25() weights per FTS5 column (code, title, description, tags); lower is better
+SQLITE_SEARCH_SQL = (
+    "SELECT courses.id, bm25(courses_fts, 10.0, 10.0, 1.0, 4.0) AS rank "
+    "FROM courses_fts JOIN courses ON courses.id = courses_fts.rowid "
+    "WHERE courses_fts MATCH :query AND courses.program_id = :program_id "
+    "ORDER BY rank, courses.code LIMIT :limit"
+)
+
+
+def query_terms(query: str) -> List[str]:
+    """Lowercased words of the query; punctuation never reaches the FTS parser"""
+    return WORD_PATTERN.findall(query.lower())
+
+
+def tsquery(terms: List[str]) -> str:
+    """to_tsquery input matching every term"""
+    return " & ".join(terms)
+
+
+def fts5_query(terms: List[str]) -> str:
+    """FTS5 MATCH input matching every term (each quoted as a string)"""
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class FullTextSearch:
+    """
+    Ranked full-text course search inside the database.
+
+    Postgres gets a generated, weighted tsvector column with a GIN index
+    (ranked by ts_rank); SQLite gets an FTS5 table created alongside the
+    courses table (ranked by bm25). `search` returns None when neither is
+    available so callers can fall back to fuzzy search.
+    """
+
+    def __init__(self):
+        self.postgres = False
+
+    def detect(self, engine: Engine) -> Optional[str]:
+        """Create the full-text index for this database; returns the backend name"""
+        self.postgres = False
+        try:
+            if engine.dialect.name == "postgresql":
+                with engine.begin() as conn:
+                    for statement in POSTGRES_FTS_DDL:
+                        conn.execute(text(statement))
+                self.postgres = True
+                return "tsvector"
+
+            if engine.dialect.name == "sqlite":
+                with engine.begin() as conn:
+                    if not sqlite_has_fts5(conn):
+                        return None
+                    exists = conn.exec_driver_sql(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'courses_fts'"
+                    ).first()
+                    for statement in SQLITE_FTS_DDL:
+                        conn.exec_driver_sql(statement)
+                    # Index courses that predate the FTS table
+                    if exists is None:
+                        conn.exec_driver_sql("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+                return "fts5"
+        except Exception as e:
+            logger.warning(f"Full-text index unavailable, falling back to fuzzy search: {e}")
+        return None
+
+    def search(self, db: Session, program_id: str, query: str, limit: int) -> Optional[List[int]]:
+        """Ranked course ids, or None if this database has no full-text index"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql" and self.postgres:
+            statement, match = POSTGRES_SEARCH_SQL, tsquery(terms)
+        elif dialect == "sqlite":
+            statement, match = SQLITE_SEARCH_SQL, fts5_query(terms)
+        else:
+            return None
+
+        try:
+            rows = db.execute(
+                text(statement),
+                {"query": match, "program_id": program_id, "limit": limit},
+            ).all()
+        except OperationalError as e:
+            logger.warning(f"Full-text search failed, falling back to fuzzy search: {e}")
+            db.rollback()
+            return None
+        return [row.id for row in rows]
+
+
+fulltext_search = FullTextSearch()
@@ -0,0 +1,164 @@
+"""
+Versioned on-disk program indexes, memory-mapped by every worker
+"""
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Embedding
+from app.services.lexical import CODE_FEATURES, BM25Index
+from app.services.vector_index import ProgramIndex
+
+logger = logging.getLogger("navio")
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+ARRAYS = (
+    "vectors",
+    "ids",
+    "bm25_positions",
+    "bm25_tfs",
+    "bm25_offsets",
+    "bm25_idf",
+    "bm25_length_norm",
+)
+
+
+def store_root() -> Path:
+    return Path(settings.INDEX_DIR)
+
+
+def current_version_dir() -> Optional[Path]:
+    """Directory of the version named in CURRENT, if any"""
+    try:
+        version = (store_root() / CURRENT_FILE).read_text().strip()
+    except OSError:
+        return None
+    path = store_root() / VERSIONS_DIR / version
+    return path if version and path.is_dir() else None
+
+
+def save_program_index(index: ProgramIndex, directory: Path) -> None:
+    """
+    Write one program's index as raw .npy arrays plus a JSON sidecar
+
+    The arrays (vectors, ids, BM25 postings) are opened with mmap by
+    load_program_index; the sidecar holds the catalog version, type layout,
+    code sets and the cached small-partition rows.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    terms, bm25 = index.lexical.to_arrays()
+    arrays = {
+        "vectors": np.ascontiguousarray(index.vectors, dtype=np.float32),
+        "ids": index.ids,
+        **{f"bm25_{name}": array for name, array in bm25.items()},
+    }
+    for name in ARRAYS:
+        np.save(directory / f"{name}.npy", arrays[name])
+
+    sidecar = {
+        "program_id": index.program_id,
+        "catalog_version": index.version,
+        "dimension": index.dimension,
+        "types": [[type_, len(positions)] for type_, positions in index.partitions.items()],
+        "code_features": [
+            [sorted(features[name]) for name in CODE_FEATURES]
+            for features in index.code_features
+        ],
+        "bm25": {"terms": terms, "k1": index.lexical.k1, "b": index.lexical.b},
+        "cached_rows": list(index.cached_rows.values()),
+    }
+    with open(directory / "meta.json", "w") as f:
+        json.dump(sidecar, f)
+
+
+def load_program_index(program_id: str, version: Optional[str]) -> Optional[ProgramIndex]:
+    """
+    Open the current version of a program's index, or None if it is missing
+    or was written for a different catalog version
+    """
+    version_dir = current_version_dir()
+    if version_dir is None:
+        return None
+    directory = version_dir / program_id
+    try:
+        with open(directory / "meta.json") as f:
+            sidecar = json.load(f)
+        if sidecar["catalog_version"] != version:
+            return None
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAYS
+        }
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"No usable index files for {program_id}: {e}")
+        return None
+
+    types = [type_ for type_, count in sidecar["types"] for _ in range(count)]
+    lexical = BM25Index.from_arrays(
+        sidecar["bm25"]["terms"],
+        {name[len("bm25_"):]: array for name, array in arrays.items() if name.startswith("bm25_")},
+        k1=sidecar["bm25"]["k1"],
+        b=sidecar["bm25"]["b"],
+    )
+    return ProgramIndex(
+        program_id=program_id,
+        ids=np.asarray(arrays["ids"]),
+        vectors=arrays["vectors"],
+        types=types,
+        version=version,
+        code_features=[
+            dict(zip(CODE_FEATURES, map(frozenset, features)))
+            for features in sidecar["code_features"]
+        ],
+        lexical=lexical,
+        cached_rows={row["id"]: row for row in sidecar["cached_rows"]},
+    )
+
+
+def write_index_version(db: Session) -> str:
+    """
+    Build every program's index into a new version and make it current
+
+    Files are written to versions/<version>/ first; CURRENT is then
+    replaced atomically, so workers see either the old or the new version.
+    Older versions beyond INDEX_VERSIONS_KEPT are removed (workers still
+    mapping them keep their open files).
+    """
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    version_dir = store_root() / VERSIONS_DIR / version
+    program_ids = [row[0] for row in db.query(Embedding.program_id).distinct()]
+    for program_id in program_ids:
+        save_program_index(ProgramIndex.build(db, program_id), version_dir / program_id)
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = store_root() / f"{CURRENT_FILE}.{os.getpid()}.tmp"
+    tmp_path.write_text(version)
+    tmp_path.replace(store_root() / CURRENT_FILE)
+
+    prune_versions(keep=settings.INDEX_VERSIONS_KEPT)
+    return version
+
+
+def prune_versions(keep: int) -> int:
+    """Delete all but the newest `keep` versions (never the current one)"""
+    versions_dir = store_root() / VERSIONS_DIR
+    if not versions_dir.is_dir():
+        return 0
+
+    current = current_version_dir()
+    versions = sorted(path for path in versions_dir.iterdir() if path.is_dir())
+    removed = 0
+    for path in versions[:-keep] if keep > 0 else versions:
+        if path == current:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
@@ -0,0 +1,235 @@
+"""
+Lexical (BM25) retrieval with course-code-aware tokenization
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Department (1-5 letters) + number (2-3 digits, optional letter suffix):
+# "BIOE 252", "CS 106B", "M 408D", "chem31a"
+COURSE_CODE_PATTERN = re.compile(r"\b([A-Za-z]{1,5})\s?(\d{2,3}[A-Za-z]?)\b")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the this to "
+    "with will was were".split()
+)
+# Words that carry no meaning in a recommend query besides the codes
+QUERY_FILLER_WORDS = STOPWORDS | frozenset(
+    "next semester semesters course courses after completing completed "
+    "taken took have has i".split()
+)
+
+
+def normalize_course_code(code: str) -> str:
+    """Canonical "DEPT NUM" form: "bioe252" and "BIOE  252" -> "BIOE 252" """
+    match = COURSE_CODE_PATTERN.search(code)
+    if not match:
+        return " ".join(code.upper().split())
+    return f"{match.group(1).upper()} {match.group(2).upper()}"
+
+
+def extract_course_codes(text: str) -> List[str]:
+    """All course codes mentioned in text, normalized, in order of appearance"""
+    return [
+        f"{dept.upper()} {num.upper()}"
+        for dept, num in COURSE_CODE_PATTERN.findall(text)
+    ]
+
+
+# Ways an embedding can reference a course code, in precedence order
+CODE_FEATURES = ("own", "prereqs", "rules", "mentions")
+_FIELD_FEATURES = {"code": "own", "prereqs": "prereqs", "rules": "rules"}
+
+
+def referenced_codes(
+    content_text: str,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, FrozenSet[str]]:
+    """
+    Course codes an embedding references, grouped by CODE_FEATURES.
+
+    Uses the "code:", "prereqs:" and "rules:" lines written by the seeder;
+    any other code in the text counts as a mention. Each code is assigned to
+    exactly one feature (the first that applies).
+    """
+    found: Dict[str, set] = {feature: set() for feature in CODE_FEATURES}
+    if metadata and metadata.get("code"):
+        found["own"].add(normalize_course_code(metadata["code"]))
+
+    for line in content_text.splitlines():
+        field, _, value = line.partition(":")
+        feature = _FIELD_FEATURES.get(field.strip().lower(), "mentions")
+        found[feature].update(extract_course_codes(value if feature != "mentions" else line))
+
+    seen: set = set()
+    features = {}
+    for feature in CODE_FEATURES:
+        features[feature] = frozenset(found[feature] - seen)
+        seen |= found[feature]
+    return features
+
+
+def code_token(code: str) -> str:
+    """Single atomic token for a normalized code ("BIOE 252" -> "bioe252")"""
+    return code.replace(" ", "").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens with course codes kept atomic.
+
+    "MATH 212" becomes "math212" plus the department token "math", so
+    "MATH 21" never matches "MATH 212".
+    """
+    tokens = []
+    for code in extract_course_codes(text):
+        tokens.append(code_token(code))
+        tokens.append(code.split(" ")[0].lower())
+
+    remainder = COURSE_CODE_PATTERN.sub(" ", text).lower()
+    tokens.extend(
+        word for word in WORD_PATTERN.findall(remainder)
+        if len(word) > 1 and word not in STOPWORDS
+    )
+    return tokens
+
+
+def is_code_only_query(query: str) -> bool:
+    """True if the query is just course codes plus filler words"""
+    if not extract_course_codes(query):
+        return False
+    remainder = COURSE_CODE_PATTERN.sub(" ", query).lower()
+    return all(word in QUERY_FILLER_WORDS for word in WORD_PATTERN.findall(remainder))
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, using an inverted index"""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+
+        doc_lengths = np.zeros(self.size, dtype=np.float32)
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for position, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            doc_lengths[position] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term].append((position, tf))
+
+        avg_length = float(doc_lengths.mean()) if self.size else 0.0
+        self._length_norm = k1 * (1 - b + b * doc_lengths / (avg_length or 1.0))
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        for term, entries in postings.items():
+            positions = np.fromiter((p for p, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            df = len(entries)
+            idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            self._postings[term] = (positions, tfs, idf)
+
+    def to_arrays(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Terms plus flat postings arrays, for writing to disk"""
+        terms = list(self._postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(self._postings[term][0]) for term in terms], out=offsets[1:])
+        arrays = {
+            "positions": np.concatenate(
+                [self._postings[term][0] for term in terms]
+            ) if terms else np.empty(0, dtype=np.int64),
+            "tfs": np.concatenate(
+                [self._postings[term][1] for term in terms]
+            ) if terms else np.empty(0, dtype=np.float32),
+            "offsets": offsets,
+            "idf": np.array([self._postings[term][2] for term in terms], dtype=np.float64),
+            "length_norm": self._length_norm,
+        }
+        return terms, arrays
+
+    @classmethod
+    def from_arrays(
+        cls,
+        terms: Sequence[str],
+        arrays: Dict[str, np.ndarray],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """Rebuild from to_arrays() output; postings are views, not copies"""
+        index = cls.__new__(cls)
+        index.k1 = k1
+        index.b = b
+        index._length_norm = arrays["length_norm"]
+        index.size = len(index._length_norm)
+        positions, tfs, offsets, idf = (
+            arrays["positions"], arrays["tfs"], arrays["offsets"], arrays["idf"]
+        )
+        index._postings = {
+            term: (positions[offsets[i]:offsets[i + 1]], tfs[offsets[i]:offsets[i + 1]], float(idf[i]))
+            for i, term in enumerate(terms)
+        }
+        return index
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the postings (arrays plus per-term overhead)"""
+        return self._length_norm.nbytes + sum(
+            positions.nbytes + tfs.nbytes + len(term) + 120
+            for term, (positions, tfs, _) in self._postings.items()
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            positions, tfs, idf = posting
+            scores[positions] += idf * tfs * (self.k1 + 1) / (tfs + self._length_norm[positions])
+        return scores
+
+    def search(self, query: str, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and scores of the best `limit` matching documents"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        order = np.lexsort((matched, -scores[matched]))
+        return matched[order], scores[matched][order]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[Dict[str, Any]]],
+    limit: int,
+    rrf_k: int = None,
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists by reciprocal rank fusion.
+
+    Each result's "distance" becomes 1 - (fused score / best possible score),
+    so lower is still better and prerequisite re-ranking keeps working.
+    """
+    if rrf_k is None:
+        rrf_k = settings.RRF_K
+
+    fused: Dict[int, float] = defaultdict(float)
+    items: Dict[int, Dict[str, Any]] = {}
+    for results in ranked_lists:
+        for rank, result in enumerate(results, start=1):
+            fused[result["id"]] += 1.0 / (rrf_k + rank)
+            items.setdefault(result["id"], result)
+
+    best_possible = len(ranked_lists) / (rrf_k + 1)
+    ranked = sorted(fused.items(), key=lambda item: -item[1])[:limit]
+    merged = []
+    for result_id, score in ranked:
+        result = dict(items[result_id])
+        result["distance"] = 1.0 - score / best_possible
+        merged.append(result)
+    return merged
@@ -0,0 +1,123 @@
+"""
+Database-side vector search via pgvector (Postgres only)
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, bindparam, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Embedding
+
+logger = logging.getLogger("navio")
+
+
+def build_search_query(
+    program_id: str,
+    query_vector: Sequence[float],
+    limit: Optional[int],
+    type: Optional[str] = None,
+    exclude_types: Sequence[str] = (),
+):
+    """SELECT ... ORDER BY vector <=> :query LIMIT :limit for one program"""
+    distance = Embedding.vector.op("<=>", return_type=Float)(
+        bindparam("query_vector", query_vector, type_=Embedding.vector.type)
+    ).label("distance")
+
+    query = (
+        select(Embedding.id, Embedding.type, distance)
+        .where(Embedding.program_id == program_id)
+        .order_by(distance)
+        .limit(limit)
+    )
+    if type is not None:
+        query = query.where(Embedding.type == type)
+    if exclude_types:
+        query = query.where(Embedding.type.notin_(list(exclude_types)))
+    return query
+
+
+def create_vector_index(engine: Engine) -> None:
+    """Create the approximate cosine index used by ORDER BY vector <=> :q"""
+    if settings.PGVECTOR_INDEX == "ivfflat":
+        method = f"ivfflat (vector vector_cosine_ops) WITH (lists = {settings.PGVECTOR_IVFFLAT_LISTS})"
+    else:
+        method = "hnsw (vector vector_cosine_ops)"
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_embeddings_vector_cosine "
+            f"ON embeddings USING {method}"
+        ))
+
+
+class PgvectorSearch:
+    """
+    Ranks embeddings inside Postgres so only the top candidates cross the wire.
+
+    Disabled unless `detect` finds a pgvector `embeddings.vector` column;
+    callers fall back to the in-process index otherwise.
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def detect(self, engine: Engine) -> bool:
+        """Enable database-side search if embeddings.vector is a pgvector column"""
+        self.enabled = False
+        if engine.dialect.name != "postgresql":
+            return False
+
+        try:
+            with engine.connect() as conn:
+                udt_name = conn.execute(text(
+                    "SELECT udt_name FROM information_schema.columns "
+                    "WHERE table_name = 'embeddings' AND column_name = 'vector'"
+                )).scalar()
+            if udt_name == "vector":
+                create_vector_index(engine)
+                self.enabled = True
+        except Exception as e:
+            logger.warning(f"pgvector detection failed, using in-process search: {e}")
+
+        return self.enabled
+
+    def search(
+        self,
+        db: Session,
+        program_id: str,
+        query_vector: Sequence[float],
+        limit: int,
+        quotas: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top `limit` rows as {"id", "type", "distance"}; text is hydrated separately
+
+        With `quotas`, each quota type is ranked by its own query (every row
+        of the type for a negative quota) alongside one for all other types.
+        """
+        if not quotas:
+            queries = [build_search_query(program_id, query_vector, limit)]
+        else:
+            queries = [
+                build_search_query(
+                    program_id, query_vector, None if quota < 0 else limit, type=type_
+                )
+                for type_, quota in quotas.items()
+            ]
+            queries.append(build_search_query(
+                program_id, query_vector, limit, exclude_types=list(quotas)
+            ))
+
+        results = [
+            {"id": row.id, "type": row.type, "distance": float(row.distance)}
+            for query in queries
+            for row in db.execute(query).all()
+        ]
+        results.sort(key=lambda r: r["distance"])
+        return results
+
+
+pgvector_search = PgvectorSearch()
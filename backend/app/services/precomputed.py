@@ -0,0 +1,193 @@
+"""
+Precomputed retrieval results for constant (warm) per-program queries
+"""
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import PrecomputedRetrieval
+from app.models.catalog_version import catalog_version
+from app.services.embedding_cache import normalize_query_text
+
+logger = logging.getLogger("navio")
+
+# Query used when a student has no completed courses
+DEFAULT_QUERY_TEMPLATE = "course recommendations and requirements for {program_id}"
+
+
+# (catalog version, retrieval settings hash)
+StoredFingerprint = Tuple[Optional[str], str]
+
+
+def retrieval_settings_hash() -> str:
+    """Hash of the settings that change which candidates a search returns"""
+    signature = json.dumps({
+        "model": settings.EMBEDDING_MODEL,
+        "reduction": settings.EMBEDDING_REDUCTION,
+        "reduced_dimension": settings.REDUCED_DIMENSION,
+        "mode": settings.RETRIEVAL_MODE,
+        "rrf_k": settings.RRF_K,
+        "quotas": settings.RETRIEVAL_TYPE_QUOTAS,
+        "backend": settings.RETRIEVAL_BACKEND,
+        "nlist": settings.IVF_NLIST,
+        "nprobe": settings.IVF_NPROBE,
+        "quantization": settings.VECTOR_QUANTIZATION,
+        "pq_subvectors": settings.PQ_SUBVECTORS,
+        "rescore_factor": settings.QUANTIZATION_RESCORE_FACTOR,
+        "storage": settings.VECTOR_STORAGE,
+    }, sort_keys=True)
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()[:16]
+
+
+def stored_fingerprint(db: Session, program_id: str) -> StoredFingerprint:
+    """Catalog version plus retrieval settings an entry was computed under"""
+    return catalog_version(db, program_id), retrieval_settings_hash()
+
+
+def warm_queries(program_id: str) -> List[str]:
+    """The default query plus WARM_QUERIES, formatted for the program"""
+    templates = [DEFAULT_QUERY_TEMPLATE] + list(settings.WARM_QUERIES)
+    return list(dict.fromkeys(t.format(program_id=program_id) for t in templates))
+
+
+def is_warm_query(program_id: str, query: str) -> bool:
+    normalized = normalize_query_text(query)
+    return any(normalize_query_text(q) == normalized for q in warm_queries(program_id))
+
+
+def truncate_candidates(
+    candidates: List[Dict[str, Any]],
+    limit: int,
+    quotas: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    The candidates a search with `limit` would have returned
+
+    With type quotas, candidates come from search_partitioned: the top
+    `limit` of each type (all of a type with a negative quota), merged by
+    distance. Reserved types usually sit at the tail, so a plain `[:limit]`
+    would drop them.
+    """
+    if quotas is None:
+        quotas = settings.RETRIEVAL_TYPE_QUOTAS
+    if not quotas:
+        return candidates[:limit]
+
+    kept: Dict[Optional[str], int] = {}
+    truncated = []
+    for candidate in candidates:
+        type_ = candidate.get("type")
+        if quotas.get(type_, 0) >= 0 and kept.get(type_, 0) >= limit:
+            continue
+        kept[type_] = kept.get(type_, 0) + 1
+        truncated.append(candidate)
+    return truncated
+
+
+class PrecomputedResults:
+    """
+    Ranked candidates for warm queries, served without embedding or scoring.
+
+    Entries live in the precomputed_retrievals table (shared by workers and
+    written at seed time) with an in-memory copy per worker. Each entry
+    records the catalog version and retrieval settings it was computed
+    under and is ignored once the program's catalog or those settings
+    (mode, quotas, backend, quantization, ...) change.
+    """
+
+    def __init__(self):
+        self._memory: Dict[Tuple[str, str], Tuple[StoredFingerprint, int, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        db: Session,
+        program_id: str,
+        query: str,
+        limit: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Top `limit` stored candidates, or None if missing or stale"""
+        key = (program_id, normalize_query_text(query))
+        fingerprint = stored_fingerprint(db, program_id)
+
+        entry = self._memory.get(key)
+        if entry is None or entry[0] != fingerprint:
+            row = db.query(PrecomputedRetrieval).filter(
+                PrecomputedRetrieval.program_id == program_id,
+                PrecomputedRetrieval.query_text == key[1],
+            ).first()
+            entry = None
+            if row is not None and tuple(row.fingerprint) == fingerprint:
+                entry = (fingerprint, row.depth, row.candidates)
+                with self._lock:
+                    self._memory[key] = entry
+
+        if entry is None or entry[1] < limit:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # Copies: callers adjust distances while re-ranking
+        return [dict(candidate) for candidate in truncate_candidates(entry[2], limit)]
+
+    def store(
+        self,
+        db: Session,
+        program_id: str,
+        query: str,
+        limit: int,
+        candidates: List[Dict[str, Any]],
+    ) -> None:
+        """Persist ranked candidates ({"id", "type", "distance"}) for a warm query"""
+        key = (program_id, normalize_query_text(query))
+        fingerprint = stored_fingerprint(db, program_id)
+        stored = [
+            {"id": c["id"], "type": c.get("type"), "distance": c["distance"]}
+            for c in candidates
+        ]
+
+        with self._lock:
+            self._memory[key] = (fingerprint, limit, stored)
+
+        try:
+            row = db.query(PrecomputedRetrieval).filter(
+                PrecomputedRetrieval.program_id == program_id,
+                PrecomputedRetrieval.query_text == key[1],
+            ).first()
+            if row is None:
+                row = PrecomputedRetrieval(program_id=program_id, query_text=key[1])
+                db.add(row)
+            row.depth = limit
+            row.candidates = stored
+            row.fingerprint = list(fingerprint)
+            row.created_at = datetime.utcnow()
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Could not store precomputed retrieval: {e}")
+
+    def invalidate(self, program_id: Optional[str] = None) -> None:
+        """Drop in-memory entries (the table is checked against fingerprints)"""
+        with self._lock:
+            if program_id is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k[0] == program_id]:
+                    del self._memory[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+
+precomputed_results = PrecomputedResults()
+metrics_registry.register("precomputed_retrievals", precomputed_results.stats)
@@ -2,6 +2,9 @@
 AI prompt templates for academic advisor
 """
 
+# Bump when the prompts change in a way that should invalidate cached responses
+PROMPT_VERSION = 1
+
 SYSTEM_PROMPT = """You are Navio, an academic advisor AI. Be precise and cautious. Use only the provided catalog and requirement snippets as your source of truth. If a rule is unclear, say so and cite the source_url.
 
 Output a JSON object with:
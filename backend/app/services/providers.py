@@ -0,0 +1,154 @@
+"""
+Shared, pooled OpenAI / Anthropic clients for the whole worker
+"""
+import importlib.util
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
+from openai import AsyncOpenAI, OpenAI
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+
+logger = logging.getLogger("navio")
+
+CLIENT_NAMES = ("openai", "async_openai", "anthropic", "async_anthropic")
+
+
+def http2_enabled() -> bool:
+    """PROVIDER_HTTP2, if the optional h2 package is installed"""
+    return settings.PROVIDER_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def http_options() -> Dict[str, Any]:
+    """Pool limits, timeouts and protocol for provider HTTP clients"""
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PROVIDER_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": httpx.Timeout(
+            settings.PROVIDER_TIMEOUT_SECONDS,
+            connect=settings.PROVIDER_CONNECT_TIMEOUT_SECONDS,
+        ),
+        "http2": http2_enabled(),
+        "follow_redirects": True,
+    }
+
+
+class Providers:
+    """
+    Provider clients shared by every request in the worker.
+
+    Each client owns one keep-alive connection pool, so requests reuse
+    connections (and TLS sessions) instead of building a client per
+    request. Clients are created on first use, or eagerly by `start`, and
+    closed by `aclose` at shutdown; a client used after closing is rebuilt.
+    Pass clients to the constructor to inject fakes.
+    """
+
+    def __init__(
+        self,
+        openai: Optional[OpenAI] = None,
+        async_openai: Optional[AsyncOpenAI] = None,
+        anthropic: Optional[Anthropic] = None,
+        async_anthropic: Optional[AsyncAnthropic] = None,
+    ):
+        self._clients: Dict[str, Any] = {
+            name: client
+            for name, client in zip(CLIENT_NAMES, (openai, async_openai, anthropic, async_anthropic))
+            if client is not None
+        }
+        self._builders: Dict[str, Callable[[], Any]] = {
+            "openai": lambda: OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.PROVIDER_MAX_RETRIES,
+                http_client=httpx.Client(**http_options()),
+            ),
+            "async_openai": lambda: AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.PROVIDER_MAX_RETRIES,
+                http_client=httpx.AsyncClient(**http_options()),
+            ),
+            "anthropic": lambda: Anthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                max_retries=settings.PROVIDER_MAX_RETRIES,
+                http_client=httpx.Client(**http_options()),
+            ),
+            "async_anthropic": lambda: AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                max_retries=settings.PROVIDER_MAX_RETRIES,
+                http_client=httpx.AsyncClient(**http_options()),
+            ),
+        }
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _get(self, name: str) -> Any:
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._builders[name]()
+                self._clients[name] = client
+                self.created += 1
+            return client
+
+    @property
+    def openai(self) -> OpenAI:
+        return self._get("openai")
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        return self._get("async_openai")
+
+    @property
+    def anthropic(self) -> Anthropic:
+        return self._get("anthropic")
+
+    @property
+    def async_anthropic(self) -> AsyncAnthropic:
+        return self._get("async_anthropic")
+
+    def start(self) -> None:
+        """Create the OpenAI clients used on the request path"""
+        self._get("openai")
+        self._get("async_openai")
+
+    async def aclose(self) -> None:
+        """Close every open client and its connection pool"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                if name.startswith("async_"):
+                    await client.close()
+                else:
+                    client.close()
+            except Exception as e:
+                logger.warning(f"Error closing {name} client: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_clients": sorted(self._clients),
+            "created": self.created,
+            "http2": http2_enabled(),
+            "max_connections": settings.PROVIDER_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+            "timeout_seconds": settings.PROVIDER_TIMEOUT_SECONDS,
+        }
+
+
+providers = Providers()
+metrics_registry.register("providers", providers.stats)
+
+
+def get_providers() -> Providers:
+    """FastAPI dependency for the worker's shared clients (override in tests)"""
+    return providers
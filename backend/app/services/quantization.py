@@ -0,0 +1,284 @@
+"""
+Compressed (int8 / product-quantized) embedding codes for low-memory search
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger("navio")
+
+QUANTIZATION_MODES = ("none", "int8", "pq")
+
+
+def full_vectors_path(program_id: str) -> Path:
+    """On-disk float32 matrix used to re-score quantized shortlists"""
+    return Path(settings.INDEX_DIR) / f"{program_id}.f32.npy"
+
+
+def spill_vectors(program_id: str, vectors: np.ndarray) -> np.ndarray:
+    """
+    Write vectors to disk and return a read-only memory map of them
+
+    Only the rows a query re-scores are paged in, so the full-precision
+    matrix does not count against resident memory. Falls back to the
+    in-memory array if the index directory is not writable.
+    """
+    path = full_vectors_path(program_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, vectors)
+        tmp_path.replace(path)
+        return np.load(path, mmap_mode="r")
+    except OSError as e:
+        logger.warning(f"Could not spill vectors for {program_id}, keeping them in memory: {e}")
+        return vectors
+
+
+def allocate_vectors(program_id: str, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Writable float32 matrix for building a program's index
+
+    With quantization on, this is a memory map of a file next to
+    full_vectors_path: rows are written to disk as they are loaded and
+    finish_vectors moves the file into place, so only the compact codes
+    end up resident. Otherwise (or if the index directory is not
+    writable) it is an in-memory array.
+    """
+    if settings.VECTOR_QUANTIZATION != "none" and shape[0] > 0:
+        path = full_vectors_path(program_id)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.build.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=shape)
+        except OSError as e:
+            logger.warning(f"Could not map vectors for {program_id}, building them in memory: {e}")
+    return np.empty(shape, dtype=np.float32)
+
+
+def finish_vectors(program_id: str, vectors: np.ndarray, rows: int) -> np.ndarray:
+    """
+    The first `rows` rows of a matrix from allocate_vectors; a memory map is
+    moved to full_vectors_path and reopened read-only
+    """
+    if not isinstance(vectors, np.memmap):
+        return vectors[:rows]
+
+    tmp_path = Path(vectors.filename)
+    try:
+        if rows < len(vectors):
+            # Rows were skipped: copy the filled part out at its final size
+            return spill_vectors(program_id, vectors[:rows])
+        vectors.flush()
+        tmp_path.replace(full_vectors_path(program_id))
+        return np.load(full_vectors_path(program_id), mmap_mode="r")
+    except OSError as e:
+        logger.warning(f"Could not spill vectors for {program_id}, keeping them in memory: {e}")
+        return np.array(vectors[:rows])
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _blocks(n: int, block: int = 8192):
+    for start in range(0, n, block):
+        yield slice(start, min(start + block, n))
+
+
+class Int8Quantizer:
+    """
+    Symmetric per-dimension scalar quantization to int8 (4x smaller).
+
+    Scores are the inner product of the query with the de-quantized rows,
+    computed block by block so no float copy of the whole matrix is made.
+    """
+
+    mode = "int8"
+
+    def __init__(self, scale: np.ndarray, codes: np.ndarray):
+        self.scale = scale
+        self.codes = codes
+
+    @classmethod
+    def train(cls, vectors: np.ndarray) -> "Int8Quantizer":
+        # Block by block: `vectors` may be a memory map of the whole matrix
+        max_abs = np.zeros(vectors.shape[1], dtype=np.float32) if len(vectors) else np.ones(vectors.shape[1])
+        for rows in _blocks(len(vectors)):
+            np.maximum(max_abs, np.abs(vectors[rows]).max(axis=0), out=max_abs)
+        scale = (np.where(max_abs > 0, max_abs, 1.0) / 127.0).astype(np.float32)
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for rows in _blocks(len(vectors)):
+            codes[rows] = np.clip(np.rint(vectors[rows] / scale), -127, 127)
+        return cls(scale=scale, codes=codes)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scale.nbytes
+
+    def scores(self, query: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Approximate inner products for all rows (or just `positions`)"""
+        codes = self.codes if positions is None else self.codes[positions]
+        scaled = query * self.scale
+        scores = np.empty(len(codes), dtype=np.float32)
+        for rows in _blocks(len(codes)):
+            scores[rows] = codes[rows].astype(np.float32) @ scaled
+        return scores
+
+
+def _kmeans(points: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Plain (Euclidean) k-means centroids for one PQ subspace"""
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest(points, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, points)
+        counts = np.bincount(assignments, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = points[rng.choice(len(points), size=int(empty.sum()))]
+            counts[empty] = 1
+        centroids = sums / counts[:, None]
+    return centroids
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (
+        (centroids ** 2).sum(axis=1)[None, :]
+        - 2 * points @ centroids.T
+    )
+    return distances.argmin(axis=1)
+
+
+class ProductQuantizer:
+    """
+    Product quantization: each vector is split into `m` sub-vectors and
+    each sub-vector is replaced by the id of its nearest of (up to) 256
+    centroids, so a row costs `m` bytes.
+
+    Queries are scored with asymmetric distance computation: one table of
+    query/centroid inner products per subspace, then a lookup-and-sum per row.
+    """
+
+    mode = "pq"
+
+    def __init__(self, codebooks: np.ndarray, codes: np.ndarray):
+        self.codebooks = codebooks  # (m, ksub, dsub)
+        self.codes = codes  # (n, m) uint8
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        m: int = 0,
+        iterations: int = 10,
+        sample: int = 20000,
+        seed: int = 0,
+    ) -> "ProductQuantizer":
+        n, dimension = vectors.shape
+        if m <= 0:
+            m = max(1, dimension // 16)
+        # Sub-vectors must tile the vector exactly
+        while dimension % m:
+            m -= 1
+        dsub = dimension // m
+        ksub = max(1, min(256, n))
+
+        rng = np.random.default_rng(seed)
+        training = vectors[rng.choice(n, size=min(n, sample), replace=False)] if n else vectors
+        codebooks = np.empty((m, ksub, dsub), dtype=np.float32)
+        codes = np.empty((n, m), dtype=np.uint8)
+        for j in range(m):
+            subspace = slice(j * dsub, (j + 1) * dsub)
+            codebooks[j] = _kmeans(np.asarray(training[:, subspace]), ksub, iterations, rng)
+            for rows in _blocks(n):
+                codes[rows, j] = _nearest(np.asarray(vectors[rows, subspace]), codebooks[j])
+        return cls(codebooks=codebooks, codes=codes)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.codebooks.nbytes
+
+    def scores(self, query: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Approximate inner products for all rows (or just `positions`)"""
+        m, _, dsub = self.codebooks.shape
+        tables = np.einsum("mkd,md->mk", self.codebooks, query.reshape(m, dsub))
+        codes = self.codes if positions is None else self.codes[positions]
+        scores = np.zeros(len(codes), dtype=np.float32)
+        for j in range(m):
+            scores += tables[j][codes[:, j]]
+        return scores
+
+
+def train_quantizer(vectors: np.ndarray, mode: Optional[str] = None):
+    """Quantizer for the configured mode, or None for full-precision search"""
+    if mode is None:
+        mode = settings.VECTOR_QUANTIZATION
+    if mode == "int8":
+        return Int8Quantizer.train(vectors)
+    if mode == "pq":
+        return ProductQuantizer.train(vectors, m=settings.PQ_SUBVECTORS)
+    if mode != "none":
+        logger.warning(f"Unknown VECTOR_QUANTIZATION {mode!r}, using full precision")
+    return None
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def estimate_recall(
+    vectors: np.ndarray,
+    quantizer,
+    k: int,
+    rescore_factor: int,
+    sample: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    recall@k of quantized search against exact search on sample queries
+
+    Queries are midpoints of random row pairs. Reports recall of the raw
+    quantized ranking and of the re-scored shortlist (what search returns).
+    """
+    n = len(vectors)
+    if n == 0 or sample <= 0 or k <= 0:
+        return {"k": k, "queries": 0}
+
+    rng = np.random.default_rng(seed)
+    k = min(k, n)
+    raw_hits = rescored_hits = 0
+    for _ in range(sample):
+        query = vectors[rng.integers(n)] + vectors[rng.integers(n)]
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            continue
+        query = query / norm
+
+        exact = set(_top(vectors @ query, k).tolist())
+        approx = quantizer.scores(query)
+        raw_hits += len(exact & set(_top(approx, k).tolist()))
+
+        shortlist = _top(approx, k * rescore_factor)
+        rescored = shortlist[_top(vectors[shortlist] @ query, k)]
+        rescored_hits += len(exact & set(rescored.tolist()))
+
+    return {
+        "k": k,
+        "queries": sample,
+        "quantized": round(raw_hits / (sample * k), 4),
+        "rescored": round(rescored_hits / (sample * k), 4),
+    }
@@ -1,26 +1,173 @@
 """
 RAG service for retrieval and context generation
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import asyncio
+import logging
 import math
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
-from app.models import Embedding, Course, Requirement
+from app.models import Course, Requirement
+from app.services.course_search import search_course_ids
+from app.services.fulltext import fulltext_search
+from app.services.embedding_batcher import embed_texts, get_embedding_batcher
+from app.services.embedding_cache import (
+    load_shared_embedding,
+    query_cache_key,
+    query_embedding_cache,
+    store_shared_embedding,
+)
+from app.services.lexical import (
+    is_code_only_query,
+    normalize_course_code,
+    reciprocal_rank_fusion,
+    referenced_codes,
+)
+from app.services.pgvector_search import pgvector_search
+from app.services.providers import Providers, providers as default_providers
+from app.services.precomputed import (
+    DEFAULT_QUERY_TEMPLATE,
+    is_warm_query,
+    precomputed_results,
+    warm_queries,
+)
+from app.services.reduction import embedding_reducer
+from app.services.vector_index import (
+    ProgramIndex,
+    apply_type_quotas,
+    hydrate_many,
+    hydrate_results,
+    index_registry,
+)
+
+logger = logging.getLogger("navio")
 
 
 class RAGService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, providers: Optional[Providers] = None):
         self.db = db
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.providers = providers if providers is not None else default_providers
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        # Embeddings fetched by generate_embedding_async, reused by the sync path
+        self._prefetched: Dict[str, List[float]] = {}
+
+    @property
+    def client(self) -> OpenAI:
+        """Shared OpenAI client (only resolved when an embedding is needed)"""
+        return self._client if self._client is not None else self.providers.openai
+
+    @client.setter
+    def client(self, client: OpenAI) -> None:
+        self._client = client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        return self._async_client if self._async_client is not None else self.providers.async_openai
+
+    @async_client.setter
+    def async_client(self, client: AsyncOpenAI) -> None:
+        self._async_client = client
 
     def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for query text"""
-        response = self.client.embeddings.create(
-            model=settings.EMBEDDING_MODEL,
-            input=text
-        )
-        return response.data[0].embedding
+        """Generate embedding for query text (served from cache when possible)"""
+        key = query_cache_key(text)
+        vector = self._prefetched.get(key) or query_embedding_cache.get(key)
+        if vector is not None:
+            return vector
+
+        if settings.EMBEDDING_CACHE_SHARED:
+            vector = load_shared_embedding(self.db, key)
+            if vector is not None:
+                query_embedding_cache.set(key, vector)
+                return vector
+
+        if settings.EMBEDDING_BATCH_WINDOW_MS > 0:
+            # Coalesce with concurrent requests from other threads
+            vector = get_embedding_batcher().embed(text)
+        else:
+            response = self.client.embeddings.create(
+                model=settings.EMBEDDING_MODEL,
+                input=text
+            )
+            vector = response.data[0].embedding
+
+        query_embedding_cache.set(key, vector)
+        if settings.EMBEDDING_CACHE_SHARED:
+            store_shared_embedding(self.db, key, vector)
+        return vector
+
+    async def generate_embedding_async(self, text: str) -> List[float]:
+        """
+        generate_embedding without blocking the event loop
+
+        The API call is awaited on the async client (or the shared batcher's
+        future) and database cache reads/writes run in the threadpool. The
+        vector is remembered so a later generate_embedding call reuses it.
+        """
+        key = query_cache_key(text)
+        vector = self._prefetched.get(key) or query_embedding_cache.get(key)
+
+        if vector is None and settings.EMBEDDING_CACHE_SHARED:
+            vector = await run_in_threadpool(load_shared_embedding, self.db, key)
+            if vector is not None:
+                query_embedding_cache.set(key, vector)
+
+        if vector is None:
+            if settings.EMBEDDING_BATCH_WINDOW_MS > 0:
+                vector = await asyncio.wrap_future(get_embedding_batcher().submit(text))
+            else:
+                response = await self.async_client.embeddings.create(
+                    model=settings.EMBEDDING_MODEL,
+                    input=text
+                )
+                vector = response.data[0].embedding
+
+            query_embedding_cache.set(key, vector)
+            if settings.EMBEDDING_CACHE_SHARED:
+                await run_in_threadpool(store_shared_embedding, self.db, key, vector)
+
+        self._prefetched[key] = vector
+        return vector
+
+    def query_vector(self, text: str) -> List[float]:
+        """Query embedding in the stored vector space (after EMBEDDING_REDUCTION)"""
+        return embedding_reducer.reduce(self.db, self.generate_embedding(text))
+
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed several query texts with at most one API call (cache-aware)"""
+        keys = [query_cache_key(text) for text in texts]
+        vectors = [query_embedding_cache.get(key) for key in keys]
+
+        if settings.EMBEDDING_CACHE_SHARED:
+            for i, key in enumerate(keys):
+                if vectors[i] is None:
+                    vectors[i] = load_shared_embedding(self.db, key)
+                    if vectors[i] is not None:
+                        query_embedding_cache.set(key, vectors[i])
+
+        missing = {key: text for key, text, vector in zip(keys, texts, vectors) if vector is None}
+        if missing:
+            fetched = dict(zip(missing, embed_texts(self.client, list(missing.values()))))
+            for key, vector in fetched.items():
+                query_embedding_cache.set(key, vector)
+                if settings.EMBEDDING_CACHE_SHARED:
+                    store_shared_embedding(self.db, key, vector)
+            vectors = [
+                vector if vector is not None else fetched[key]
+                for key, vector in zip(keys, vectors)
+            ]
+        return vectors
+
+    def query_vectors(self, texts: List[str]) -> List[List[float]]:
+        """query_vector for several texts, embedded together"""
+        return [
+            embedding_reducer.reduce(self.db, vector)
+            for vector in self.generate_embeddings(texts)
+        ]
 
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
@@ -61,60 +208,281 @@ class RAGService:
 
         # Create query
         if query is None:
-            query = f"course recommendations and requirements for {program_id}"
-
-        # Generate query embedding
-        query_vector = self.generate_embedding(query)
-
-        # Fetch all embeddings for the program
-        embeddings = self.db.query(Embedding).filter(
-            Embedding.program_id == program_id
-        ).all()
-
-        # Calculate cosine distance for each embedding
-        retrieved = []
-        for emb in embeddings:
-            distance = self.cosine_distance(query_vector, emb.vector)
-            retrieved.append({
-                "id": emb.id,
-                "program_id": emb.program_id,
-                "type": emb.type,
-                "content_text": emb.content_text,
-                "metadata": emb.meta_data,
-                "distance": distance
-            })
-
-        # Sort by distance (lower is better)
-        retrieved.sort(key=lambda x: x["distance"])
-        
-        # Take top k * 2 for re-ranking
-        retrieved = retrieved[:k * 2]
+            query = DEFAULT_QUERY_TEMPLATE.format(program_id=program_id)
+
+        # Take top k * 2 candidates for re-ranking; constant warm queries are
+        # served from precomputed results without embedding or scoring
+        if is_warm_query(program_id, query):
+            retrieved = precomputed_results.get(self.db, program_id, query, k * 2)
+            if retrieved is None:
+                retrieved = self._candidates(program_id, query, k * 2)
+                precomputed_results.store(self.db, program_id, query, k * 2, retrieved)
+        else:
+            retrieved = self._candidates(program_id, query, k * 2)
+
+        # Re-rank based on prerequisite matches (code sets come from the
+        # index; without one, e.g. on pgvector, the candidates' text is needed)
+        index = index_registry.peek(program_id)
+        if completed_courses and index is None:
+            retrieved = hydrate_results(self.db, retrieved)
+        retrieved = self._rerank_by_prereqs(retrieved, completed_courses, index)
+
+        # Fetch text and metadata for the top k after re-ranking
+        return hydrate_results(self.db, apply_type_quotas(retrieved, k))
+
+    async def retrieve_context_async(
+        self,
+        program_id: str,
+        completed_courses: List[str],
+        query: str = None,
+        k: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        retrieve_context for async handlers
+
+        The query embedding is awaited first; index scoring, re-ranking and
+        database reads then run in the threadpool, so neither the network
+        wait nor the CPU work holds up the event loop.
+        """
+        if query is None:
+            query = DEFAULT_QUERY_TEMPLATE.format(program_id=program_id)
+
+        # Warm and lexically answered queries may never need an embedding
+        lexical = settings.LEXICAL_FAST_PATH and is_code_only_query(query)
+        if not lexical and not is_warm_query(program_id, query):
+            await self.generate_embedding_async(query)
+
+        return await run_in_threadpool(
+            self.retrieve_context, program_id, completed_courses, query, k
+        )
+
+    def retrieve_context_many(
+        self,
+        program_id: str,
+        completed_courses: List[List[str]],
+        queries: Optional[List[Optional[str]]] = None,
+        k: int = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve context for several students in the same program at once
+
+        All queries are embedded in one API call and scored against the
+        program's index with one matrix-matrix product; re-ranking uses each
+        student's own completed courses.
+
+        Args:
+            program_id: Filter by program
+            completed_courses: Completed course codes, one list per student
+            queries: Query text per student (None entries use the generic query)
+            k: Number of results to return per student (default from settings)
+        """
+        if k is None:
+            k = settings.RETRIEVAL_K
+        if queries is None:
+            queries = [None] * len(completed_courses)
+        if len(queries) != len(completed_courses):
+            raise ValueError("queries and completed_courses must have the same length")
+
+        queries = [
+            query if query is not None else DEFAULT_QUERY_TEMPLATE.format(program_id=program_id)
+            for query in queries
+        ]
 
-        # Re-rank based on prerequisite matches
-        retrieved = self._rerank_by_prereqs(retrieved, completed_courses)
+        # Warm queries come from precomputed results; the rest share one pass
+        retrieved: List[Optional[List[Dict[str, Any]]]] = [
+            precomputed_results.get(self.db, program_id, query, k * 2)
+            if is_warm_query(program_id, query) else None
+            for query in queries
+        ]
+        pending = [i for i, results in enumerate(retrieved) if results is None]
+        candidates = self._candidates_many(program_id, [queries[i] for i in pending], k * 2)
+        for i, results in zip(pending, candidates):
+            retrieved[i] = results
+            if is_warm_query(program_id, queries[i]):
+                precomputed_results.store(self.db, program_id, queries[i], k * 2, results)
 
-        # Return top k after re-ranking
-        return retrieved[:k]
+        index = index_registry.peek(program_id)
+        if index is None and any(completed_courses):
+            retrieved = hydrate_many(self.db, retrieved)
+        reranked = [
+            apply_type_quotas(self._rerank_by_prereqs(results, completed, index), k)
+            for results, completed in zip(retrieved, completed_courses)
+        ]
+
+        # One query fetches text and metadata for every student's top k
+        return hydrate_many(self.db, reranked)
+
+    def precompute_warm_queries(self, program_id: str, k: int = None) -> int:
+        """Compute and store results for the program's warm queries"""
+        if k is None:
+            k = settings.RETRIEVAL_K
+
+        queries = warm_queries(program_id)
+        for query in queries:
+            retrieved = self._candidates(program_id, query, k * 2)
+            precomputed_results.store(self.db, program_id, query, k * 2, retrieved)
+        return len(queries)
+
+    def _candidates(
+        self,
+        program_id: str,
+        query: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Candidate results according to RETRIEVAL_MODE / LEXICAL_FAST_PATH"""
+        if settings.LEXICAL_FAST_PATH and is_code_only_query(query):
+            # Lists of course codes are answered lexically, without an embedding call
+            retrieved = self._lexical_candidates(program_id, query, limit)
+            if retrieved:
+                return retrieved
+
+        retrieved = self._vector_candidates(program_id, query, limit)
+        if settings.RETRIEVAL_MODE == "hybrid":
+            lexical = self._lexical_candidates(program_id, query, limit)
+            # Partitioned (quota) candidates may exceed limit; keep them all
+            retrieved = reciprocal_rank_fusion([retrieved, lexical], max(limit, len(retrieved)))
+        return retrieved
+
+    def _candidates_many(
+        self,
+        program_id: str,
+        queries: List[str],
+        limit: int
+    ) -> List[List[Dict[str, Any]]]:
+        """_candidates for several queries, sharing the embedding call and scoring"""
+        retrieved: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        if settings.LEXICAL_FAST_PATH:
+            for i, query in enumerate(queries):
+                if is_code_only_query(query):
+                    retrieved[i] = self._lexical_candidates(program_id, query, limit) or None
+
+        pending = [i for i, results in enumerate(retrieved) if results is None]
+        vector_results = self._vector_candidates_many(
+            program_id, [queries[i] for i in pending], limit
+        )
+        for i, results in zip(pending, vector_results):
+            if settings.RETRIEVAL_MODE == "hybrid":
+                lexical = self._lexical_candidates(program_id, queries[i], limit)
+                results = reciprocal_rank_fusion([results, lexical], max(limit, len(results)))
+            retrieved[i] = results
+        return retrieved
+
+    def _lexical_candidates(
+        self,
+        program_id: str,
+        query: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Best BM25 matches over the program's content_text"""
+        index = index_registry.get(self.db, program_id)
+        return index.lexical_search(query, limit)
+
+    def _vector_candidates(
+        self,
+        program_id: str,
+        query: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Nearest embeddings by cosine distance, ranked in Postgres when possible"""
+        query_vector = None
+        if pgvector_search.enabled:
+            query_vector = self.query_vector(query)
+            if len(query_vector) == settings.STORED_EMBEDDING_DIMENSION:
+                try:
+                    return pgvector_search.search(
+                        self.db, program_id, query_vector, limit,
+                        quotas=settings.RETRIEVAL_TYPE_QUOTAS,
+                    )
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    logger.warning(f"pgvector search failed, scoring in-process: {e}")
+
+        # Load (or reuse) the program's in-memory embedding index
+        index = index_registry.get(self.db, program_id)
+        if len(index) == 0:
+            return []
+
+        if query_vector is None:
+            query_vector = self.query_vector(query)
+        if settings.RETRIEVAL_TYPE_QUOTAS:
+            return index.search_partitioned(query_vector, limit, settings.RETRIEVAL_TYPE_QUOTAS)
+        return index.search(query_vector, limit)
+
+    def _vector_candidates_many(
+        self,
+        program_id: str,
+        queries: List[str],
+        limit: int
+    ) -> List[List[Dict[str, Any]]]:
+        """_vector_candidates for several queries with one embedding call"""
+        if not queries:
+            return []
+
+        query_vectors = None
+        if pgvector_search.enabled:
+            query_vectors = self.query_vectors(queries)
+            if all(len(v) == settings.STORED_EMBEDDING_DIMENSION for v in query_vectors):
+                try:
+                    return [
+                        pgvector_search.search(
+                            self.db, program_id, vector, limit,
+                            quotas=settings.RETRIEVAL_TYPE_QUOTAS,
+                        )
+                        for vector in query_vectors
+                    ]
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    logger.warning(f"pgvector search failed, scoring in-process: {e}")
+
+        index = index_registry.get(self.db, program_id)
+        if len(index) == 0:
+            return [[] for _ in queries]
+
+        if query_vectors is None:
+            query_vectors = self.query_vectors(queries)
+        if settings.RETRIEVAL_TYPE_QUOTAS:
+            return [
+                index.search_partitioned(vector, limit, settings.RETRIEVAL_TYPE_QUOTAS)
+                for vector in query_vectors
+            ]
+        return index.search_many(query_vectors, limit)
 
     def _rerank_by_prereqs(
         self,
         results: List[Dict[str, Any]],
-        completed_courses: List[str]
+        completed_courses: List[str],
+        index: Optional[ProgramIndex] = None
     ) -> List[Dict[str, Any]]:
-        """Re-rank results by exact course code matches"""
+        """
+        Re-rank results by exact course code matches
+
+        Each completed course referenced by a result reduces its distance by
+        the weight of the feature it appears in (own code, prerequisite,
+        requirement rule, or other mention). Code sets come pre-extracted
+        from the program index when available.
+        """
         if not completed_courses:
             return results
 
-        # Boost score for courses that have prerequisites in completed list
-        for result in results:
-            boost = 0
-            content = result["content_text"].lower()
+        completed = {normalize_course_code(code) for code in completed_courses}
+        weights = {
+            "own": settings.RERANK_OWN_CODE_BOOST,
+            "prereqs": settings.RERANK_PREREQ_BOOST,
+            "rules": settings.RERANK_RULE_BOOST,
+            "mentions": settings.RERANK_MENTION_BOOST,
+        }
 
-            # Check for exact course code matches
-            for completed in completed_courses:
-                if completed.lower() in content:
-                    boost += 0.1  # Reduce distance (better ranking)
+        for result in results:
+            features = index.features_for(result["id"]) if index is not None else None
+            if features is None and "content_text" in result:
+                features = referenced_codes(result["content_text"], result["metadata"])
+            if features is None:
+                continue
 
+            boost = sum(
+                weights[feature] * len(completed & codes)
+                for feature, codes in features.items()
+            )
             result["distance"] = max(0, result["distance"] - boost)
 
         # Re-sort by adjusted distance
@@ -132,13 +500,28 @@ class RAGService:
         self,
         program_id: str,
         query: str,
-        limit: int = 10
+        limit: int = 10,
+        mode: str = "fuzzy"
     ) -> List[Course]:
-        """Fuzzy search for courses"""
-        return self.db.query(Course).filter(
-            Course.program_id == program_id,
-            (Course.code.ilike(f"%{query}%") | Course.title.ilike(f"%{query}%"))
-        ).limit(limit).all()
+        """
+        Search for courses, best match first
+
+        "fuzzy" ranks codes and titles by trigram similarity; "fulltext"
+        ranks code, title, description and tags with the database's
+        full-text index (falling back to fuzzy where there is none).
+        """
+        ids = None
+        if mode == "fulltext":
+            ids = fulltext_search.search(self.db, program_id, query, limit)
+        if ids is None:
+            ids = search_course_ids(self.db, program_id, query, limit)
+        if not ids:
+            return []
+        courses = {
+            course.id: course
+            for course in self.db.query(Course).filter(Course.id.in_(ids)).all()
+        }
+        return [courses[id_] for id_ in ids if id_ in courses]
 
     def format_context_snippets(
         self,
@@ -0,0 +1,161 @@
+"""
+Dimensionality reduction of embeddings (Matryoshka truncation or PCA)
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import EmbeddingProjection
+
+logger = logging.getLogger("navio")
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class Projection:
+    """
+    Maps model-dimension embeddings to `dimension` unit vectors.
+
+    "truncate" keeps the leading dimensions (text-embedding-3-* models are
+    trained so prefixes remain meaningful); "pca" centers on the catalog mean
+    and projects onto the top principal components.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        dimension: int,
+        mean: Optional[np.ndarray] = None,
+        components: Optional[np.ndarray] = None,
+    ):
+        self.method = method
+        self.dimension = dimension
+        self.mean = mean
+        self.components = components
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, method: str, dimension: int) -> "Projection":
+        """Projection for `method`; PCA is fitted on the given catalog vectors"""
+        if method == "truncate":
+            return cls(method, dimension)
+        if method != "pca":
+            raise ValueError(f"Unknown embedding reduction {method!r}")
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        components = np.zeros((dimension, vectors.shape[1]), dtype=np.float32)
+        available = min(dimension, len(vt))
+        components[:available] = vt[:available]
+        if available < dimension:
+            logger.warning(
+                f"Only {available} principal components for {len(vectors)} vectors; "
+                f"padding to {dimension} dimensions"
+            )
+        return cls(method, dimension, mean=mean.astype(np.float32), components=components)
+
+    def apply(self, vectors: Sequence[float]) -> np.ndarray:
+        """Reduce one vector (1-D) or many (2-D) to unit-length float32"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.method == "truncate":
+            reduced = vectors[..., :self.dimension]
+        else:
+            reduced = (vectors - self.mean) @ self.components.T
+        return _unit(reduced.astype(np.float32))
+
+
+def save_projection(db: Session, projection: Projection) -> None:
+    """Replace the stored PCA projection (truncation needs nothing stored)"""
+    db.query(EmbeddingProjection).delete()
+    if projection.method == "pca":
+        db.add(EmbeddingProjection(
+            method=projection.method,
+            model=settings.EMBEDDING_MODEL,
+            source_dimension=projection.components.shape[1],
+            dimension=projection.dimension,
+            mean=projection.mean.astype("<f4").tobytes(),
+            components=projection.components.astype("<f4").tobytes(),
+            created_at=datetime.utcnow(),
+        ))
+    db.commit()
+
+
+ProjectionVersion = Optional[Tuple[int, datetime]]
+
+
+def projection_version(db: Session) -> ProjectionVersion:
+    """(id, created_at) of the stored projection: a cheap check for re-seeds"""
+    row = db.query(
+        EmbeddingProjection.id, EmbeddingProjection.created_at
+    ).order_by(EmbeddingProjection.id.desc()).first()
+    return (row.id, row.created_at) if row is not None else None
+
+
+def load_projection(db: Session) -> Optional[Projection]:
+    """The stored PCA projection, or None if the catalog was not fitted"""
+    row = db.query(EmbeddingProjection).order_by(EmbeddingProjection.id.desc()).first()
+    if row is None:
+        return None
+    return Projection(
+        method=row.method,
+        dimension=row.dimension,
+        mean=np.frombuffer(row.mean, dtype="<f4"),
+        components=np.frombuffer(row.components, dtype="<f4").reshape(
+            row.dimension, row.source_dimension
+        ),
+    )
+
+
+class EmbeddingReducer:
+    """
+    Applies the configured reduction to query embeddings.
+
+    The PCA projection is read from the database once per worker and kept
+    while the stored row's version is unchanged, so a re-seed from any
+    worker (or the seed script) is picked up everywhere; `invalidate` drops
+    it immediately.
+    """
+
+    def __init__(self):
+        self._projection: Optional[Projection] = None
+        self._version: ProjectionVersion = None
+        self._lock = threading.Lock()
+
+    def projection(self, db: Session) -> Optional[Projection]:
+        method = settings.EMBEDDING_REDUCTION
+        if method == "none":
+            return None
+        if method == "truncate":
+            return Projection(method, settings.STORED_EMBEDDING_DIMENSION)
+
+        version = projection_version(db)
+        with self._lock:
+            if self._projection is None or version != self._version:
+                self._projection = load_projection(db)
+                self._version = version
+                if self._projection is None:
+                    logger.warning("EMBEDDING_REDUCTION is 'pca' but no projection is stored; re-seed")
+            return self._projection
+
+    def reduce(self, db: Session, vector: Sequence[float]) -> Sequence[float]:
+        """Project a raw model embedding into the stored vector space"""
+        projection = self.projection(db)
+        if projection is None:
+            return vector
+        return projection.apply(vector).tolist()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._projection = None
+            self._version = None
+
+
+embedding_reducer = EmbeddingReducer()
@@ -0,0 +1,148 @@
+"""
+Caching for recommendation responses (per-worker LRU + optional shared database tier)
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import RecommendationCacheEntry
+from app.models.catalog_version import catalog_version
+from app.schemas.recommend import RecommendRequest
+from app.services.lexical import normalize_course_code
+from app.services.prompts import PROMPT_VERSION, SYSTEM_PROMPT
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger("navio")
+
+
+def canonical_request(request: RecommendRequest) -> Dict[str, Any]:
+    """
+    The parts of a request that determine the response, in canonical form
+
+    Completed courses are a sorted set of normalized codes, so order,
+    duplicates, case and spacing do not produce different keys.
+    """
+    return {
+        "university": " ".join(request.university.split()).casefold(),
+        "program_id": request.program_id,
+        "track": " ".join(request.track.split()).casefold() if request.track else None,
+        "completed": sorted({normalize_course_code(code) for code in request.completed}),
+        "credits_target": request.credits_target,
+        "preferences": request.preferences,
+    }
+
+
+def model_version() -> str:
+    """Chat model plus prompt version; a prompt edit changes every key"""
+    prompt_hash = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+    return f"{settings.OPENAI_MODEL}:{PROMPT_VERSION}:{prompt_hash}"
+
+
+def response_cache_key(request: RecommendRequest, catalog: Optional[str]) -> str:
+    """sha256 of the canonical request, catalog version and model version"""
+    payload = json.dumps(
+        {"request": canonical_request(request), "catalog": catalog, "model": model_version()},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(response: Dict[str, Any]) -> bool:
+    """Failed generations (no recommendations, an error warning) are not cached"""
+    return bool(response.get("recommendations")) or not any(
+        warning.startswith("Error generating recommendations")
+        for warning in response.get("warnings", [])
+    )
+
+
+class ResponseCache:
+    """
+    Recommendation responses keyed by `response_cache_key`.
+
+    Entries are held in a bounded LRU with TTL per worker and, with
+    RECOMMEND_CACHE_SHARED, in the recommendation_cache table so every
+    worker can serve them. Keys include the catalog version, so entries
+    from before a re-seed are never served; seeding also clears both tiers.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.memory: TTLCache[str, Dict[str, Any]] = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.shared_hits = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.max_size > 0
+
+    def key(self, db: Session, request: RecommendRequest) -> str:
+        return response_cache_key(request, catalog_version(db, request.program_id))
+
+    def get(self, db: Session, key: str) -> Optional[Dict[str, Any]]:
+        response = self.memory.get(key)
+        if response is not None or not settings.RECOMMEND_CACHE_SHARED:
+            return response
+
+        row = db.query(RecommendationCacheEntry).filter(
+            RecommendationCacheEntry.key_hash == key
+        ).first()
+        if row is None:
+            return None
+        if datetime.utcnow() - row.created_at > timedelta(seconds=self.memory.ttl_seconds):
+            return None
+
+        self.shared_hits += 1
+        self.memory.set(key, row.response)
+        return row.response
+
+    def store(self, db: Session, key: str, program_id: str, response: Dict[str, Any]) -> None:
+        if not self.enabled or not is_cacheable(response):
+            return
+
+        self.memory.set(key, response)
+        self.stores += 1
+        if not settings.RECOMMEND_CACHE_SHARED:
+            return
+
+        try:
+            row = db.query(RecommendationCacheEntry).filter(
+                RecommendationCacheEntry.key_hash == key
+            ).first()
+            if row is None:
+                row = RecommendationCacheEntry(key_hash=key, program_id=program_id)
+                db.add(row)
+            row.response = response
+            row.created_at = datetime.utcnow()
+            db.commit()
+        except SQLAlchemyError as e:
+            # Another worker may have inserted the same key first
+            db.rollback()
+            logger.warning(f"Could not store shared recommendation response: {e}")
+
+    def invalidate(self) -> None:
+        """Drop in-memory entries (the seed script clears the shared table)"""
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.stats(),
+            "ttl_seconds": self.memory.ttl_seconds,
+            "shared": settings.RECOMMEND_CACHE_SHARED,
+            "shared_hits": self.shared_hits,
+            "stores": self.stores,
+        }
+
+
+response_cache = ResponseCache(
+    max_size=settings.RECOMMEND_CACHE_SIZE,
+    ttl_seconds=settings.RECOMMEND_CACHE_TTL_SECONDS,
+)
+metrics_registry.register("recommend_cache", response_cache.stats)
@@ -0,0 +1,87 @@
+"""
+Single-flight coalescing of identical in-flight async calls
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from app.core.metrics import metrics_registry
+
+logger = logging.getLogger("navio")
+
+T = TypeVar("T")
+
+
+class Flight:
+    """One running call and the number of requests awaiting it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+
+    The first caller for a key (the leader) starts `fn` as a task, and
+    callers arriving while it runs await the same task. Every waiter gets
+    the result or the exception. The key is released when the task
+    finishes, so the next call after an error tries again. A cancelled
+    waiter only stops waiting; the task itself is cancelled once no
+    waiters are left.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            flight = Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelling this waiter must not cancel the shared task
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: str, flight: Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.cancelled():
+            self.cancelled += 1
+        elif flight.task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+        }
+
+
+recommendation_flights = SingleFlight()
+metrics_registry.register("recommend_single_flight", recommendation_flights.stats)
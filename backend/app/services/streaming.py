@@ -0,0 +1,144 @@
+"""
+Incremental parsing of streamed recommendation JSON, plus streaming metrics
+"""
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.metrics import metrics_registry
+
+logger = logging.getLogger("navio")
+
+
+class RecommendationStreamParser:
+    """
+    Incremental JSON scanner over the model's token stream.
+
+    Tracks nesting and string state character by character and returns
+    each object in the top-level "recommendations" array as soon as its
+    closing brace arrives, without waiting for the rest of the document.
+    The complete text is kept for the final parse of notes, assumptions
+    and warnings.
+    """
+
+    ARRAY_KEY = "recommendations"
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._object: List[str] = []  # Characters of the recommendation being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string: List[str] = []  # Current top-level string (a candidate key)
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._in_array = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; returns the recommendations it completed"""
+        self._chunks.append(chunk)
+        completed = []
+        for char in chunk:
+            if self._object:
+                self._object.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = "".join(self._string)
+                if self._depth == 1 and self._in_string:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._key == self.ARRAY_KEY:
+                    self._in_array = True
+                elif char == "{" and self._depth == 2 and self._in_array:
+                    self._object = ["{"]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == 2 and self._object:
+                    recommendation = self._complete_object()
+                    if recommendation is not None:
+                        completed.append(recommendation)
+                elif char == "]" and self._depth == 1:
+                    self._in_array = False
+        return completed
+
+    def _complete_object(self) -> Optional[Dict[str, Any]]:
+        text, self._object = "".join(self._object), []
+        try:
+            value = json.loads(text)
+        except ValueError as e:
+            logger.warning(f"Skipping unparseable streamed recommendation: {e}")
+            return None
+        return value if isinstance(value, dict) else None
+
+
+class StreamMetrics:
+    """Counters and time-to-first-recommendation for streamed responses"""
+
+    def __init__(self, window: int = 1000):
+        self._first: Deque[float] = deque(maxlen=window)
+        self._total: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.recommendations = 0
+        self.errors = 0
+
+    def record(
+        self,
+        first_recommendation_seconds: Optional[float],
+        total_seconds: float,
+        recommendations: int,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            self.streams += 1
+            self.recommendations += recommendations
+            self.errors += int(error)
+            if first_recommendation_seconds is not None:
+                self._first.append(first_recommendation_seconds)
+            self._total.append(total_seconds)
+
+    @staticmethod
+    def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+        if not values:
+            return {"p50": None, "p95": None}
+        values = sorted(values)
+        return {
+            "p50": round(values[len(values) // 2], 4),
+            "p95": round(values[min(len(values) - 1, int(0.95 * len(values)))], 4),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            first, total = list(self._first), list(self._total)
+            return {
+                "streams": self.streams,
+                "recommendations": self.recommendations,
+                "errors": self.errors,
+                "time_to_first_recommendation_seconds": self._percentiles(first),
+                "total_seconds": self._percentiles(total),
+            }
+
+
+stream_metrics = StreamMetrics()
+metrics_registry.register("recommend_stream", stream_metrics.stats)
@@ -0,0 +1,674 @@
+"""
+In-memory vector index for program embeddings
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.models import Embedding
+from app.models.catalog_version import catalog_version
+from app.services.ann import IVFIndex, ann_index_path
+from app.services.lexical import BM25Index, referenced_codes
+from app.services.quantization import (
+    allocate_vectors,
+    estimate_recall,
+    finish_vectors,
+    spill_vectors,
+    train_quantizer,
+)
+
+logger = logging.getLogger("navio")
+
+# Embedding rows fetched per round trip while building an index
+BUILD_BATCH_ROWS = 1000
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length in place (zero rows are left as-is)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class ProgramIndex:
+    """
+    Pre-normalized float32 embedding matrix for a single program.
+
+    Rows of `vectors` line up with `ids`, `types` and `code_features`, so a
+    search is one matrix-vector product followed by a top-k selection. Text
+    and metadata are not held in memory: searches return ids, types and
+    distances, and `hydrate_results` fetches content for the winners only.
+
+    Rows are grouped by type into partitions that can be searched on their
+    own. Partitions of at most PARTITION_CACHE_MAX_ROWS rows (typically the
+    requirements) keep their hydrated rows in memory.
+
+    With VECTOR_QUANTIZATION set, rows are scored on compact codes and only a
+    shortlist is re-scored against the full-precision (memory-mapped) matrix.
+    """
+
+    def __init__(
+        self,
+        program_id: str,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        types: List[str],
+        version: Optional[str],
+        code_features: Optional[List[Dict[str, FrozenSet[str]]]] = None,
+        lexical: Optional[BM25Index] = None,
+        cached_rows: Optional[Dict[int, Dict[str, Any]]] = None,
+    ):
+        self.program_id = program_id
+        self.ids = ids
+        self.vectors = vectors
+        self.types = types
+        self.version = version  # Catalog version the index was built from
+        # Course codes each row references, for exact-match re-ranking
+        self.code_features = code_features or []
+        self.lexical = lexical
+        self._positions = {int(row_id): i for i, row_id in enumerate(ids)}
+        # Row positions of each type, in row order
+        self.partitions: Dict[str, np.ndarray] = {
+            type_: np.flatnonzero(np.asarray(types) == type_)
+            for type_ in dict.fromkeys(types)
+        }
+        # Hydrated rows of small partitions, keyed by id
+        self.cached_rows = cached_rows or {}
+        self.ann: Optional[IVFIndex] = None
+        self.quantizer = None
+        self.recall: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    @classmethod
+    def build(
+        cls,
+        db: Session,
+        program_id: str,
+        version: Optional[str] = None,
+    ) -> "ProgramIndex":
+        """
+        Load every embedding for the program into a contiguous matrix
+
+        Rows are streamed from the database in batches and written straight
+        into the matrix, which with VECTOR_QUANTIZATION set is the
+        memory-mapped full-precision file, so the build never holds a full
+        float32 copy in memory. Text is read once here to extract course
+        codes and build the BM25 index, then dropped (except for small
+        partitions). Rows are ordered by type so each partition is a
+        contiguous block of the matrix.
+        """
+        if version is None:
+            version = catalog_version(db, program_id)
+
+        type_counts = dict(
+            db.query(Embedding.type, func.count(Embedding.id)).filter(
+                Embedding.program_id == program_id
+            ).group_by(Embedding.type).all()
+        )
+        rows = db.query(
+            Embedding.id,
+            Embedding.type,
+            Embedding.vector,
+            Embedding.content_text,
+            Embedding.meta_data,
+        ).filter(
+            Embedding.program_id == program_id
+        ).order_by(Embedding.type, Embedding.id).yield_per(BUILD_BATCH_ROWS)
+
+        vectors: Optional[np.ndarray] = None
+        ids: List[int] = []
+        types: List[str] = []
+        texts: List[str] = []
+        code_features = []
+        cached_rows: Dict[int, Dict[str, Any]] = {}
+        skipped = 0
+        for row in rows:
+            if vectors is None:
+                vectors = allocate_vectors(
+                    program_id, (sum(type_counts.values()), len(row.vector))
+                )
+            if len(row.vector) != vectors.shape[1]:
+                skipped += 1
+                continue
+
+            vector = np.asarray(row.vector, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            vectors[len(ids)] = vector / norm if norm > 0 else vector
+            ids.append(row.id)
+            types.append(row.type)
+            texts.append(row.content_text)
+            code_features.append(referenced_codes(row.content_text, row.meta_data))
+            if type_counts.get(row.type, 0) <= settings.PARTITION_CACHE_MAX_ROWS:
+                cached_rows[row.id] = {
+                    "id": row.id,
+                    "program_id": program_id,
+                    "type": row.type,
+                    "content_text": row.content_text,
+                    "metadata": row.meta_data,
+                }
+
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} embeddings with unexpected dimension for {program_id}"
+            )
+        if vectors is None:
+            vectors = np.empty((0, 0), dtype=np.float32)
+
+        return cls(
+            program_id=program_id,
+            ids=np.asarray(ids, dtype=np.int64),
+            vectors=finish_vectors(program_id, vectors, len(ids)),
+            types=types,
+            version=version,
+            code_features=code_features,
+            lexical=BM25Index(texts),
+            cached_rows=cached_rows,
+        )
+
+    def prepare_ann(self) -> None:
+        """Load (or train and persist) the IVF index when the ANN backend applies"""
+        if settings.RETRIEVAL_BACKEND != "ivf" or len(self) < settings.ANN_MIN_VECTORS:
+            self.ann = None
+            return
+
+        path = ann_index_path(self.program_id)
+        ann = IVFIndex.load(path)
+        if ann is None or not ann.matches(self.ids):
+            ann = IVFIndex.train(self.ids, self.vectors, settings.IVF_NLIST)
+            ann.save(path)
+            logger.info(
+                f"Trained IVF index for {self.program_id} ({ann.nlist} lists)"
+            )
+        self.ann = ann
+
+    def prepare_quantization(self) -> None:
+        """Encode vectors for quantized search and memory-map the full-precision matrix"""
+        self.quantizer = None
+        self.recall = None
+        if settings.VECTOR_QUANTIZATION == "none" or len(self) == 0:
+            return
+
+        self.quantizer = train_quantizer(self.vectors)
+        if self.quantizer is None:
+            return
+        self.recall = estimate_recall(
+            self.vectors,
+            self.quantizer,
+            k=settings.RETRIEVAL_K,
+            rescore_factor=settings.QUANTIZATION_RESCORE_FACTOR,
+            sample=settings.QUANTIZATION_RECALL_SAMPLE,
+        )
+        if not isinstance(self.vectors, np.memmap):
+            self.vectors = spill_vectors(self.program_id, self.vectors)
+        logger.info(
+            f"Quantized {self.program_id} vectors ({self.quantizer.mode}, "
+            f"{self.quantizer.bytes_per_vector} bytes/vector, recall@k {self.recall})"
+        )
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        exact: bool = False,
+        type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the k nearest rows as {"id", "type", "distance"} (lower is better)
+
+        Only rows of `type` are considered when it is given. Uses the IVF
+        index and/or quantized codes when attached, unless `exact` is set
+        (e.g. to validate approximate results).
+        """
+        partition = None if type is None else self.partitions.get(type)
+        if len(self) == 0 or k <= 0 or (type is not None and partition is None):
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if query.shape != (self.dimension,) or norm == 0:
+            # Mirrors cosine_similarity: mismatched or empty vectors score 0
+            positions = np.arange(len(self)) if partition is None else partition
+            scores = np.zeros(len(positions), dtype=np.float32)
+        else:
+            query = query / norm
+            positions = partition
+            if self.ann is not None and not exact:
+                probed = self.ann.probe(query)
+                if partition is not None:
+                    probed = probed[np.isin(probed, partition)]
+                if len(probed) >= k:
+                    positions = probed  # Otherwise the lists are too small: scan everything
+            if self.quantizer is not None and not exact:
+                positions = self._shortlist(query, k, positions)
+                scores = self.vectors[positions] @ query
+            elif positions is not None:
+                scores = self._score(positions, query)
+            else:
+                positions = np.arange(len(self))
+                scores = self.vectors @ query
+
+        return self._ranked(positions, scores, k)
+
+    def search_partitioned(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        quotas: Dict[str, int],
+    ) -> List[Dict[str, Any]]:
+        """
+        Search each type partition independently and merge by distance
+
+        Every partition contributes its own top k, so a type can't be
+        crowded out of the candidates. Partitions with a negative quota
+        contribute every row. Cached partitions come back hydrated.
+        """
+        merged = []
+        for type_, partition in self.partitions.items():
+            limit = len(partition) if quotas.get(type_, 0) < 0 else k
+            for result in self.search(query_vector, limit, type=type_):
+                cached = self.cached_rows.get(result["id"])
+                merged.append({**cached, "distance": result["distance"]} if cached else result)
+        merged.sort(key=lambda r: r["distance"])
+        return merged
+
+    def _score(self, positions: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Scores of the given rows (a slice when they are contiguous, avoiding a copy)"""
+        # IVF probes are grouped by list, not sorted: only ascending runs are slices
+        if len(positions) and np.all(np.diff(positions) == 1):
+            return self.vectors[positions[0]:positions[-1] + 1] @ query
+        return self.vectors[positions] @ query
+
+    def search_many(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int,
+        exact: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Return the k nearest rows for each query, in query order
+
+        Exact search scores every query with one matrix-matrix product;
+        approximate (IVF / quantized) indexes are searched query by query.
+        """
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in query_vectors]
+        if (self.ann is not None or self.quantizer is not None) and not exact:
+            return [self.search(query, k) for query in query_vectors]
+
+        queries = np.zeros((len(query_vectors), self.dimension), dtype=np.float32)
+        for i, query in enumerate(query_vectors):
+            query = np.asarray(query, dtype=np.float32)
+            if query.shape == (self.dimension,):
+                queries[i] = query
+        # Mismatched or empty queries stay zero and score 0, as in search()
+        normalize_rows(queries)
+
+        positions = np.arange(len(self))
+        scores = queries @ self.vectors.T
+        return [self._ranked(positions, row, k) for row in scores]
+
+    def _ranked(
+        self,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+    ) -> List[Dict[str, Any]]:
+        """Top k of the scored positions as {"id", "distance"}"""
+        k = min(k, len(positions))
+        if k < len(positions):
+            top = np.argpartition(-scores, k - 1)[:k]
+            positions, scores = positions[top], scores[top]
+
+        distances = 1.0 - scores
+        # Stable ordering: distance first, then catalog (id) order
+        order = np.lexsort((self.ids[positions], distances))
+        return [
+            {
+                "id": int(self.ids[positions[i]]),
+                "type": self.types[positions[i]] if self.types else None,
+                "distance": float(distances[i]),
+            }
+            for i in order
+        ]
+
+    def _shortlist(
+        self,
+        query: np.ndarray,
+        k: int,
+        positions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Best k * QUANTIZATION_RESCORE_FACTOR rows by quantized score"""
+        approx = self.quantizer.scores(query, positions)
+        if positions is None:
+            positions = np.arange(len(self))
+
+        size = min(len(positions), k * max(1, settings.QUANTIZATION_RESCORE_FACTOR))
+        if size < len(positions):
+            positions = positions[np.argpartition(-approx, size - 1)[:size]]
+        # Sorted so the memory-mapped rows are read front to back
+        return np.sort(positions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory footprint (and quantized recall estimate) of this index"""
+        full_precision = 4 * self.dimension
+        if self.quantizer is None:
+            bytes_per_vector, resident = full_precision, self.vectors.nbytes
+        else:
+            bytes_per_vector, resident = self.quantizer.bytes_per_vector, self.quantizer.nbytes
+        return {
+            "vectors": len(self),
+            "quantization": self.quantizer.mode if self.quantizer else "none",
+            "bytes_per_vector": bytes_per_vector,
+            "full_precision_bytes_per_vector": full_precision,
+            "resident_vector_bytes": resident,
+            "recall_at_k": self.recall,
+        }
+
+    def estimate_nbytes(self) -> int:
+        """
+        Approximate resident size of the index
+
+        Counts every in-memory array (memory-mapped vectors excluded) plus a
+        per-entry estimate for the Python-side code sets, positions and
+        cached rows.
+        """
+        arrays = [self.ids] + list(self.partitions.values())
+        if not isinstance(self.vectors, np.memmap):
+            arrays.append(self.vectors)
+        total = sum(array.nbytes for array in arrays)
+
+        if self.quantizer is not None:
+            total += self.quantizer.nbytes
+        if self.ann is not None:
+            total += self.ann.nbytes
+        if self.lexical is not None:
+            total += self.lexical.nbytes
+
+        total += 100 * len(self._positions)
+        total += sum(
+            200 + 64 * sum(len(codes) for codes in features.values())
+            for features in self.code_features
+        )
+        total += sum(
+            300 + len(row["content_text"]) for row in self.cached_rows.values()
+        )
+        return total
+
+    def features_for(self, row_id: int) -> Optional[Dict[str, FrozenSet[str]]]:
+        """Pre-extracted code references for an embedding id, if indexed"""
+        position = self._positions.get(row_id)
+        if position is None or position >= len(self.code_features):
+            return None
+        return self.code_features[position]
+
+    def lexical_search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """
+        Return the k best BM25 matches for the query
+
+        Distances are 1 - score / best score, so the top match is 0.
+        """
+        if len(self) == 0 or k <= 0 or self.lexical is None:
+            return []
+
+        positions, scores = self.lexical.search(query, k)
+        if len(positions) == 0:
+            return []
+        distances = 1.0 - scores / scores[0]
+        return [
+            {
+                "id": int(self.ids[position]),
+                "type": self.types[position] if self.types else None,
+                "distance": float(distance),
+            }
+            for position, distance in zip(positions, distances)
+        ]
+
+
+class IndexRegistry:
+    """
+    Process-wide cache of program index shards.
+
+    A program's index is loaded on first use (memory-mapped from the current
+    on-disk version when one matches the catalog, otherwise built from the
+    database) and reloaded when its catalog version changes. Shards are kept in least-recently-used order; when their
+    estimated total size exceeds `max_bytes` (INDEX_MEMORY_CAP_MB, 0 for no
+    cap) the coldest shards are evicted and reload on their next request.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(settings.INDEX_MEMORY_CAP_MB * 2**20)
+        self.max_bytes = max_bytes
+        self._indexes: "OrderedDict[str, ProgramIndex]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(self, db: Session, program_id: str) -> ProgramIndex:
+        """Return the index for a program, (re)building it if it is missing or stale"""
+        version = catalog_version(db, program_id)
+        index = self._cached(program_id, version)
+        if index is not None:
+            return index
+
+        # Builds are serialized; lookups of other shards proceed meanwhile
+        with self._build_lock:
+            index = self._cached(program_id, version)
+            if index is not None:
+                return index
+
+            index = self._load(db, program_id, version)
+            index.prepare_ann()
+            index.prepare_quantization()
+            size = index.estimate_nbytes()
+            with self._lock:
+                self._indexes[program_id] = index
+                self._indexes.move_to_end(program_id)
+                self._sizes[program_id] = size
+                self.loads += 1
+                self._evict(keep=program_id)
+            logger.info(
+                f"Built embedding index for {program_id} ({len(index)} vectors, "
+                f"~{size / 2**20:.1f} MB)"
+            )
+            return index
+
+    def _load(self, db: Session, program_id: str, version: Optional[str]) -> ProgramIndex:
+        """Map the shard from the current on-disk version, or build it from the database"""
+        from app.services.index_store import load_program_index  # Imports this module
+
+        index = load_program_index(program_id, version)
+        if index is None:
+            index = ProgramIndex.build(db, program_id, version)
+        return index
+
+    def _cached(self, program_id: str, version: Optional[str]) -> Optional[ProgramIndex]:
+        """The cached shard if it is fresh, marked as most recently used"""
+        with self._lock:
+            index = self._indexes.get(program_id)
+            if index is None or index.version != version:
+                return None
+            self._indexes.move_to_end(program_id)
+            self.hits += 1
+            return index
+
+    def _evict(self, keep: str) -> None:
+        """Drop least-recently-used shards until under the cap (caller holds the lock)"""
+        if self.max_bytes <= 0:
+            return
+        for program_id in list(self._indexes):
+            if self.resident_bytes <= self.max_bytes:
+                break
+            if program_id == keep:
+                continue
+            del self._indexes[program_id]
+            del self._sizes[program_id]
+            self.evictions += 1
+            logger.info(f"Evicted embedding index for {program_id}")
+
+    def peek(self, program_id: str) -> Optional[ProgramIndex]:
+        """Currently cached index for a program, without checking freshness"""
+        return self._indexes.get(program_id)
+
+    def invalidate(self, program_id: Optional[str] = None) -> None:
+        """Drop one program's index, or every index when program_id is None"""
+        with self._lock:
+            if program_id is None:
+                self._indexes.clear()
+                self._sizes.clear()
+            else:
+                self._indexes.pop(program_id, None)
+                self._sizes.pop(program_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            indexes = dict(self._indexes)
+            sizes = dict(self._sizes)
+        return {
+            "quantization": settings.VECTOR_QUANTIZATION,
+            "shards": len(indexes),
+            "resident_bytes": sum(sizes.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "programs": {
+                program_id: {**index.stats(), "resident_bytes": sizes.get(program_id, 0)}
+                for program_id, index in indexes.items()
+            },
+        }
+
+
+index_registry = IndexRegistry()
+metrics_registry.register("vector_index", index_registry.stats)
+
+
+def hydrate_results(
+    db: Session,
+    candidates: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Attach text and metadata to ranked {"id", "distance"} candidates
+
+    One IN (...) query for the candidates that are not hydrated yet; order and
+    distances are preserved and ids that no longer exist are dropped.
+    """
+    missing = [c["id"] for c in candidates if "content_text" not in c]
+    if not missing:
+        return candidates
+
+    rows = db.query(
+        Embedding.id,
+        Embedding.program_id,
+        Embedding.type,
+        Embedding.content_text,
+        Embedding.meta_data,
+    ).filter(Embedding.id.in_(missing)).all()
+    by_id = {row.id: row for row in rows}
+
+    hydrated = []
+    for candidate in candidates:
+        if "content_text" in candidate:
+            hydrated.append(candidate)
+            continue
+        row = by_id.get(candidate["id"])
+        if row is None:
+            continue
+        hydrated.append({
+            "id": row.id,
+            "program_id": row.program_id,
+            "type": row.type,
+            "content_text": row.content_text,
+            "metadata": row.meta_data,
+            "distance": candidate["distance"],
+        })
+    return hydrated
+
+
+def apply_type_quotas(
+    results: List[Dict[str, Any]],
+    k: int,
+    quotas: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Top k of ranked results, reserving slots per type
+
+    `quotas` maps a type to the number of its best results that are always
+    included (a negative quota includes all of them); remaining slots go to
+    the best of the rest. Rank order is preserved.
+    """
+    if quotas is None:
+        quotas = settings.RETRIEVAL_TYPE_QUOTAS
+    if not quotas:
+        return results[:k]
+
+    chosen = set()
+    for type_, quota in quotas.items():
+        of_type = [i for i, r in enumerate(results) if r.get("type") == type_]
+        chosen.update(of_type if quota < 0 else of_type[:quota])
+
+    if len(chosen) > k:
+        chosen = set(sorted(chosen)[:k])
+    for i in range(len(results)):
+        if len(chosen) >= k:
+            break
+        chosen.add(i)
+    return [results[i] for i in sorted(chosen)]
+
+
+def hydrate_many(
+    db: Session,
+    candidate_lists: List[List[Dict[str, Any]]],
+) -> List[List[Dict[str, Any]]]:
+    """hydrate_results for several ranked lists with a single query"""
+    unique_ids = {
+        c["id"] for candidates in candidate_lists for c in candidates
+        if "content_text" not in c
+    }
+    hydrated = {
+        row["id"]: row
+        for row in hydrate_results(db, [{"id": i, "distance": 0.0} for i in unique_ids])
+    }
+
+    results = []
+    for candidates in candidate_lists:
+        merged = []
+        for candidate in candidates:
+            if "content_text" in candidate:
+                merged.append(candidate)
+            elif candidate["id"] in hydrated:
+                merged.append({**hydrated[candidate["id"]], "distance": candidate["distance"]})
+        results.append(merged)
+    return results
+
+
+def build_ann_indexes(db: Session) -> Dict[str, int]:
+    """Train and persist IVF indexes for every eligible program (seed time)"""
+    built = {}
+    program_ids = [row[0] for row in db.query(Embedding.program_id).distinct()]
+    for program_id in program_ids:
+        index = ProgramIndex.build(db, program_id)
+        index.prepare_ann()
+        if index.ann is not None:
+            built[program_id] = index.ann.nlist
+    return built
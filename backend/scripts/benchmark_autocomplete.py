@@ -0,0 +1,61 @@
+"""
+Benchmark autocomplete lookup latency on a synthetic catalog
+
+Builds an AutocompleteIndex over N courses (codes spread across
+departments, titles sharing a pool of topic words) and reports lookup
+latency percentiles for code-prefix queries.
+
+Usage:
+    python scripts/benchmark_autocomplete.py [--courses 6000] [--queries 2000] [--limit 8]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.services.autocomplete import AutocompleteIndex
+
+DEPARTMENTS = 300
+TOPICS = 97
+
+
+def synthetic_catalog(n: int):
+    """(codes, titles) for n courses"""
+    codes = [f"D{i % DEPARTMENTS:03d} {i:03d}" for i in range(n)]
+    titles = [f"Course {i} topic{i % TOPICS}" for i in range(n)]
+    return codes, titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=6000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = AutocompleteIndex(*synthetic_catalog(args.courses))
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        index.complete(f"d{i % DEPARTMENTS:03d}", limit=args.limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+    p50, p99 = np.percentile(latencies, [50, 99])
+
+    print("=" * 60)
+    print(f"Autocomplete benchmark: {args.courses} courses, {args.queries} queries")
+    print("=" * 60)
+    print(f"build     {build_ms:10.1f} ms")
+    print(f"p50       {p50:10.4f} ms")
+    print(f"p99       {p99:10.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark concurrent /api/recommend requests on one worker
+
+Simulates provider latency (embedding and chat completion) and fires
+concurrent requests through the ASGI app in-process. With the async
+pipeline, wall time stays close to one request's latency; a pipeline that
+blocks the event loop would take roughly `concurrency` times as long.
+/health is probed while the requests are in flight.
+
+Requests use distinct payloads by default; with --identical they share one
+payload, so single-flight coalescing answers them with one generation.
+
+Usage:
+    python scripts/benchmark_concurrency.py [--concurrency 20] [--llm-latency 1.0] [--identical]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Self-contained in-memory catalog; never touches a real database or provider
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base, get_db, get_session_factory
+from app.core.security import create_access_token
+from app.main import app
+from app.models import Program
+from app.services.ai import AIService
+from app.services.rag import RAGService
+
+
+def setup_database():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    db.add(Program(
+        program_id="rice-bioe-2025",
+        university="Rice",
+        degree="BS",
+        major="Bioengineering",
+        catalog_url="https://example.com",
+        version_year=2025,
+    ))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: SessionLocal
+
+
+def fake_providers(embedding_latency: float, llm_latency: float):
+    calls = {"embedding": 0, "completion": 0}
+
+    async def embedding(self, text):
+        calls["embedding"] += 1
+        await asyncio.sleep(embedding_latency)
+        return [0.0] * settings.STORED_EMBEDDING_DIMENSION
+
+    async def completion(self, **kwargs):
+        calls["completion"] += 1
+        await asyncio.sleep(llm_latency)
+        return {"recommendations": [], "notes": [], "assumptions": [], "warnings": []}
+
+    RAGService.generate_embedding_async = embedding
+    AIService.generate_recommendations_async = completion
+    return calls
+
+
+async def run(concurrency: int, requests: int, identical: bool):
+    token = create_access_token(subject="benchmark", roles=["user"])
+    headers = {"Authorization": f"Bearer {token}"}
+    def payload(i: int):
+        return {
+            "university": "Rice",
+            "program_id": "rice-bioe-2025",
+            "completed": ["MATH 212"] if identical else ["MATH 212", f"BENCH {i}"],
+            "credits_target": 15,
+        }
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/recommend", headers=headers, json=payload(i))
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(one(i)) for i in range(requests)]
+        await asyncio.sleep(0.05)
+        health_start = time.perf_counter()
+        await client.get("/health")
+        health_latency = time.perf_counter() - health_start
+        latencies = await asyncio.gather(*tasks)
+        wall = time.perf_counter() - start
+
+    return wall, sorted(latencies), health_latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=0, help="Total requests (default: concurrency)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Simulated chat completion seconds")
+    parser.add_argument("--embedding-latency", type=float, default=0.1, help="Simulated embedding seconds")
+    parser.add_argument("--identical", action="store_true", help="Send the same payload for every request")
+    args = parser.parse_args()
+    requests = args.requests or args.concurrency
+
+    setup_database()
+    calls = fake_providers(args.embedding_latency, args.llm_latency)
+    wall, latencies, health_latency = asyncio.run(run(args.concurrency, requests, args.identical))
+
+    single = args.embedding_latency + args.llm_latency
+    serialized = single * requests
+    print("=" * 60)
+    print(f"Recommend concurrency benchmark: {requests} requests, {args.concurrency} concurrent")
+    print("=" * 60)
+    print(f"Simulated provider latency per request: {single:.2f}s")
+    print(f"Wall time:                 {wall:.2f}s (fully serialized: {serialized:.2f}s)")
+    print(f"Overlap factor:            {sum(latencies) / wall:.1f}x")
+    print(f"Request latency p50 / max: {latencies[len(latencies) // 2]:.2f}s / {latencies[-1]:.2f}s")
+    print(f"/health during load:       {health_latency * 1000:.1f} ms")
+    print(f"Upstream calls:            {calls['embedding']} embedding, {calls['completion']} completion")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark embedding dimensionality reduction: latency and memory vs. recall@k
+
+Compares full-dimension search against Matryoshka truncation and PCA at
+several dimensions, using the stored catalog embeddings (seeded with
+EMBEDDING_REDUCTION=none) or synthetic vectors.
+
+Usage:
+    python scripts/benchmark_reduction.py [--program-id rice-bioe-2025] [--k 12]
+    python scripts/benchmark_reduction.py --synthetic 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.reduction import Projection
+from app.services.vector_index import normalize_rows
+
+DIMENSIONS = (512, 256, 128, 64)
+
+
+def load_catalog_vectors(program_id: str = None) -> np.ndarray:
+    """Stored embedding vectors (optionally for one program)"""
+    from app.core.database import SessionLocal
+    from app.models import Embedding
+
+    db = SessionLocal()
+    try:
+        query = db.query(Embedding.vector)
+        if program_id:
+            query = query.filter(Embedding.program_id == program_id)
+        rows = query.all()
+    finally:
+        db.close()
+
+    if not rows:
+        return np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+    return normalize_rows(np.vstack([row.vector for row in rows]).astype(np.float32))
+
+
+def synthetic_vectors(n: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors with most variance in a low-rank subspace"""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(64, dimension))
+    centers = rng.normal(size=(32, 64))
+    latent = centers[rng.integers(32, size=n)] + 0.3 * rng.normal(size=(n, 64))
+    noise = 0.05 * rng.normal(size=(n, dimension))
+    return normalize_rows((latent @ basis + noise).astype(np.float32))
+
+
+def sample_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """Midpoints of random row pairs, normalized"""
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(len(vectors), size=(count, 2))
+    return normalize_rows(vectors[pairs[:, 0]] + vectors[pairs[:, 1]])
+
+
+def top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def benchmark(matrix: np.ndarray, queries: np.ndarray, truth, k: int):
+    """(median latency ms, recall@k) for searching `matrix` with `queries`"""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = top_k(matrix, query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & set(found.tolist()))
+    return float(np.median(latencies)), hits / (len(queries) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--program-id", help="Only benchmark one program's embeddings")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead")
+    parser.add_argument("--k", type=int, default=settings.RETRIEVAL_K)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, settings.EMBEDDING_DIMENSION)
+    else:
+        vectors = load_catalog_vectors(args.program_id)
+    if len(vectors) == 0:
+        print("✗ No embeddings found; seed the database or pass --synthetic N")
+        return
+    if vectors.shape[1] != settings.EMBEDDING_DIMENSION:
+        print(
+            f"✗ Stored vectors have {vectors.shape[1]} dimensions; re-seed with "
+            f"EMBEDDING_REDUCTION=none to benchmark against full-dimension search"
+        )
+        return
+
+    k = min(args.k, len(vectors))
+    queries = sample_queries(vectors, args.queries)
+    truth = [set(top_k(vectors, query, k).tolist()) for query in queries]
+
+    print("=" * 72)
+    print(f"Embedding reduction benchmark: {len(vectors)} vectors, recall@{k}")
+    print("=" * 72)
+    print(f"{'method':<10}{'dims':>6}{'bytes/vec':>11}{'index MB':>10}{'p50 ms':>10}{'recall':>10}")
+
+    configs = [("none", vectors.shape[1])] + [
+        (method, dimension)
+        for method in ("truncate", "pca")
+        for dimension in DIMENSIONS
+        if dimension < vectors.shape[1]
+    ]
+    for method, dimension in configs:
+        if method == "none":
+            reduced, reduced_queries = vectors, queries
+        else:
+            projection = Projection.fit(vectors, method, dimension)
+            reduced = projection.apply(vectors)
+            reduced_queries = projection.apply(queries)
+
+        latency, recall = benchmark(reduced, reduced_queries, truth, k)
+        print(
+            f"{method:<10}{dimension:>6}{4 * dimension:>11}"
+            f"{reduced.nbytes / 2**20:>10.2f}{latency:>10.3f}{recall:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
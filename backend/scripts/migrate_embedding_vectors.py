@@ -0,0 +1,129 @@
+"""
+Migrate embeddings.vector from JSON arrays to compact float32 storage
+
+Existing databases created before binary vector storage keep a JSON (or
+TEXT) `vector` column. This script adds a column of the configured storage
+type (float32 bytes, or pgvector when VECTOR_STORAGE=pgvector on Postgres),
+backfills it in id-ordered batches, then swaps it in for the old column.
+It is a no-op when the column already has the target type.
+
+Usage:
+    python scripts/migrate_embedding_vectors.py [--batch-size 500]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import Column, Integer, MetaData, Table, bindparam, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import LargeBinary
+
+from app.models.types import VectorType, uses_pgvector
+
+
+def needs_migration(engine: Engine) -> bool:
+    """True if embeddings.vector is not yet stored in the configured format"""
+    inspector = inspect(engine)
+    if not inspector.has_table("embeddings"):
+        return False
+
+    columns = {c["name"]: c["type"] for c in inspector.get_columns("embeddings")}
+    column_type = columns.get("vector")
+    if column_type is None:
+        return False
+    if uses_pgvector(engine.dialect):
+        return type(column_type).__name__.upper() != "VECTOR"
+    return not isinstance(column_type, LargeBinary)
+
+
+def decode_legacy_vector(value):
+    """Decode a stored vector from any previous format"""
+    if isinstance(value, str):
+        return json.loads(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype="<f4")
+    return value
+
+
+def migrate_embedding_vectors(engine: Engine, batch_size: int = 500) -> int:
+    """Convert every stored vector in place; returns the number of rows migrated"""
+    if not needs_migration(engine):
+        return 0
+
+    vector_type = VectorType()
+    column_ddl = vector_type.load_dialect_impl(engine.dialect).compile(
+        dialect=engine.dialect
+    )
+    # Lightweight table definition used only to bind through VectorType
+    staging = Table(
+        "embeddings",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("vector_new", vector_type),
+    )
+    update_stmt = staging.update().where(
+        staging.c.id == bindparam("row_id")
+    ).values(vector_new=bindparam("new_vector"))
+
+    migrated = 0
+    with engine.begin() as conn:
+        if uses_pgvector(engine.dialect):
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(f"ALTER TABLE embeddings ADD COLUMN vector_new {column_ddl}"))
+
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                text(
+                    "SELECT id, vector FROM embeddings "
+                    "WHERE id > :last_id ORDER BY id LIMIT :batch_size"
+                ),
+                {"last_id": last_id, "batch_size": batch_size},
+            ).fetchall()
+            if not rows:
+                break
+
+            conn.execute(
+                update_stmt,
+                [
+                    {"row_id": row.id, "new_vector": decode_legacy_vector(row.vector)}
+                    for row in rows
+                ],
+            )
+            migrated += len(rows)
+            last_id = rows[-1].id
+
+        conn.execute(text("ALTER TABLE embeddings DROP COLUMN vector"))
+        conn.execute(text("ALTER TABLE embeddings RENAME COLUMN vector_new TO vector"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE embeddings ALTER COLUMN vector SET NOT NULL"))
+
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from app.core.database import engine
+
+    print("=" * 60)
+    print("Navio Embedding Vector Migration")
+    print("=" * 60)
+
+    if not needs_migration(engine):
+        print("✓ embeddings.vector already uses the configured storage")
+        return
+
+    migrated = migrate_embedding_vectors(engine, batch_size=args.batch_size)
+    print(f"✓ Migrated {migrated} embedding vectors")
+
+
+if __name__ == "__main__":
+    main()
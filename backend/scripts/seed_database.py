@@ -9,11 +9,26 @@ from pathlib import Path
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import numpy as np
 from sqlalchemy.orm import Session
 from openai import OpenAI
 from app.core.database import SessionLocal, engine, init_db, Base
 from app.core.config import settings
-from app.models import Program, Course, Requirement, TrackRequirement, Embedding
+from app.models import (
+    Program,
+    Course,
+    Requirement,
+    TrackRequirement,
+    Embedding,
+    EmbeddingProjection,
+    PrecomputedRetrieval,
+    RecommendationCacheEntry,
+    CatalogVersion,
+)
+from app.services.rag import RAGService
+from app.services.reduction import Projection, save_projection
+from app.services.index_store import write_index_version
+from app.services.vector_index import build_ann_indexes
 
 
 def load_json(file_path: str):
@@ -76,8 +91,8 @@ def seed_programs(db: Session, data_dir: Path):
     print(f"✓ Seeded {len(programs)} programs")
 
 
-def seed_courses(db: Session, client: OpenAI, data_dir: Path):
-    """Seed courses table and generate embeddings"""
+def seed_courses(db: Session, client: OpenAI, data_dir: Path) -> list:
+    """Seed courses table and generate embeddings (stored by store_embeddings)"""
     print("\nSeeding courses...")
 
     course_files = [
@@ -87,6 +102,7 @@ def seed_courses(db: Session, client: OpenAI, data_dir: Path):
     ]
 
     total_courses = 0
+    embeddings = []
     for file_name in course_files:
         courses = load_json(data_dir / "seed" / file_name)
 
@@ -101,7 +117,7 @@ def seed_courses(db: Session, client: OpenAI, data_dir: Path):
             vector = generate_embedding(client, embed_text)
 
             if vector:
-                embedding = Embedding(
+                embeddings.append(dict(
                     program_id=course_data['program_id'],
                     type="course",
                     content_text=embed_text,
@@ -111,8 +127,7 @@ def seed_courses(db: Session, client: OpenAI, data_dir: Path):
                         "title": course_data['title'],
                         "source_url": course_data.get('source_url', '')
                     }
-                )
-                db.add(embedding)
+                ))
 
             total_courses += 1
 
@@ -120,10 +135,11 @@ def seed_courses(db: Session, client: OpenAI, data_dir: Path):
 
     db.commit()
     print(f"✓ Seeded {total_courses} courses with embeddings")
+    return embeddings
 
 
-def seed_requirements(db: Session, client: OpenAI, data_dir: Path):
-    """Seed requirements table and generate embeddings"""
+def seed_requirements(db: Session, client: OpenAI, data_dir: Path) -> list:
+    """Seed requirements table and generate embeddings (stored by store_embeddings)"""
     print("\nSeeding requirements...")
 
     req_files = [
@@ -133,6 +149,7 @@ def seed_requirements(db: Session, client: OpenAI, data_dir: Path):
     ]
 
     total_reqs = 0
+    embeddings = []
     for file_name in req_files:
         requirements = load_json(data_dir / "seed" / file_name)
 
@@ -147,7 +164,7 @@ def seed_requirements(db: Session, client: OpenAI, data_dir: Path):
             vector = generate_embedding(client, embed_text)
 
             if vector:
-                embedding = Embedding(
+                embeddings.append(dict(
                     program_id=req_data['program_id'],
                     type="requirement",
                     content_text=embed_text,
@@ -157,8 +174,7 @@ def seed_requirements(db: Session, client: OpenAI, data_dir: Path):
                         "description": req_data.get('description', ''),
                         "source_url": req_data.get('source_url', '')
                     }
-                )
-                db.add(embedding)
+                ))
 
             total_reqs += 1
 
@@ -166,6 +182,29 @@ def seed_requirements(db: Session, client: OpenAI, data_dir: Path):
 
     db.commit()
     print(f"✓ Seeded {total_reqs} requirements with embeddings")
+    return embeddings
+
+
+def store_embeddings(db: Session, embeddings: list):
+    """Apply EMBEDDING_REDUCTION (fitted over the whole catalog) and store embeddings"""
+    print("\nStoring embeddings...")
+    if not embeddings:
+        print("✓ No embeddings to store")
+        return
+
+    vectors = np.asarray([item["vector"] for item in embeddings], dtype=np.float32)
+    method = settings.EMBEDDING_REDUCTION
+    if method != "none":
+        projection = Projection.fit(vectors, method, settings.STORED_EMBEDDING_DIMENSION)
+        save_projection(db, projection)
+        vectors = projection.apply(vectors)
+        print(f"  ✓ Reduced to {projection.dimension} dimensions ({method})")
+
+    for item, vector in zip(embeddings, vectors):
+        db.add(Embedding(**{**item, "vector": vector}))
+
+    db.commit()
+    print(f"✓ Stored {len(embeddings)} embeddings")
 
 
 def seed_tracks(db: Session, data_dir: Path):
@@ -181,6 +220,37 @@ def seed_tracks(db: Session, data_dir: Path):
     print(f"✓ Seeded {len(tracks)} track requirements")
 
 
+def write_index_files(db: Session):
+    """Write memory-mappable index files and switch workers to the new version"""
+    print("\nWriting index files...")
+    version = write_index_version(db)
+    print(f"✓ Index version {version} is current")
+
+
+def build_indexes(db: Session):
+    """Build approximate nearest-neighbour indexes for large programs"""
+    if settings.RETRIEVAL_BACKEND != "ivf":
+        return
+
+    print("\nBuilding IVF indexes...")
+    built = build_ann_indexes(db)
+    for program_id, nlist in built.items():
+        print(f"  ✓ {program_id}: {nlist} lists")
+    print(f"✓ Built {len(built)} IVF indexes")
+
+
+def precompute_retrievals(db: Session):
+    """Precompute retrieval results for each program's warm queries"""
+    print("\nPrecomputing warm query results...")
+    rag_service = RAGService(db)
+    program_ids = [row[0] for row in db.query(Embedding.program_id).distinct()]
+
+    total = 0
+    for program_id in program_ids:
+        total += rag_service.precompute_warm_queries(program_id)
+    print(f"✓ Precomputed {total} warm queries for {len(program_ids)} programs")
+
+
 def main():
     """Main seeding function"""
     print("=" * 60)
@@ -204,19 +274,29 @@ def main():
     try:
         # Clear existing data
         print("\nClearing existing data...")
+        db.query(PrecomputedRetrieval).delete()
+        db.query(RecommendationCacheEntry).delete()
         db.query(Embedding).delete()
+        db.query(EmbeddingProjection).delete()
         db.query(Course).delete()
         db.query(Requirement).delete()
         db.query(TrackRequirement).delete()
         db.query(Program).delete()
+        # Bulk deletes bypass the session, so drop every catalog version too;
+        # re-seeded rows get new ones, removed programs none
+        db.query(CatalogVersion).delete()
         db.commit()
         print("✓ Cleared existing data")
 
         # Seed all tables
         seed_programs(db, data_dir)
-        seed_courses(db, client, data_dir)
-        seed_requirements(db, client, data_dir)
+        embeddings = seed_courses(db, client, data_dir)
+        embeddings += seed_requirements(db, client, data_dir)
+        store_embeddings(db, embeddings)
         seed_tracks(db, data_dir)
+        write_index_files(db)
+        build_indexes(db)
+        precompute_retrievals(db)
 
         print("\n" + "=" * 60)
         print("✓ Database seeding completed successfully!")
@@ -9,9 +9,17 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_session_factory
 from app.core.config import settings
 from app.main import app
+from app.models import Embedding
+from app.services.autocomplete import autocomplete_indexes
+from app.services.course_search import course_search_indexes
+from app.services.embedding_cache import query_embedding_cache
+from app.services.precomputed import precomputed_results
+from app.services.reduction import embedding_reducer
+from app.services.response_cache import response_cache
+from app.services.vector_index import index_registry
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -36,6 +44,33 @@ def db_session() -> Generator[Session, None, None]:
     finally:
         session.close()
         Base.metadata.drop_all(bind=test_engine)
+        index_registry.invalidate()
+        query_embedding_cache.clear()
+        precomputed_results.invalidate()
+        embedding_reducer.invalidate()
+        course_search_indexes.invalidate()
+        autocomplete_indexes.invalidate()
+        response_cache.invalidate()
+
+
+@pytest.fixture
+def small_dimension(monkeypatch):
+    """Store 3-dimensional test vectors"""
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+
+
+def add_embedding(db_session, vector, code, program_id="rice-bioe-2025", type="course"):
+    """Add and commit one embedding whose text and metadata name `code`"""
+    embedding = Embedding(
+        program_id=program_id,
+        type=type,
+        content_text=f"code: {code}",
+        vector=vector,
+        meta_data={"code": code},
+    )
+    db_session.add(embedding)
+    db_session.commit()
+    return embedding
 
 
 @pytest.fixture(scope="function")
@@ -48,6 +83,7 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,88 @@
+"""
+Tests for the IVF approximate nearest-neighbour index
+"""
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services.ann import IVFIndex, ann_index_path
+from app.services.vector_index import ProgramIndex, normalize_rows
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestIVFIndex:
+    """Test the approximate (IVF) retrieval backend"""
+
+    def _clustered_vectors(self, n=400, dim=16, clusters=8):
+        rng = np.random.default_rng(42)
+        centers = rng.normal(size=(clusters, dim))
+        vectors = centers[rng.integers(clusters, size=n)] + 0.1 * rng.normal(size=(n, dim))
+        return normalize_rows(vectors.astype(np.float32))
+
+    def test_ivf_recall_against_exact(self, monkeypatch):
+        """Probing a few lists recovers the exact top-k on clustered data"""
+        monkeypatch.setattr(settings, "IVF_NPROBE", 2)
+        vectors = self._clustered_vectors()
+        ids = np.arange(1, len(vectors) + 1, dtype=np.int64)
+        index = ProgramIndex(
+            program_id="big-program",
+            ids=ids,
+            vectors=vectors,
+            types=["course"] * len(ids),
+            version=None,
+        )
+        index.ann = IVFIndex.train(ids, vectors, nlist=16)
+
+        hits = 0
+        for query in vectors[:20]:
+            exact = {r["id"] for r in index.search(query, 10, exact=True)}
+            approx = {r["id"] for r in index.search(query, 10)}
+            hits += len(exact & approx)
+        assert hits / 200 >= 0.9
+
+    def test_ivf_partition_matches_exact(self, monkeypatch):
+        """Probed positions are grouped by list; scores must stay with their ids"""
+        monkeypatch.setattr(settings, "IVF_NPROBE", 3)
+        vectors = normalize_rows(np.array([
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.6, 0.8, 0.0],
+            [0.8, 0.6, 0.0],
+            [0.0, 0.0, 1.0],
+        ], dtype=np.float32))
+        ids = np.arange(1, 6, dtype=np.int64)
+        index = ProgramIndex(
+            program_id="rice-bioe-2025",
+            ids=ids,
+            vectors=vectors,
+            types=["course"] * 4 + ["requirement"],
+            version=None,
+        )
+        # Lists {0, 2}, {1, 3} and {4}: probing yields positions [0, 2, 1, 3, 4]
+        index.ann = IVFIndex(
+            ids=ids,
+            centroids=normalize_rows(np.eye(3, dtype=np.float32)),
+            order=np.array([0, 2, 1, 3, 4]),
+            offsets=np.array([0, 2, 4, 5]),
+        )
+
+        query = [0.9, 0.3, 0.1]
+        for type_ in (None, "course"):
+            assert index.search(query, 4, type=type_) == index.search(query, 4, exact=True, type=type_)
+
+    def test_ivf_persisted_and_reloaded(self, tmp_path, monkeypatch):
+        """prepare_ann trains once, saves to INDEX_DIR and reuses the file"""
+        monkeypatch.setattr(settings, "RETRIEVAL_BACKEND", "ivf")
+        monkeypatch.setattr(settings, "ANN_MIN_VECTORS", 10)
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+
+        vectors = self._clustered_vectors(n=50)
+        ids = np.arange(1, 51, dtype=np.int64)
+        index = ProgramIndex("big-program", ids, vectors, [], (50, 50))
+        index.prepare_ann()
+        assert index.ann is not None
+        assert ann_index_path("big-program").exists()
+
+        loaded = IVFIndex.load(ann_index_path("big-program"))
+        assert loaded.matches(ids)
+        assert np.array_equal(loaded.order, index.ann.order)
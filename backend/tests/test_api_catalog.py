@@ -0,0 +1,119 @@
+"""
+Tests for catalog browsing API endpoints
+"""
+import json
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app.models import Program, Course
+from app.services.catalog import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Two universities, three programs, 25 courses"""
+    programs = [
+        ("rice-bioe-2025", "Rice"),
+        ("rice-cs-2025", "Rice"),
+        ("stanford-cs-2025", "Stanford"),
+    ]
+    for program_id, university in programs:
+        db_session.add(Program(
+            program_id=program_id,
+            university=university,
+            degree="BS",
+            major="Test",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+    db_session.flush()
+
+    for i in range(25):
+        program_id = programs[i % 3][0]
+        db_session.add(Course(
+            program_id=program_id,
+            code=f"DEPT {100 + i}",
+            title=f"Course {i}",
+            credits=3 if i % 2 else 4,
+            terms=["Fall"] if i % 4 else ["Spring"],
+            prereqs=[],
+            tags=["core", "lab"] if i % 5 == 0 else ["elective"],
+            description=f"Course {i} description",
+        ))
+    db_session.commit()
+
+
+def walk(client, headers, query="", limit=4):
+    """Follow next_cursor through every page"""
+    items, cursor, pages = [], None, 0
+    while True:
+        url = f"/api/catalog?limit={limit}{query}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        items.extend(body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestCatalogAPI:
+    """Test keyset-paginated catalog browsing"""
+
+    def test_catalog_requires_auth(self, client: TestClient):
+        """Test that catalog browsing requires authentication"""
+        response = client.get("/api/catalog")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_pages_cover_catalog_in_order(self, client: TestClient, catalog, auth_headers: dict):
+        """Test paging visits every course once in (program_id, code) order"""
+        items, pages = walk(client, auth_headers)
+        keys = [(c["program_id"], c["code"]) for c in items]
+        assert len(keys) == 25
+        assert keys == sorted(keys)
+        assert pages == 7
+
+    def test_filters(self, client: TestClient, catalog, auth_headers: dict):
+        """Test university, tag, term and credit filters"""
+        items, _ = walk(client, auth_headers, "&university=Rice")
+        assert {c["program_id"] for c in items} == {"rice-bioe-2025", "rice-cs-2025"}
+
+        items, _ = walk(client, auth_headers, "&tag=core&tag=lab")
+        assert len(items) == 5
+        assert all("lab" in c["tags"] for c in items)
+
+        items, _ = walk(client, auth_headers, "&term=Spring&min_credits=4")
+        assert items
+        assert all(c["terms"] == ["Spring"] and c["credits"] >= 4 for c in items)
+
+        items, _ = walk(client, auth_headers, "&program_id=stanford-cs-2025&min_credits=4")
+        assert all(c["program_id"] == "stanford-cs-2025" and c["credits"] == 4 for c in items)
+
+    def test_tag_filter_matches_whole_tags(self, client: TestClient, catalog, auth_headers: dict):
+        """Test a tag filter does not match substrings of other tags"""
+        items, _ = walk(client, auth_headers, "&tag=elect")
+        assert items == []
+
+    def test_invalid_cursor(self, client: TestClient, auth_headers: dict):
+        """Test malformed cursors are rejected with 400"""
+        response = client.get("/api/catalog?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cursor_round_trip(self):
+        """Test cursors encode the keyset position"""
+        course = Course(id=7, program_id="rice-bioe-2025", code="BIOE 252")
+        assert decode_cursor(encode_cursor(course)) == ("rice-bioe-2025", "BIOE 252", 7)
+
+    def test_stream_ndjson(self, client: TestClient, catalog, auth_headers: dict):
+        """Test the NDJSON stream returns every matching course in order"""
+        response = client.get("/api/catalog/stream?university=Rice", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        paged, _ = walk(client, auth_headers, "&university=Rice")
+        assert rows == paged
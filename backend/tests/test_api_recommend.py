@@ -1,10 +1,20 @@
 """
 Tests for recommendation API endpoint
 """
+import asyncio
+import threading
+
+import httpx
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.core.database import get_db, get_session_factory
+from app.main import app
 from app.models import Program
+from app.services.ai import AIService
+from app.services.rag import RAGService
+from tests.conftest import TestingSessionLocal, test_engine
 
 
 @pytest.mark.api
@@ -84,3 +94,136 @@ class TestRecommendAPI:
             status.HTTP_500_INTERNAL_SERVER_ERROR,  # If API key missing
         ]
 
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestRecommendConcurrency:
+    """Test that recommend requests do not block the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_requests_overlap(self, db_session, auth_headers: dict, monkeypatch):
+        """Test concurrent requests wait on the model together, and /health stays responsive"""
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+        concurrent = 3
+        in_flight = 0
+        all_waiting = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fake_embedding(self, text):
+            return [0.0, 0.0, 1.0]
+
+        async def slow_model(self, **kwargs):
+            # Only returns once every request is waiting on the model at the same time
+            nonlocal in_flight
+            in_flight += 1
+            if in_flight == concurrent:
+                all_waiting.set()
+            await asyncio.wait_for(release.wait(), timeout=5)
+            return {"recommendations": [], "notes": [], "assumptions": [], "warnings": []}
+
+        monkeypatch.setattr(RAGService, "generate_embedding_async", fake_embedding)
+        monkeypatch.setattr(AIService, "generate_recommendations_async", slow_model)
+
+        def per_request_db():
+            db = TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = per_request_db
+        app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                # Distinct payloads, so requests are not coalesced into one generation
+                payloads = [
+                    {
+                        "university": "Rice",
+                        "program_id": "rice-bioe-2025",
+                        "completed": ["MATH 212"],
+                        "credits_target": 15 + i,
+                    }
+                    for i in range(concurrent)
+                ]
+                requests = [
+                    asyncio.create_task(client.post("/api/recommend", headers=auth_headers, json=payload))
+                    for payload in payloads
+                ]
+                await asyncio.wait_for(all_waiting.wait(), timeout=5)
+
+                health = await asyncio.wait_for(client.get("/health"), timeout=5)
+                assert health.status_code == status.HTTP_200_OK
+
+                release.set()
+                responses = await asyncio.gather(*requests)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [r.status_code for r in responses] == [status.HTTP_200_OK] * concurrent
+
+    @pytest.mark.asyncio
+    async def test_no_sql_on_event_loop(self, db_session, auth_headers: dict, monkeypatch):
+        """Test no query runs on the loop, even after retrieval commits the session"""
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+        async def committing_retrieval(self, program_id, completed_courses, query=None, k=None):
+            # Warm-query misses store precomputed results, which commits
+            self.db.commit()
+            return []
+
+        async def model(self, **kwargs):
+            assert (kwargs["degree"], kwargs["major"]) == ("BS", "Bioengineering")
+            return {"recommendations": [], "notes": [], "assumptions": [], "warnings": []}
+
+        monkeypatch.setattr(RAGService, "retrieve_context_async", committing_retrieval)
+        monkeypatch.setattr(AIService, "generate_recommendations_async", model)
+
+        loop_thread = threading.get_ident()
+        on_loop = []
+
+        def record(conn, cursor, statement, *args):
+            if threading.get_ident() == loop_thread:
+                on_loop.append(statement)
+
+        def per_request_db():
+            db = TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = per_request_db
+        app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post("/api/recommend", headers=auth_headers, json={
+                    "university": "Rice",
+                    "program_id": "rice-bioe-2025",
+                    "completed": [],
+                    "credits_target": 15,
+                })
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+            app.dependency_overrides.clear()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert on_loop == []
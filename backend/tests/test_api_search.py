@@ -85,3 +85,62 @@ class TestSearchAPI:
         assert len(results) > 0
         assert results[0]["code"] == "BIOE 252"
 
+        response = client.get(
+            "/api/search?program_id=rice-bioe-2025&q=intro course&mode=fulltext",
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["code"] for r in response.json()] == ["BIOE 252"]
+
+    def test_search_invalid_mode(self, client: TestClient, auth_headers: dict):
+        """Test unknown search modes are rejected"""
+        response = client.get(
+            "/api/search?program_id=rice-bioe-2025&q=BIOE&mode=regex",
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestAutocompleteAPI:
+    """Test course autocomplete endpoint"""
+
+    def test_autocomplete_requires_auth(self, client: TestClient):
+        """Test that autocomplete requires authentication"""
+        response = client.get("/api/courses/autocomplete?program_id=test&q=bi")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_autocomplete_suggestions(
+        self, client: TestClient, db_session, auth_headers: dict
+    ):
+        """Test code and title prefixes return code/title suggestions"""
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.add_all([
+            Course(program_id="rice-bioe-2025", code="BIOE 252",
+                   title="Introduction to Bioengineering", credits=3, prereqs=[]),
+            Course(program_id="rice-bioe-2025", code="BIOE 310",
+                   title="Biomechanics", credits=3, prereqs=[]),
+        ])
+        db_session.commit()
+
+        response = client.get(
+            "/api/courses/autocomplete?program_id=rice-bioe-2025&q=bioe 3",
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"code": "BIOE 310", "title": "Biomechanics"}]
+
+        response = client.get(
+            "/api/courses/autocomplete?program_id=rice-bioe-2025&q=intro",
+            headers=auth_headers,
+        )
+        assert [s["code"] for s in response.json()] == ["BIOE 252"]
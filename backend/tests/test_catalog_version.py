@@ -0,0 +1,118 @@
+"""
+Tests for per-program catalog versions
+"""
+import pytest
+
+from app.models import CatalogVersion, Course
+from app.models.catalog_version import bump_catalog_versions, catalog_version
+from app.services.response_cache import response_cache
+from app.schemas.recommend import RecommendRequest
+from app.services.vector_index import IndexRegistry
+from tests.conftest import add_embedding
+
+
+def add_course(db_session, code="BIOE 252", title="Bioengineering Fundamentals", program_id="rice-bioe-2025"):
+    course = Course(program_id=program_id, code=code, title=title, credits=3)
+    db_session.add(course)
+    db_session.commit()
+    return course
+
+
+@pytest.mark.unit
+class TestCatalogVersion:
+    """Test catalog versions change on every write to a program's catalog"""
+
+    def test_unwritten_program_has_no_version(self, db_session):
+        """Test a program without catalog rows has no version"""
+        assert catalog_version(db_session, "rice-bioe-2025") is None
+
+    def test_insert_sets_version(self, db_session):
+        """Test adding a course versions its program only"""
+        add_course(db_session)
+        assert catalog_version(db_session, "rice-bioe-2025") is not None
+        assert catalog_version(db_session, "rice-ceng-2025") is None
+
+    def test_same_count_edit_changes_version(self, db_session):
+        """Test an in-place edit changes the version though counts and ids do not"""
+        course = add_course(db_session)
+        before = catalog_version(db_session, "rice-bioe-2025")
+
+        course.title = "Fundamentals of Bioengineering"
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") != before
+
+    def test_unmodified_rows_keep_version(self, db_session):
+        """Test a commit without changes keeps the version"""
+        course = add_course(db_session)
+        before = catalog_version(db_session, "rice-bioe-2025")
+
+        course.title = course.title
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") == before
+
+    def test_reinserted_ids_change_version(self, db_session):
+        """Test deleting and re-adding a row with the same id changes the version"""
+        course = add_course(db_session)
+        course_id = course.id
+        before = catalog_version(db_session, "rice-bioe-2025")
+
+        db_session.delete(course)
+        db_session.commit()
+        db_session.add(Course(id=course_id, program_id="rice-bioe-2025", code="BIOE 252", title="New", credits=3))
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") != before
+
+    def test_moved_row_changes_both_programs(self, db_session):
+        """Test moving a row between programs versions both"""
+        course = add_course(db_session)
+        add_course(db_session, program_id="rice-ceng-2025")
+        before = (catalog_version(db_session, "rice-bioe-2025"), catalog_version(db_session, "rice-ceng-2025"))
+
+        course.program_id = "rice-ceng-2025"
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") != before[0]
+        assert catalog_version(db_session, "rice-ceng-2025") != before[1]
+
+    def test_bulk_writes_bump_explicitly(self, db_session):
+        """Test bulk deletes bypass the listener and bump_catalog_versions covers them"""
+        add_course(db_session)
+        before = catalog_version(db_session, "rice-bioe-2025")
+
+        db_session.query(Course).delete()
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") == before
+
+        bump_catalog_versions(db_session, ["rice-bioe-2025"])
+        db_session.commit()
+        assert catalog_version(db_session, "rice-bioe-2025") != before
+        assert db_session.query(CatalogVersion).count() == 1
+
+
+@pytest.mark.unit
+class TestCatalogVersionedCaches:
+    """Test caches keyed on the catalog version see same-count edits"""
+
+    def test_index_rebuilt_after_in_place_edit(self, db_session, small_dimension):
+        """Test the index registry rebuilds when a vector changes in place"""
+        embedding = add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        registry = IndexRegistry()
+        first = registry.get(db_session, "rice-bioe-2025")
+
+        embedding.vector = [0.0, 1.0, 0.0]
+        db_session.commit()
+        second = registry.get(db_session, "rice-bioe-2025")
+
+        assert second is not first
+        assert list(second.vectors[0]) == [0.0, 1.0, 0.0]
+
+    def test_response_key_changes_after_course_edit(self, db_session):
+        """Test a same-count course edit changes the response cache key"""
+        course = add_course(db_session)
+        request = RecommendRequest(
+            university="Rice", program_id="rice-bioe-2025", completed=[], credits_target=15
+        )
+        before = response_cache.key(db_session, request)
+
+        course.credits = 4
+        db_session.commit()
+        assert response_cache.key(db_session, request) != before
@@ -0,0 +1,350 @@
+"""
+Tests for trigram course search
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models import Course, Program
+from app.models.catalog_version import catalog_version
+from app.services import autocomplete as autocomplete_module
+from app.services.autocomplete import AutocompleteIndex, AutocompleteIndexes, autocomplete_indexes
+from app.services.course_search import (
+    CourseTrigramIndex,
+    PgTrgmSearch,
+    build_trigram_query,
+    course_search_indexes,
+    trigrams,
+)
+from app.services.fulltext import (
+    POSTGRES_SEARCH_SQL,
+    fts5_query,
+    fulltext_search,
+    query_terms,
+    tsquery,
+)
+from app.services.rag import RAGService
+
+CATALOG = [
+    ("BIOE 252", "Introduction to Bioengineering"),
+    ("BIOE 310", "Biomechanics"),
+    ("BIOE 330", "Bioengineering Thermodynamics"),
+    ("CHEM 121", "General Chemistry I"),
+    ("MATH 212", "Multivariable Calculus"),
+]
+
+
+def make_index(catalog=CATALOG):
+    return CourseTrigramIndex(
+        ids=list(range(1, len(catalog) + 1)),
+        codes=[code for code, _ in catalog],
+        titles=[title for _, title in catalog],
+    )
+
+
+def add_courses(db_session, catalog=CATALOG, program_id="rice-bioe-2025"):
+    db_session.add(Program(
+        program_id=program_id,
+        university="Rice",
+        degree="BS",
+        major="Bioengineering",
+        catalog_url="https://example.com",
+        version_year=2025,
+    ))
+    db_session.add_all([
+        Course(program_id=program_id, code=code, title=title, credits=3, prereqs=[], terms=[], tags=[])
+        for code, title in catalog
+    ])
+    db_session.commit()
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestCourseTrigramIndex:
+    """Test the in-memory trigram index"""
+
+    def test_trigrams_match_pg_trgm(self):
+        """Test words are padded like pg_trgm's show_trgm"""
+        assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+        assert trigrams("") == frozenset()
+
+    def test_typo_matches_title(self):
+        """Test a misspelled title still finds the course"""
+        codes = [make_index().codes[i - 1] for i in make_index().search("biomechnics", limit=5)]
+        assert codes[0] == "BIOE 310"
+
+    def test_exact_code_ranks_first(self):
+        """Test an exact code outranks codes sharing its department"""
+        index = make_index()
+        ids = index.search("bioe330", limit=5)
+        assert index.codes[ids[0] - 1] == "BIOE 330"
+        assert index.search("BIOE 330", limit=5)[0] == ids[0]
+
+    def test_code_prefix_matches(self):
+        """Test a partial code returns every course with that prefix"""
+        index = make_index()
+        codes = [index.codes[i - 1] for i in index.search("BIOE 3", limit=5)]
+        assert codes[:2] == ["BIOE 310", "BIOE 330"]
+
+    def test_unrelated_query_matches_nothing(self):
+        """Test dissimilar queries fall below the threshold"""
+        assert make_index().search("NONEXISTENT", limit=5) == []
+        assert make_index().search("   ", limit=5) == []
+
+    def test_limit(self):
+        """Test results are capped at limit"""
+        assert len(make_index().search("BIOE", limit=2)) == 2
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestSearchCourses:
+    """Test RAGService.search_courses with the in-memory backend"""
+
+    def test_ranked_fuzzy_results(self, db_session):
+        """Test results come back as Course rows in ranked order"""
+        add_courses(db_session)
+        results = RAGService(db_session).search_courses("rice-bioe-2025", "thermodynamcs", limit=3)
+        assert results[0].code == "BIOE 330"
+        assert all(isinstance(course, Course) for course in results)
+
+    def test_index_rebuilt_when_courses_change(self, db_session):
+        """Test newly added courses are searchable without invalidation"""
+        add_courses(db_session)
+        service = RAGService(db_session)
+        before = [c.code for c in service.search_courses("rice-bioe-2025", "Organic Chemistry")]
+        assert "CHEM 211" not in before
+
+        db_session.add(Course(
+            program_id="rice-bioe-2025", code="CHEM 211", title="Organic Chemistry I",
+            credits=3, prereqs=[], terms=[], tags=[],
+        ))
+        db_session.commit()
+        assert service.search_courses("rice-bioe-2025", "Organic Chemistry")[0].code == "CHEM 211"
+
+    def test_other_programs_excluded(self, db_session):
+        """Test search is scoped to one program"""
+        add_courses(db_session)
+        add_courses(db_session, [("BIOE 999", "Biomechanics II")], program_id="other-2025")
+        codes = [c.code for c in RAGService(db_session).search_courses("rice-bioe-2025", "Biomechanics")]
+        assert "BIOE 999" not in codes
+        assert course_search_indexes.get(db_session, "other-2025").codes == ["BIOE 999"]
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestPgTrgm:
+    """Test the pg_trgm backend without a Postgres server"""
+
+    def test_detect_skips_sqlite(self):
+        """Test detection leaves pg_trgm disabled on SQLite"""
+        search = PgTrgmSearch()
+        assert search.detect(create_engine("sqlite://")) is False
+        assert search.enabled is False
+
+    def test_query_uses_trigram_operators(self):
+        """Test the ranking query filters with index-backed trigram operators"""
+        sql = str(build_trigram_query("rice-bioe-2025", "biomech", 10).compile(
+            dialect=postgresql.dialect()
+        ))
+        assert "similarity(" in sql
+        assert "word_similarity(" in sql
+        assert "<%" in sql
+        assert "ORDER BY score DESC" in sql
+
+    def test_query_filters_only_on_indexed_operators(self):
+        """Test prefix boosts stay out of the WHERE clause and escape LIKE wildcards"""
+        statement = build_trigram_query("rice-bioe-2025", "bio_%", 10)
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        filters = sql[sql.index("WHERE"):sql.index("ORDER BY")]
+
+        assert "LIKE" not in filters
+        assert "greatest" not in filters
+        assert "ESCAPE '/'" in sql
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert "bio/_/%" in params.values()
+        assert "BIO/_/%" in params.values()
+
+    def test_search_sets_operator_thresholds(self, monkeypatch):
+        """Test both operator thresholds are set to COURSE_SEARCH_THRESHOLD before the query"""
+        monkeypatch.setattr(settings, "COURSE_SEARCH_THRESHOLD", 0.45)
+        executed = []
+
+        class RecordingSession:
+            def execute(self, statement):
+                executed.append(statement.compile(dialect=postgresql.dialect()))
+                return SimpleNamespace(all=lambda: [])
+
+        assert PgTrgmSearch().search(RecordingSession(), "rice-bioe-2025", "biomech", 10) == []
+        assert "set_config" in str(executed[0])
+        assert list(executed[0].params.values()) == [
+            "pg_trgm.similarity_threshold", "0.45", True,
+            "pg_trgm.word_similarity_threshold", "0.45", True,
+        ]
+        assert "<%" in str(executed[1])
+
+    def test_boosts_do_not_admit_matches(self):
+        """Test in-memory search filters on plain similarity like `%` and `<%` do"""
+        index = make_index()
+        similarities = index.similarities("b")
+        scores = index.scores("b", similarities)
+
+        assert similarities.max() < 0.6 <= scores.max()
+        assert index.search("b", limit=5, threshold=0.6) == []
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestAutocomplete:
+    """Test the course-code / title-word prefix index"""
+
+    def test_code_prefix(self):
+        """Test code prefixes match regardless of spacing and case"""
+        index = AutocompleteIndex(*zip(*CATALOG))
+        assert [s["code"] for s in index.complete("bioe3")] == ["BIOE 310", "BIOE 330"]
+        assert [s["code"] for s in index.complete("BIOE 3")] == ["BIOE 310", "BIOE 330"]
+
+    def test_title_words_after_codes(self):
+        """Test title-word matches follow code matches without duplicates"""
+        index = AutocompleteIndex(*zip(*CATALOG))
+        assert [s["code"] for s in index.complete("bio")] == ["BIOE 252", "BIOE 310", "BIOE 330"]
+        assert [s["code"] for s in index.complete("general chem")] == ["CHEM 121"]
+        assert index.complete("ch")[0] == {"code": "CHEM 121", "title": "General Chemistry I"}
+
+    def test_limit_and_empty(self):
+        """Test limits and blank queries"""
+        index = AutocompleteIndex(*zip(*CATALOG))
+        assert len(index.complete("bioe", limit=2)) == 2
+        assert index.complete("  ") == []
+        assert index.complete("zzz") == []
+
+    def test_rebuilt_after_invalidate(self, db_session):
+        """Test the per-program index is built once and rebuilt on invalidate"""
+        add_courses(db_session)
+        assert len(autocomplete_indexes.get(db_session, "rice-bioe-2025")) == len(CATALOG)
+        assert autocomplete_indexes.get(db_session, "rice-bioe-2025") is \
+            autocomplete_indexes.get(db_session, "rice-bioe-2025")
+
+        db_session.add(Course(
+            program_id="rice-bioe-2025", code="CHEM 211", title="Organic Chemistry I",
+            credits=3, prereqs=[], terms=[], tags=[],
+        ))
+        db_session.commit()
+        autocomplete_indexes.invalidate()
+        assert autocomplete_indexes.get(db_session, "rice-bioe-2025").complete("organ")[0]["code"] == "CHEM 211"
+
+    def test_unknown_programs_not_cached(self, db_session):
+        """Test empty results for unknown program ids are not kept in memory"""
+        add_courses(db_session)
+        for program_id in ("", "nope", "rice-bioe-2025"):
+            autocomplete_indexes.get(db_session, program_id)
+            course_search_indexes.get(db_session, program_id)
+
+        assert autocomplete_indexes.stats()["programs"] == 1
+        assert len(course_search_indexes) == 1
+        assert autocomplete_indexes.get(db_session, "nope").complete("bio") == []
+
+    def test_rebuilt_after_catalog_change(self, db_session):
+        """Test a catalog edit is picked up once the version check interval passes"""
+        add_courses(db_session)
+        now = [0.0]
+        indexes = AutocompleteIndexes(check_interval=5.0, clock=lambda: now[0])
+        first = indexes.get(db_session, "rice-bioe-2025")
+
+        course = db_session.query(Course).filter(Course.code == "CHEM 121").one()
+        course.title = "Organic Chemistry I"
+        db_session.commit()
+        now[0] = 4.0
+        assert indexes.get(db_session, "rice-bioe-2025") is first
+
+        now[0] = 10.0
+        second = indexes.get(db_session, "rice-bioe-2025")
+        assert second is not first
+        assert second.complete("organ")[0]["code"] == "CHEM 121"
+
+    def test_version_checked_once_per_interval(self, db_session, monkeypatch):
+        """Test cached lookups skip the database until the interval passes"""
+        add_courses(db_session)
+        now = [0.0]
+        indexes = AutocompleteIndexes(check_interval=5.0, clock=lambda: now[0])
+        indexes.get(db_session, "rice-bioe-2025")
+
+        checks = []
+        monkeypatch.setattr(
+            autocomplete_module, "catalog_version",
+            lambda db, program_id: checks.append(program_id) or catalog_version(db, program_id),
+        )
+        for _ in range(100):
+            indexes.get(db_session, "rice-bioe-2025")
+        assert checks == []
+
+        now[0] = 5.0
+        first = indexes.get(db_session, "rice-bioe-2025")
+        assert indexes.get(db_session, "rice-bioe-2025") is first
+        assert checks == ["rice-bioe-2025"]
+        assert indexes.stats()["builds"] == 1
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestFullTextSearch:
+    """Test full-text search (FTS5 on the SQLite test database)"""
+
+    def test_matches_descriptions_and_tags(self, db_session):
+        """Test topics found only in descriptions or tags are searchable"""
+        add_courses(db_session)
+        db_session.add_all([
+            Course(program_id="rice-bioe-2025", code="BIOE 440", title="Advanced Topics",
+                   description="Scaffolds and cell culture for tissue engineering.",
+                   credits=3, prereqs=[], terms=[], tags=["lab"]),
+            Course(program_id="rice-bioe-2025", code="BIOE 450", title="Seminar",
+                   description="Reading group.", credits=1, prereqs=[], terms=[], tags=["tissue"]),
+        ])
+        db_session.commit()
+
+        service = RAGService(db_session)
+        assert [c.code for c in service.search_courses(
+            "rice-bioe-2025", "tissue engineering", mode="fulltext"
+        )] == ["BIOE 440"]
+        assert sorted(c.code for c in service.search_courses(
+            "rice-bioe-2025", "tissue", mode="fulltext"
+        )) == ["BIOE 440", "BIOE 450"]
+
+    def test_title_outranks_description(self, db_session):
+        """Test bm25 column weights rank title matches above description matches"""
+        add_courses(db_session, [
+            ("CHEM 211", "Organic Chemistry I"),
+            ("BIOE 320", "Biomaterials"),
+        ])
+        course = db_session.query(Course).filter(Course.code == "BIOE 320").one()
+        course.description = "Applies organic chemistry to implant design."
+        db_session.commit()
+
+        codes = [c.code for c in RAGService(db_session).search_courses(
+            "rice-bioe-2025", "organic chemistry", mode="fulltext"
+        )]
+        assert codes == ["CHEM 211", "BIOE 320"]
+
+    def test_stemming_and_punctuation(self, db_session):
+        """Test porter stemming and that FTS syntax in queries is ignored"""
+        add_courses(db_session)
+        service = RAGService(db_session)
+        assert service.search_courses("rice-bioe-2025", 'calculus"* (^', mode="fulltext")[0].code == "MATH 212"
+        assert service.search_courses("rice-bioe-2025", "chemistries", mode="fulltext")[0].code == "CHEM 121"
+        assert service.search_courses("rice-bioe-2025", "!!!", mode="fulltext") == []
+
+    def test_deleted_courses_leave_index(self, db_session):
+        """Test triggers keep the FTS table in sync with deletes"""
+        add_courses(db_session)
+        db_session.query(Course).filter(Course.code == "BIOE 310").delete()
+        db_session.commit()
+        assert fulltext_search.search(db_session, "rice-bioe-2025", "biomechanics", 10) == []
+
+    def test_postgres_query_uses_tsvector(self):
+        """Test the Postgres query ranks the generated tsvector column"""
+        assert "ts_rank(search_vector" in POSTGRES_SEARCH_SQL
+        assert tsquery(query_terms("Tissue-engineering!")) == "tissue & engineering"
+        assert fts5_query(["tissue", "engineering"]) == '"tissue" "engineering"'
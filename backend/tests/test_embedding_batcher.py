@@ -0,0 +1,127 @@
+"""
+Tests for micro-batching of query embeddings
+"""
+import threading
+
+import pytest
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEmbedder:
+    """Records each batched call and returns [len(text)] per input"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.calls.append(list(texts))
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+def submit_concurrently(batcher, texts):
+    results = [None] * len(texts)
+    errors = [None] * len(texts)
+    barrier = threading.Barrier(len(texts))
+
+    def worker(i, text):
+        barrier.wait()
+        try:
+            results[i] = batcher.embed(text, timeout=5)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i, t)) for i, t in enumerate(texts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestEmbeddingBatcher:
+    """Test coalescing, fan-out and error propagation"""
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Concurrent callers share batched upstream calls"""
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_seconds=0.05)
+        texts = [f"query {i % 5}" + "x" * i for i in range(20)]
+
+        results, errors = submit_concurrently(batcher, texts)
+        batcher.close()
+
+        assert errors == [None] * 20
+        assert results == [[float(len(t))] for t in texts]
+        assert len(embedder.calls) < 20
+        assert batcher.stats()["requests"] == 20
+
+    def test_duplicate_texts_sent_once(self):
+        """Identical texts in one batch are embedded once"""
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_seconds=0.05)
+
+        results, _ = submit_concurrently(batcher, ["same query"] * 8)
+        batcher.close()
+
+        assert results == [[10.0]] * 8
+        assert sum(len(call) for call in embedder.calls) < 8
+
+    def test_max_batch_size_respected(self):
+        """No upstream call exceeds max_batch_size texts"""
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch_size=3, max_wait_seconds=0.05)
+
+        submit_concurrently(batcher, [f"q{i}" for i in range(10)])
+        batcher.close()
+
+        assert all(len(call) <= 3 for call in embedder.calls)
+
+    def test_errors_propagate_to_every_waiter(self):
+        """An upstream failure is raised in each caller of the batch"""
+        embedder = RecordingEmbedder(error=RuntimeError("rate limited"))
+        batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_seconds=0.05)
+
+        _, errors = submit_concurrently(batcher, ["a", "b", "c"])
+        batcher.close()
+
+        assert all(isinstance(e, RuntimeError) for e in errors)
+
+    def test_cancelled_future_skipped(self):
+        """A caller that gave up does not break the rest of its batch"""
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_seconds=0.1)
+
+        cancelled = batcher.submit("gone")
+        kept = batcher.submit("kept")
+        assert cancelled.cancel()
+
+        assert kept.result(timeout=5) == [4.0]
+        assert embedder.calls == [["kept"]]
+        assert batcher.embed("later", timeout=5) == [5.0]
+        batcher.close()
+
+    def test_worker_survives_dispatch_error(self):
+        """An unexpected error fails its batch but later requests still resolve"""
+        embedder = RecordingEmbedder()
+        batcher = EmbeddingBatcher(embedder, max_batch_size=64, max_wait_seconds=0)
+        original = batcher._dispatch
+        calls = []
+
+        def flaky(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise ValueError("bug")
+            original(batch)
+
+        batcher._dispatch = flaky
+        with pytest.raises(RuntimeError):
+            batcher.embed("first", timeout=5)
+        assert batcher.embed("second", timeout=5) == [6.0]
+        batcher.close()
@@ -0,0 +1,97 @@
+"""
+Tests for the query embedding cache
+"""
+from types import SimpleNamespace
+
+import pytest
+from app.core.config import settings
+from app.models import QueryEmbedding
+from app.services.embedding_cache import (
+    EmbeddingCache,
+    query_cache_key,
+    query_embedding_cache,
+)
+from app.services.rag import RAGService
+
+
+class FakeEmbeddings:
+    """Counts embeddings.create calls and returns a fixed vector"""
+
+    def __init__(self, vector):
+        self.vector = vector
+        self.calls = 0
+
+    def create(self, model, input):
+        self.calls += 1
+        return SimpleNamespace(data=[SimpleNamespace(embedding=list(self.vector))])
+
+
+def service_with_fake_client(db_session, vector=(1.0, 0.0, 0.0)):
+    service = RAGService(db_session)
+    embeddings = FakeEmbeddings(vector)
+    service.client = SimpleNamespace(embeddings=embeddings)
+    return service, embeddings
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Test LRU/TTL behaviour and counters"""
+
+    def test_key_normalizes_text(self):
+        """Case and whitespace differences map to the same key"""
+        assert query_cache_key("  Next  semester\tMATH 212 ") == query_cache_key(
+            "next semester math 212"
+        )
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted past max_size"""
+        cache = EmbeddingCache(max_size=2, ttl_seconds=60)
+        cache.set(("m", "a"), [1.0])
+        cache.set(("m", "b"), [2.0])
+        assert cache.get(("m", "a")) == [1.0]  # "a" is now most recent
+
+        cache.set(("m", "c"), [3.0])
+        assert cache.get(("m", "b")) is None
+        assert cache.get(("m", "a")) == [1.0]
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL count as misses"""
+        now = [0.0]
+        cache = EmbeddingCache(max_size=10, ttl_seconds=30, clock=lambda: now[0])
+        cache.set(("m", "a"), [1.0])
+
+        now[0] = 29.0
+        assert cache.get(("m", "a")) == [1.0]
+        now[0] = 31.0
+        assert cache.get(("m", "a")) is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["expirations"] == 1
+
+    def test_generate_embedding_hits_cache(self, db_session):
+        """Repeated queries only call the embeddings API once"""
+        service, embeddings = service_with_fake_client(db_session)
+
+        first = service.generate_embedding("next semester courses")
+        second = service.generate_embedding("Next semester  courses")
+        assert first == second == [1.0, 0.0, 0.0]
+        assert embeddings.calls == 1
+        assert query_embedding_cache.hits >= 1
+
+    def test_shared_tier_across_workers(self, db_session, monkeypatch):
+        """A worker with a cold local cache reuses the database entry"""
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+        monkeypatch.setattr(settings, "EMBEDDING_CACHE_SHARED", True)
+
+        service, embeddings = service_with_fake_client(db_session)
+        service.generate_embedding("course recommendations")
+        assert db_session.query(QueryEmbedding).count() == 1
+
+        query_embedding_cache.clear()  # Simulate another worker
+        other, other_embeddings = service_with_fake_client(db_session)
+        assert other.generate_embedding("course recommendations") == [1.0, 0.0, 0.0]
+        assert other_embeddings.calls == 0
@@ -91,6 +91,14 @@ class TestMetricsEndpoint:
             assert "requirements" in data["database"]
             assert "embeddings" in data["database"]
 
+    def test_metrics_include_application_stats(self, client: TestClient):
+        """Test metrics endpoint exposes registered application collectors"""
+        response = client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        cache_stats = response.json()["application"]["query_embedding_cache"]
+        assert {"hits", "misses", "hit_rate", "size"} <= set(cache_stats)
+
 
 @pytest.mark.api
 class TestRequestIDMiddleware:
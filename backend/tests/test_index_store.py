@@ -0,0 +1,64 @@
+"""
+Tests for versioned on-disk program indexes
+"""
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services.index_store import current_version_dir, write_index_version
+from app.services.vector_index import IndexRegistry, ProgramIndex
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestIndexStore:
+    """Test versioned, memory-mapped index files"""
+
+    def _catalog(self, db_session):
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        add_embedding(db_session, [0.6, 0.8, 0.0], "BIOE 310")
+        add_embedding(db_session, [0.0, 0.0, 1.0], "CORE", type="requirement")
+
+    def test_workers_map_current_version(self, db_session, tmp_path, monkeypatch):
+        """Indexes load from the written files and search like a fresh build"""
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        self._catalog(db_session)
+        built = ProgramIndex.build(db_session, "rice-bioe-2025")
+        write_index_version(db_session)
+
+        index = IndexRegistry().get(db_session, "rice-bioe-2025")
+
+        assert isinstance(index.vectors, np.memmap)
+        assert index.search([0.8, 0.6, 0.0], 3) == built.search([0.8, 0.6, 0.0], 3)
+        assert index.lexical_search("BIOE 310", 1) == built.lexical_search("BIOE 310", 1)
+        assert index.code_features == built.code_features
+        assert index.cached_rows == built.cached_rows
+        assert {t: p.tolist() for t, p in index.partitions.items()} == {
+            t: p.tolist() for t, p in built.partitions.items()
+        }
+
+    def test_stale_files_are_ignored(self, db_session, tmp_path, monkeypatch):
+        """A catalog change after writing falls back to building from the database"""
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        self._catalog(db_session)
+        write_index_version(db_session)
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 320")
+
+        index = IndexRegistry().get(db_session, "rice-bioe-2025")
+
+        assert not isinstance(index.vectors, np.memmap)
+        assert len(index) == 4
+
+    def test_reseed_swaps_version(self, db_session, tmp_path, monkeypatch):
+        """Writing again switches CURRENT and prunes old versions"""
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "INDEX_VERSIONS_KEPT", 1)
+        self._catalog(db_session)
+
+        first = write_index_version(db_session)
+        second = write_index_version(db_session)
+
+        assert first != second
+        assert current_version_dir().name == second
+        assert [p.name for p in (tmp_path / "versions").iterdir()] == [second]
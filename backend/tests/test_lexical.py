@@ -0,0 +1,120 @@
+"""
+Tests for lexical (BM25) and hybrid retrieval
+"""
+import pytest
+from app.core.config import settings
+from app.models import Embedding
+from app.services.lexical import (
+    BM25Index,
+    extract_course_codes,
+    is_code_only_query,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from app.services.rag import RAGService
+
+
+@pytest.fixture
+def catalog(db_session, monkeypatch):
+    """Three course embeddings with 3-dimensional vectors"""
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+    rows = [
+        ("code: MATH 212\ntitle: Multivariable Calculus\nprereqs: ", [1.0, 0.0, 0.0]),
+        ("code: BIOE 252\ntitle: Bioengineering Fundamentals\nprereqs: MATH 212", [0.0, 1.0, 0.0]),
+        ("code: BIOE 310\ntitle: Biomechanics\nprereqs: BIOE 252", [0.0, 0.0, 1.0]),
+    ]
+    for content, vector in rows:
+        db_session.add(Embedding(
+            program_id="rice-bioe-2025",
+            type="course",
+            content_text=content,
+            vector=vector,
+            meta_data={"code": extract_course_codes(content)[0]},
+        ))
+    db_session.commit()
+    return db_session
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestTokenization:
+    """Test course-code-aware tokenization"""
+
+    def test_codes_are_atomic_tokens(self):
+        """Codes become single tokens so prefixes never match"""
+        assert "math212" in tokenize("prereqs: MATH 212")
+        assert "math21" not in tokenize("prereqs: MATH 212")
+        assert tokenize("cs106b") == tokenize("CS 106B")
+
+    def test_code_only_query_detection(self):
+        """Recommend queries built from completed courses are code-only"""
+        assert is_code_only_query("next semester courses after completing MATH 212, BIOE 252")
+        assert is_code_only_query("CS 106B")
+        assert not is_code_only_query("tissue engineering electives")
+        assert not is_code_only_query("course recommendations and requirements for rice-bioe-2025")
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+class TestBM25:
+    """Test BM25 ranking and rank fusion"""
+
+    def test_bm25_ranks_matching_documents(self):
+        """Documents containing rarer query terms rank first"""
+        index = BM25Index([
+            "code: MATH 212 calculus",
+            "code: BIOE 252 prereqs: MATH 212",
+            "code: CHEM 121 general chemistry",
+        ])
+        positions, scores = index.search("BIOE 252", limit=3)
+        assert positions[0] == 1
+        assert 2 not in positions.tolist()
+        assert scores[0] > 0
+
+    def test_reciprocal_rank_fusion(self):
+        """Items ranked well in both lists win"""
+        vector = [{"id": 1, "distance": 0.1}, {"id": 2, "distance": 0.2}]
+        lexical = [{"id": 2, "distance": 0.0}, {"id": 3, "distance": 0.5}]
+        fused = reciprocal_rank_fusion([vector, lexical], limit=3, rrf_k=60)
+        assert [r["id"] for r in fused] == [2, 1, 3]
+        assert all(0 <= r["distance"] <= 1 for r in fused)
+
+
+@pytest.mark.rag
+@pytest.mark.integration
+class TestHybridRetrieval:
+    """Test lexical fast path and hybrid mode in retrieve_context"""
+
+    def test_fast_path_skips_embedding(self, catalog, monkeypatch):
+        """Code-only queries are answered without an embeddings call"""
+        monkeypatch.setattr(settings, "LEXICAL_FAST_PATH", True)
+        service = RAGService(catalog)
+
+        def fail(text):
+            raise AssertionError("embedding API should not be called")
+
+        monkeypatch.setattr(service, "generate_embedding", fail)
+        results = service.retrieve_context(
+            program_id="rice-bioe-2025",
+            completed_courses=["BIOE 252"],
+            query="next semester courses after completing BIOE 252",
+            k=2,
+        )
+        codes = [r["metadata"]["code"] for r in results]
+        assert set(codes) == {"BIOE 252", "BIOE 310"}
+
+    def test_hybrid_mode_fuses_lexical_matches(self, catalog, monkeypatch):
+        """A strong lexical match is pulled into the vector results"""
+        monkeypatch.setattr(settings, "RETRIEVAL_MODE", "hybrid")
+        service = RAGService(catalog)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: [1.0, 0.0, 0.0])
+
+        results = service.retrieve_context(
+            program_id="rice-bioe-2025",
+            completed_courses=[],
+            query="biomechanics",
+            k=2,
+        )
+        codes = [r["metadata"]["code"] for r in results]
+        assert codes[0] in {"MATH 212", "BIOE 310"}
+        assert "BIOE 310" in codes
@@ -0,0 +1,31 @@
+"""
+Tests for pgvector search queries
+"""
+import pytest
+from app.core.config import settings
+from app.services.pgvector_search import PgvectorSearch, build_search_query
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestPgvectorSearch:
+    """Test database-side search detection and query shape"""
+
+    def test_detect_disabled_on_sqlite(self, db_session):
+        """SQLite has no pgvector, so retrieval stays in-process"""
+        search = PgvectorSearch()
+        assert search.detect(db_session.get_bind()) is False
+        assert search.enabled is False
+
+    def test_search_query_orders_in_database(self, monkeypatch):
+        """The Postgres query ranks by <=> and only returns `limit` rows"""
+        from sqlalchemy.dialects import postgresql
+
+        monkeypatch.setattr(settings, "VECTOR_STORAGE", "pgvector")
+        statement = build_search_query("rice-bioe-2025", [1.0, 0.0, 0.0], limit=24)
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert "embeddings.vector <=> %(query_vector)s" in sql
+        assert "ORDER BY distance" in sql
+        assert "LIMIT" in sql
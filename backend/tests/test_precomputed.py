@@ -0,0 +1,109 @@
+"""
+Tests for precomputed warm-query results
+"""
+import pytest
+from app.core.config import settings
+from app.services.precomputed import is_warm_query, precomputed_results, retrieval_settings_hash
+from app.services.rag import RAGService
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestPrecomputedResults:
+    """Test precomputed results for warm queries"""
+
+    def test_default_query_skips_embedding(self, db_session, monkeypatch):
+        """Repeated default queries are served without embedding the query"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        service = RAGService(db_session)
+        calls = []
+        monkeypatch.setattr(
+            service, "generate_embedding", lambda text: calls.append(text) or [1.0, 0.0, 0.0]
+        )
+
+        first = service.retrieve_context("rice-bioe-2025", completed_courses=[])
+        precomputed_results.invalidate()  # Force the table tier
+        second = service.retrieve_context("rice-bioe-2025", completed_courses=[])
+
+        assert len(calls) == 1
+        assert [r["id"] for r in second] == [r["id"] for r in first]
+        assert second[0]["metadata"] == {"code": "BIOE 252"}
+
+    def test_default_query_keeps_type_quotas(self, db_session, monkeypatch):
+        """Stored partitioned candidates keep the reserved types on later calls"""
+        monkeypatch.setattr(settings, "RETRIEVAL_TYPE_QUOTAS", {"requirement": 2})
+        for i in range(8):
+            add_embedding(db_session, [1.0, 0.05 * i, 0.0], f"BIOE {300 + i}")
+        add_embedding(db_session, [0.0, 0.0, 1.0], "CORE", type="requirement")
+        add_embedding(db_session, [0.0, 0.1, 1.0], "TRACK", type="requirement")
+        service = RAGService(db_session)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: [1.0, 0.0, 0.0])
+
+        first = service.retrieve_context("rice-bioe-2025", completed_courses=[], k=3)
+        second = service.retrieve_context("rice-bioe-2025", completed_courses=[], k=3)
+        precomputed_results.invalidate()  # Force the table tier
+        third = service.retrieve_context("rice-bioe-2025", completed_courses=[], k=3)
+
+        assert [r["type"] for r in first] == ["course", "requirement", "requirement"]
+        assert [r["id"] for r in second] == [r["id"] for r in first]
+        assert [r["id"] for r in third] == [r["id"] for r in first]
+
+    def test_catalog_change_recomputes(self, db_session, monkeypatch):
+        """Stored results are ignored once the program's embeddings change"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        service = RAGService(db_session)
+        calls = []
+        monkeypatch.setattr(
+            service, "generate_embedding", lambda text: calls.append(text) or [0.0, 1.0, 0.0]
+        )
+
+        assert service.precompute_warm_queries("rice-bioe-2025") == 1
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        results = service.retrieve_context("rice-bioe-2025", completed_courses=[])
+
+        assert len(calls) == 2
+        assert results[0]["metadata"] == {"code": "BIOE 310"}
+
+    def test_retrieval_settings_change_recomputes(self, db_session, monkeypatch):
+        """Stored results computed under other retrieval settings are ignored"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        service = RAGService(db_session)
+        calls = []
+        monkeypatch.setattr(
+            service, "generate_embedding", lambda text: calls.append(text) or [1.0, 0.0, 0.0]
+        )
+
+        query = "course recommendations and requirements for rice-bioe-2025"
+        service.precompute_warm_queries("rice-bioe-2025")
+        service.retrieve_context("rice-bioe-2025", completed_courses=[])
+        assert len(calls) == 1
+        assert precomputed_results.get(db_session, "rice-bioe-2025", query, 1) is not None
+
+        for name, value in [
+            ("RETRIEVAL_TYPE_QUOTAS", {"requirement": 1}),
+            ("RETRIEVAL_MODE", "hybrid"),
+            ("VECTOR_QUANTIZATION", "int8"),
+        ]:
+            monkeypatch.setattr(settings, name, value)
+            precomputed_results.invalidate()  # Only the table tier remains
+            assert precomputed_results.get(db_session, "rice-bioe-2025", query, 1) is None
+
+    @pytest.mark.parametrize("name, value", [
+        ("IVF_NLIST", 64),
+        ("PQ_SUBVECTORS", 8),
+        ("QUANTIZATION_RESCORE_FACTOR", 8),
+        ("REDUCED_DIMENSION", 128),
+    ])
+    def test_index_build_settings_change_hash(self, monkeypatch, name, value):
+        """Settings that shape the index or its re-scoring are part of the settings hash"""
+        before = retrieval_settings_hash()
+        monkeypatch.setattr(settings, name, value)
+        assert retrieval_settings_hash() != before
+
+    def test_other_queries_not_precomputed(self, db_session):
+        """Only the default and configured warm queries are eligible"""
+        assert is_warm_query("rice-bioe-2025", "Course recommendations and requirements for rice-bioe-2025")
+        assert not is_warm_query("rice-bioe-2025", "courses after BIOE 252")
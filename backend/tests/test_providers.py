@@ -0,0 +1,93 @@
+"""
+Tests for shared provider clients
+"""
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.ai import AIService
+from app.services.providers import Providers, http_options, providers
+from app.services.rag import RAGService
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncClient(FakeClient):
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.unit
+class TestProviders:
+    """Test the worker-wide client pool"""
+
+    def test_clients_shared_across_services(self, db_session):
+        """Test every service instance uses the same pooled clients"""
+        shared = Providers()
+        first, second = RAGService(db_session, shared), RAGService(db_session, shared)
+        assert first.client is second.client
+        assert first.async_client is second.async_client
+        assert AIService(shared).openai_client is first.client
+        assert shared.created == 2
+
+    def test_injected_clients(self, db_session):
+        """Test injected clients are used without building real ones"""
+        fake = FakeClient()
+        injected = Providers(openai=fake)
+        assert RAGService(db_session, injected).client is fake
+        assert AIService(injected).openai_client is fake
+        assert injected.created == 0
+
+    def test_service_construction_builds_no_clients(self, db_session):
+        """Test clients are only resolved when a provider call is made"""
+        lazy = Providers()
+        RAGService(db_session, lazy).search_courses("rice-bioe-2025", "BIOE")
+        AIService(lazy)
+        assert lazy.created == 0
+
+    def test_aclose_closes_and_rebuilds(self):
+        """Test shutdown closes every client and later use rebuilds them"""
+        sync, async_ = FakeClient(), FakeAsyncClient()
+        pool = Providers(openai=sync, async_anthropic=async_)
+        asyncio.run(pool.aclose())
+        assert sync.closed and async_.closed
+        assert pool.stats()["open_clients"] == []
+
+        rebuilt = pool.openai
+        assert rebuilt is not sync
+        assert pool.stats()["open_clients"] == ["openai"]
+        asyncio.run(pool.aclose())
+
+    def test_http_options_follow_settings(self, monkeypatch):
+        """Test pool limits and timeouts come from settings"""
+        monkeypatch.setattr(settings, "PROVIDER_MAX_CONNECTIONS", 7)
+        monkeypatch.setattr(settings, "PROVIDER_CONNECT_TIMEOUT_SECONDS", 1.5)
+        monkeypatch.setattr(settings, "PROVIDER_HTTP2", False)
+        options = http_options()
+        assert options["limits"].max_connections == 7
+        assert options["timeout"].connect == 1.5
+        assert options["http2"] is False
+
+    def test_search_route_uses_no_provider(self, client: TestClient, auth_headers: dict, monkeypatch):
+        """Test /api/search never touches an LLM or embedding client"""
+        def fail(name):
+            raise AssertionError(f"{name} client built by /api/search")
+
+        monkeypatch.setattr(providers, "_get", fail)
+        response = client.get("/api/search?program_id=rice-bioe-2025&q=BIOE", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_metrics_report_providers(self, client: TestClient):
+        """Test provider pool settings appear in /metrics"""
+        stats = client.get("/metrics").json()["application"]["providers"]
+        assert stats["max_connections"] == settings.PROVIDER_MAX_CONNECTIONS
+        assert "openai" in stats["open_clients"]
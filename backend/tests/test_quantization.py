@@ -0,0 +1,95 @@
+"""
+Tests for int8 / product-quantized search with full-precision re-scoring
+"""
+import numpy as np
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.services.quantization import full_vectors_path
+from app.services.vector_index import ProgramIndex, index_registry, normalize_rows
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestQuantization:
+    """Test int8 / product-quantized search with full-precision re-scoring"""
+
+    def _index(self, n=400, dim=32):
+        rng = np.random.default_rng(7)
+        vectors = normalize_rows(rng.normal(size=(n, dim)).astype(np.float32))
+        ids = np.arange(1, n + 1, dtype=np.int64)
+        return ProgramIndex("big-program", ids, vectors, ["course"] * n, None)
+
+    @pytest.mark.parametrize("mode,bytes_per_vector", [("int8", 32), ("pq", 2)])
+    def test_quantized_search_matches_exact(self, mode, bytes_per_vector, tmp_path, monkeypatch):
+        """Re-scored quantized search recovers the exact top-k"""
+        monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", mode)
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        index = self._index()
+        queries = index.vectors[:20].copy()
+        index.prepare_quantization()
+
+        assert isinstance(index.vectors, np.memmap)
+        assert index.stats()["bytes_per_vector"] == bytes_per_vector
+        assert index.stats()["full_precision_bytes_per_vector"] == 128
+
+        hits = 0
+        for query in queries:
+            exact = {r["id"] for r in index.search(query, 10, exact=True)}
+            approx = {r["id"] for r in index.search(query, 10)}
+            hits += len(exact & approx)
+        assert hits / 200 >= 0.9
+        assert index.recall["rescored"] >= index.recall["quantized"]
+
+    def test_build_writes_rows_to_the_memory_map(self, db_session, tmp_path, monkeypatch):
+        """Quantized builds stream rows into the spilled file, skipping bad dimensions"""
+        monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "int8")
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        add_embedding(db_session, [3.0, 4.0, 0.0], "BIOE 252")
+        add_embedding(db_session, [0.0, 0.0, 2.0], "BIOE 310")
+        index = ProgramIndex.build(db_session, "rice-bioe-2025")
+
+        assert isinstance(index.vectors, np.memmap)
+        assert str(index.vectors.filename) == str(full_vectors_path("rice-bioe-2025"))
+        assert np.allclose(index.vectors, [[0.6, 0.8, 0.0], [0.0, 0.0, 1.0]])
+        assert [path.name for path in tmp_path.iterdir()] == ["rice-bioe-2025.f32.npy"]
+
+        # VectorType rejects other dimensions, so write the stale row directly
+        db_session.execute(text(
+            "INSERT INTO embeddings (program_id, type, content_text, vector) "
+            "VALUES ('rice-bioe-2025', 'course', 'code: BIOE 330', :vector)"
+        ), {"vector": np.ones(4, dtype="<f4").tobytes()})
+        db_session.commit()
+        index = ProgramIndex.build(db_session, "rice-bioe-2025")
+        assert len(index) == 2 and index.vectors.shape == (2, 3)
+        assert [path.name for path in tmp_path.iterdir()] == ["rice-bioe-2025.f32.npy"]
+
+    def test_rescored_distances_are_exact(self, tmp_path, monkeypatch):
+        """Returned distances come from the full-precision vectors"""
+        monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "int8")
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        index = self._index()
+        query = index.vectors[3].copy()
+        index.prepare_quantization()
+
+        top = index.search(query, 1)[0]
+        assert top["id"] == 4
+        assert abs(top["distance"]) < 1e-5
+
+    def test_metrics_report_quantization(self, db_session, tmp_path, monkeypatch):
+        """/metrics reports memory per vector and recall@k per program"""
+        monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "int8")
+        monkeypatch.setattr(settings, "INDEX_DIR", str(tmp_path))
+        for i in range(20):
+            add_embedding(db_session, [1.0, i / 20, 0.5], f"BIOE {200 + i}")
+        index_registry.get(db_session, "rice-bioe-2025")
+
+        stats = metrics_registry.collect()["vector_index"]
+        program = stats["programs"]["rice-bioe-2025"]
+        assert stats["quantization"] == "int8"
+        assert program["bytes_per_vector"] == 3
+        assert program["resident_vector_bytes"] < 20 * 12
+        assert 0.0 <= program["recall_at_k"]["rescored"] <= 1.0
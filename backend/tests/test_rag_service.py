@@ -136,3 +136,53 @@ class TestRAGService:
         assert len(results) == 2
         assert all(c.code.startswith("BIOE") for c in results)
 
+
+    def test_rerank_exact_code_match(self, db_session):
+        """Test re-ranking matches whole course codes, not substrings"""
+        service = RAGService(db_session)
+        results = [
+            {
+                "id": 1,
+                "content_text": "code: BIOE 310\nprereqs: MATH 212",
+                "metadata": {"code": "BIOE 310"},
+                "distance": 0.5,
+            },
+            {
+                "id": 2,
+                "content_text": "code: BIOE 320\nprereqs: MATH 21",
+                "metadata": {"code": "BIOE 320"},
+                "distance": 0.45,
+            },
+        ]
+        reranked = service._rerank_by_prereqs(results, ["MATH 21"])
+
+        assert [r["id"] for r in reranked] == [2, 1]
+        assert abs(reranked[0]["distance"] - 0.35) < 1e-6
+        assert reranked[1]["distance"] == 0.5
+
+    def test_rerank_feature_weights(self, db_session, monkeypatch):
+        """Test per-feature boost weights are configurable"""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "RERANK_PREREQ_BOOST", 0.3)
+        monkeypatch.setattr(settings, "RERANK_MENTION_BOOST", 0.0)
+        service = RAGService(db_session)
+        results = [
+            {
+                "id": 1,
+                "content_text": "code: BIOE 310\ndescription: unlike CHEM 121",
+                "metadata": {"code": "BIOE 310"},
+                "distance": 0.4,
+            },
+            {
+                "id": 2,
+                "content_text": "code: BIOE 252\nprereqs: CHEM 121",
+                "metadata": {"code": "BIOE 252"},
+                "distance": 0.6,
+            },
+        ]
+        reranked = service._rerank_by_prereqs(results, ["chem121"])
+
+        assert [r["id"] for r in reranked] == [2, 1]
+        assert abs(reranked[0]["distance"] - 0.3) < 1e-6
+        assert reranked[1]["distance"] == 0.4
@@ -0,0 +1,72 @@
+"""
+Tests for embedding dimensionality reduction
+"""
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services.rag import RAGService
+from app.services.reduction import EmbeddingReducer, Projection, save_projection
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestEmbeddingReduction:
+    """Test truncated / PCA-reduced vector storage and query projection"""
+
+    def test_truncate_query_and_storage(self, db_session, monkeypatch):
+        """Truncation keeps a renormalized prefix and sets the stored dimension"""
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+        monkeypatch.setattr(settings, "EMBEDDING_REDUCTION", "truncate")
+        monkeypatch.setattr(settings, "REDUCED_DIMENSION", 2)
+        service = RAGService(db_session)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: [3.0, 4.0, 9.0, 9.0])
+
+        assert settings.STORED_EMBEDDING_DIMENSION == 2
+        assert np.allclose(service.query_vector("query"), [0.6, 0.8])
+        with pytest.raises(Exception, match="2 dimensions"):
+            add_embedding(db_session, [1.0, 0.0, 0.0, 0.0], "BIOE 252")
+        db_session.rollback()
+
+    def test_pca_projection_applied_to_queries(self, db_session, monkeypatch):
+        """Queries are projected with the stored PCA projection before search"""
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+        monkeypatch.setattr(settings, "EMBEDDING_REDUCTION", "pca")
+        monkeypatch.setattr(settings, "REDUCED_DIMENSION", 2)
+        raw = np.array(
+            [[1.0, 0.0, 0.1, 0.0], [0.0, 1.0, 0.0, 0.1], [0.7, 0.7, 0.0, 0.0]],
+            dtype=np.float32,
+        )
+        projection = Projection.fit(raw, "pca", 2)
+        save_projection(db_session, projection)
+        for vector, code in zip(projection.apply(raw), ["BIOE 252", "BIOE 310", "BIOE 320"]):
+            add_embedding(db_session, vector, code)
+
+        service = RAGService(db_session)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: raw[1].tolist())
+        results = service.retrieve_context("rice-bioe-2025", [], query="biomechanics")
+
+        assert results[0]["metadata"] == {"code": "BIOE 310"}
+        assert abs(results[0]["distance"]) < 1e-5
+
+    def test_reseeded_projection_reloaded_without_invalidate(self, db_session, monkeypatch):
+        """Workers that did not serve the re-seed pick up the new projection"""
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+        monkeypatch.setattr(settings, "EMBEDDING_REDUCTION", "pca")
+        monkeypatch.setattr(settings, "REDUCED_DIMENSION", 2)
+        raw = np.array(
+            [[1.0, 0.0, 0.1, 0.0], [0.0, 1.0, 0.0, 0.1], [0.7, 0.7, 0.0, 0.0]],
+            dtype=np.float32,
+        )
+        reducer = EmbeddingReducer()
+        save_projection(db_session, Projection.fit(raw, "pca", 2))
+        first = reducer.projection(db_session)
+        assert reducer.projection(db_session) is first
+
+        reseeded = Projection.fit(raw[:, ::-1].copy(), "pca", 2)
+        save_projection(db_session, reseeded)
+        current = reducer.projection(db_session)
+
+        assert current is not first
+        assert np.allclose(current.components, reseeded.components)
@@ -0,0 +1,164 @@
+"""
+Tests for the recommendation response cache
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models import Course, Program, RecommendationCacheEntry
+from app.schemas.recommend import RecommendRequest
+from app.services import response_cache as response_cache_module
+from app.services.ai import AIService
+from app.services.rag import RAGService
+from app.services.response_cache import ResponseCache, canonical_request, response_cache_key
+
+RESULT = {
+    "recommendations": [{
+        "code": "BIOE 310",
+        "title": "Biomechanics",
+        "reason": "Core requirement",
+        "fulfills": ["bioe-core-1"],
+        "prereq_ok": True,
+        "citations": ["https://ga.rice.edu/"],
+    }],
+    "notes": [],
+    "assumptions": [],
+    "warnings": [],
+}
+
+
+def make_request(**overrides):
+    fields = {
+        "university": "Rice",
+        "program_id": "rice-bioe-2025",
+        "completed": ["MATH 212", "BIOE 252"],
+        "credits_target": 15,
+    }
+    fields.update(overrides)
+    return RecommendRequest(**fields)
+
+
+@pytest.mark.unit
+class TestResponseCacheKey:
+    """Test canonical request hashing"""
+
+    def test_equivalent_requests_share_a_key(self):
+        """Test order, duplicates, case and spacing of completed courses are ignored"""
+        first = make_request()
+        second = make_request(completed=["bioe252", "MATH 212", "math  212"], university=" rice ")
+        assert canonical_request(first) == canonical_request(second)
+        assert response_cache_key(first, "v1") == response_cache_key(second, "v1")
+
+    @pytest.mark.parametrize("overrides", [
+        {"completed": ["MATH 212"]},
+        {"credits_target": 12},
+        {"track": "pre-med"},
+        {"preferences": {"avoid_labs": True}},
+        {"program_id": "rice-ceng-2025"},
+    ])
+    def test_different_requests_differ(self, overrides):
+        """Test every response-relevant field is part of the key"""
+        assert response_cache_key(make_request(), "v1") != response_cache_key(make_request(**overrides), "v1")
+
+    def test_catalog_and_model_versions_in_key(self, monkeypatch):
+        """Test a new catalog or model produces a new key"""
+        request = make_request()
+        key = response_cache_key(request, "v1")
+        assert response_cache_key(request, "v2") != key
+        monkeypatch.setattr(settings, "OPENAI_MODEL", "gpt-5")
+        assert response_cache_key(request, "v1") != key
+        monkeypatch.setattr(response_cache_module, "PROMPT_VERSION", 2)
+        assert response_cache_key(request, "v1") != key
+
+    def test_errors_not_stored(self, db_session):
+        """Test failed generations are not cached"""
+        cache = ResponseCache(max_size=4, ttl_seconds=60)
+        failed = {"recommendations": [], "warnings": ["Error generating recommendations: timeout"]}
+        cache.store(db_session, "k", "rice-bioe-2025", failed)
+        assert cache.get(db_session, "k") is None
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestRecommendCacheAPI:
+    """Test caching on /api/recommend"""
+
+    @pytest.fixture
+    def generations(self, db_session, monkeypatch):
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+        calls = []
+
+        async def fake_embedding(self, text):
+            return [0.0, 0.0, 1.0]
+
+        async def fake_model(self, **kwargs):
+            calls.append(kwargs)
+            return RESULT
+
+        monkeypatch.setattr(RAGService, "generate_embedding_async", fake_embedding)
+        monkeypatch.setattr(AIService, "generate_recommendations_async", fake_model)
+        return calls
+
+    def post(self, client, auth_headers, **overrides):
+        return client.post(
+            "/api/recommend",
+            headers=auth_headers,
+            json=make_request(**overrides).model_dump(),
+        )
+
+    def test_identical_requests_hit(self, client: TestClient, auth_headers: dict, generations):
+        """Test a repeated (equivalent) request is served without generation"""
+        before = client.get("/metrics").json()["application"]["recommend_cache"]
+        first = self.post(client, auth_headers)
+        second = self.post(client, auth_headers, completed=["bioe 252", "MATH 212"])
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == first.json() == RESULT
+        assert len(generations) == 1
+
+        stats = client.get("/metrics").json()["application"]["recommend_cache"]
+        assert stats["hits"] == before["hits"] + 1
+        assert stats["stores"] == before["stores"] + 1
+
+    def test_catalog_change_misses(self, client: TestClient, db_session, auth_headers: dict, generations):
+        """Test adding a course to the program invalidates its cached responses"""
+        self.post(client, auth_headers)
+        db_session.add(Course(
+            program_id="rice-bioe-2025",
+            code="BIOE 999",
+            title="New Course",
+            credits=3,
+        ))
+        db_session.commit()
+
+        assert self.post(client, auth_headers).headers["X-Cache"] == "MISS"
+        assert len(generations) == 2
+
+    def test_shared_tier(self, client: TestClient, db_session, auth_headers: dict, generations, monkeypatch):
+        """Test another worker (empty memory tier) is served from the database"""
+        monkeypatch.setattr(settings, "RECOMMEND_CACHE_SHARED", True)
+        self.post(client, auth_headers)
+        assert db_session.query(RecommendationCacheEntry).count() == 1
+
+        response_cache_module.response_cache.invalidate()
+        response = self.post(client, auth_headers)
+        assert response.headers["X-Cache"] == "HIT"
+        assert len(generations) == 1
+
+    def test_disabled(self, client: TestClient, auth_headers: dict, generations, monkeypatch):
+        """Test RECOMMEND_CACHE_SIZE=0 turns caching off"""
+        monkeypatch.setattr(response_cache_module.response_cache.memory, "max_size", 0)
+        self.post(client, auth_headers)
+        response = self.post(client, auth_headers)
+        assert "X-Cache" not in response.headers
+        assert len(generations) == 2
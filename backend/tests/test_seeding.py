@@ -101,3 +101,68 @@ class TestSeeding:
             programs_file.unlink()
             programs_file.parent.rmdir()
 
+    def test_store_embeddings_with_pca(self, db_session, monkeypatch):
+        """Stored vectors are PCA-reduced and the projection is saved"""
+        from app.core.config import settings
+        from app.services.reduction import load_projection
+        from scripts.seed_database import store_embeddings
+
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+        monkeypatch.setattr(settings, "EMBEDDING_REDUCTION", "pca")
+        monkeypatch.setattr(settings, "REDUCED_DIMENSION", 2)
+        embeddings = [
+            {
+                "program_id": "test-program",
+                "type": "course",
+                "content_text": f"code: TEST {100 + i}",
+                "vector": [1.0, float(i), 0.5 * i, 0.0],
+                "meta_data": {"code": f"TEST {100 + i}"},
+            }
+            for i in range(5)
+        ]
+
+        store_embeddings(db_session, embeddings)
+
+        stored = db_session.query(Embedding).all()
+        assert len(stored) == 5
+        assert all(len(e.vector) == 2 for e in stored)
+        assert load_projection(db_session).components.shape == (2, 4)
+
+
+
+@pytest.mark.seeding
+@pytest.mark.integration
+class TestEmbeddingVectorMigration:
+    """Test the JSON -> float32 vector migration script"""
+
+    def test_migrates_legacy_json_vectors(self, monkeypatch):
+        """Legacy JSON vectors are rewritten as binary float32"""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+        from app.core.config import settings
+        from scripts.migrate_embedding_vectors import (
+            migrate_embedding_vectors,
+            needs_migration,
+        )
+
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+        engine = create_engine("sqlite:///:memory:")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE embeddings (id INTEGER PRIMARY KEY, "
+                "program_id VARCHAR NOT NULL, type VARCHAR NOT NULL, "
+                "content_text TEXT NOT NULL, vector JSON NOT NULL, meta_data JSON)"
+            ))
+            for i in range(1, 4):
+                conn.execute(
+                    text("INSERT INTO embeddings VALUES (:id, 'p', 'course', 'x', :v, '{}')"),
+                    {"id": i, "v": json.dumps([float(i), 0.0, 1.0])},
+                )
+
+        assert needs_migration(engine)
+        assert migrate_embedding_vectors(engine, batch_size=2) == 3
+        assert not needs_migration(engine)
+
+        with Session(engine) as session:
+            vectors = [e.vector.tolist() for e in session.query(Embedding).order_by(Embedding.id)]
+        assert vectors == [[1.0, 0.0, 1.0], [2.0, 0.0, 1.0], [3.0, 0.0, 1.0]]
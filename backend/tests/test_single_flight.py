@@ -0,0 +1,288 @@
+"""
+Tests for single-flight coalescing of recommendation requests
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import status
+
+from app.core.database import get_db, get_session_factory
+from app.main import app
+from app.models import Program
+from app.services.ai import AIService
+from app.services.rag import RAGService
+from app.services.single_flight import SingleFlight, recommendation_flights
+from tests.conftest import TestingSessionLocal
+
+
+async def wait_until(predicate, timeout=5):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=timeout)
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test sharing one call between concurrent callers"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_result(self):
+        """Test callers with the same key run the function once"""
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": 1}
+
+        waiters = [asyncio.create_task(flights.run("k", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        assert flights.stats()["leaders"] == 1
+        assert flights.stats()["coalesced"] == 4
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test callers with different keys are not coalesced"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            return object()
+
+        first, second = await asyncio.gather(flights.run("a", work), flights.run("b", work))
+        assert first is not second
+        assert flights.stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_waiter_and_is_not_kept(self):
+        """Test an exception is raised in every waiter and the next call retries"""
+        flights = SingleFlight()
+        attempts = 0
+
+        async def failing():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *(flights.run("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert attempts == 1
+
+        with pytest.raises(RuntimeError):
+            await flights.run("k", failing)
+        assert attempts == 2
+        assert flights.stats()["errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Test one disconnecting caller leaves the shared call running"""
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flights.run("k", work))
+        follower = asyncio.create_task(flights.run("k", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        assert await follower == "done"
+        assert flights.stats()["cancelled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancels_call(self):
+        """Test the shared call is cancelled once nobody waits for it"""
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(flights.run("k", work)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert flights.stats()["cancelled"] == 1
+        assert len(flights) == 0
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestRecommendCoalescing:
+    """Test identical concurrent /api/recommend requests share one generation"""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_coalesced(self, db_session, auth_headers: dict, monkeypatch):
+        """Test N identical requests make one embedding and one model call"""
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+        embeddings = 0
+        generations = 0
+        release = asyncio.Event()
+
+        async def fake_embedding(self, text):
+            nonlocal embeddings
+            embeddings += 1
+            return [0.0, 0.0, 1.0]
+
+        async def slow_model(self, **kwargs):
+            nonlocal generations
+            generations += 1
+            await asyncio.wait_for(release.wait(), timeout=5)
+            return {"recommendations": [], "notes": ["shared"], "assumptions": [], "warnings": []}
+
+        monkeypatch.setattr(RAGService, "generate_embedding_async", fake_embedding)
+        monkeypatch.setattr(AIService, "generate_recommendations_async", slow_model)
+
+        def per_request_db():
+            db = TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        concurrent = 4
+        before = recommendation_flights.stats()
+        app.dependency_overrides[get_db] = per_request_db
+        app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                payload = {
+                    "university": "Rice",
+                    "program_id": "rice-bioe-2025",
+                    "completed": ["MATH 212", "BIOE 252"],
+                    "credits_target": 15,
+                }
+                requests = [
+                    asyncio.create_task(client.post("/api/recommend", headers=auth_headers, json=payload))
+                    for _ in range(concurrent)
+                ]
+                await wait_until(
+                    lambda: recommendation_flights.stats()["coalesced"] == before["coalesced"] + concurrent - 1
+                )
+                release.set()
+                responses = await asyncio.wait_for(asyncio.gather(*requests), timeout=5)
+
+                stats = (await client.get("/metrics")).json()["application"]["recommend_single_flight"]
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [r.status_code for r in responses] == [status.HTTP_200_OK] * concurrent
+        assert all(r.json()["notes"] == ["shared"] for r in responses)
+        assert embeddings == 1
+        assert generations == 1
+        assert stats["leaders"] == before["leaders"] + 1
+        assert stats["coalesced"] == before["coalesced"] + concurrent - 1
+
+    @pytest.mark.asyncio
+    async def test_leader_disconnect_keeps_generation_session(self, db_session, auth_headers: dict, monkeypatch):
+        """Test the shared generation uses its own session, open until it finishes"""
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+        request_sessions = []
+        generation_sessions = []
+        closed = []
+        release = asyncio.Event()
+
+        class RecordingSession(type(db_session)):
+            def close(self):
+                closed.append(self)
+                super().close()
+
+        def session(record):
+            db = RecordingSession(bind=db_session.get_bind(), autoflush=False)
+            record.append(db)
+            return db
+
+        def per_request_db():
+            db = session(request_sessions)
+            try:
+                yield db
+            finally:
+                db.close()
+
+        async def fake_embedding(self, text):
+            return [0.0, 0.0, 1.0]
+
+        async def slow_model(self, **kwargs):
+            await asyncio.wait_for(release.wait(), timeout=5)
+            assert generation_sessions[0] not in closed
+            return {"recommendations": [], "notes": ["shared"], "assumptions": [], "warnings": []}
+
+        monkeypatch.setattr(RAGService, "generate_embedding_async", fake_embedding)
+        monkeypatch.setattr(AIService, "generate_recommendations_async", slow_model)
+
+        before = recommendation_flights.stats()
+        app.dependency_overrides[get_db] = per_request_db
+        app.dependency_overrides[get_session_factory] = lambda: lambda: session(generation_sessions)
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                payload = {
+                    "university": "Rice",
+                    "program_id": "rice-bioe-2025",
+                    "completed": [],
+                    "credits_target": 15,
+                }
+                leader = asyncio.create_task(client.post("/api/recommend", headers=auth_headers, json=payload))
+                await wait_until(lambda: recommendation_flights.stats()["leaders"] > before["leaders"])
+                follower = asyncio.create_task(client.post("/api/recommend", headers=auth_headers, json=payload))
+                await wait_until(lambda: recommendation_flights.stats()["coalesced"] > before["coalesced"])
+
+                leader.cancel()  # The leader's client disconnects
+                await asyncio.gather(leader, return_exceptions=True)
+                release.set()
+                response = await asyncio.wait_for(follower, timeout=5)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["notes"] == ["shared"]
+        assert len(generation_sessions) == 1
+        assert generation_sessions[0] not in request_sessions
+        assert generation_sessions[0] in closed
@@ -0,0 +1,182 @@
+"""
+Tests for streamed recommendations (incremental parser and SSE endpoint)
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Program
+from app.services.providers import Providers, get_providers
+from app.services.streaming import RecommendationStreamParser, StreamMetrics, stream_metrics
+
+RECOMMENDATION = {
+    "code": "BIOE 310",
+    "title": "Biomechanics",
+    "reason": "Core {lab} course, see \"notes\" [1]",
+    "fulfills": ["BIOE core"],
+    "prereq_ok": True,
+    "citations": ["https://ga.rice.edu/"],
+}
+DOCUMENT = json.dumps({
+    "recommendations": [RECOMMENDATION, dict(RECOMMENDATION, code="BIOE 372")],
+    "notes": ["Lab heavy"],
+    "assumptions": [],
+    "warnings": [],
+}, indent=2)
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.unit
+class TestRecommendationStreamParser:
+    """Test incremental extraction of recommendation objects"""
+
+    @pytest.mark.parametrize("size", [1, 3, 17, len(DOCUMENT)])
+    def test_objects_emitted_once_complete(self, size):
+        """Test every recommendation is emitted once, whatever the chunking"""
+        parser = RecommendationStreamParser()
+        emitted = [r for chunk in chunks(DOCUMENT, size) for r in parser.feed(chunk)]
+        assert [r["code"] for r in emitted] == ["BIOE 310", "BIOE 372"]
+        assert emitted[0] == RECOMMENDATION
+        assert parser.text == DOCUMENT
+
+    def test_first_object_before_document_ends(self):
+        """Test the first recommendation is available before the second starts"""
+        parser = RecommendationStreamParser()
+        end_of_first = DOCUMENT.index("BIOE 372")
+        assert len(parser.feed(DOCUMENT[:end_of_first])) == 1
+
+    def test_ignores_other_arrays(self):
+        """Test objects outside the recommendations array are not emitted"""
+        parser = RecommendationStreamParser()
+        text = json.dumps({"notes": [{"code": "X"}], "recommendations": [{"code": "Y"}]})
+        assert parser.feed(text) == [{"code": "Y"}]
+
+
+class FakeStream:
+    """Async iterator of chat completion chunks"""
+
+    def __init__(self, pieces):
+        self.pieces = iter(pieces)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            piece = next(self.pieces)
+        except StopIteration:
+            raise StopAsyncIteration
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+def fake_openai(document=DOCUMENT, error=None):
+    async def create_completion(**kwargs):
+        assert kwargs["stream"] is True
+        if error:
+            raise error
+        return FakeStream(chunks(document, 5))
+
+    async def create_embedding(**kwargs):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[0.0, 0.0, 1.0])])
+
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create_completion)),
+        embeddings=SimpleNamespace(create=create_embedding),
+    )
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestRecommendStreamAPI:
+    """Test the SSE recommend endpoint"""
+
+    @pytest.fixture
+    def program(self, db_session):
+        db_session.add(Program(
+            program_id="rice-bioe-2025",
+            university="Rice",
+            degree="BS",
+            major="Bioengineering",
+            catalog_url="https://example.com",
+            version_year=2025,
+        ))
+        db_session.commit()
+
+    def post(self, client, auth_headers, openai):
+        app.dependency_overrides[get_providers] = lambda: Providers(async_openai=openai)
+        return client.post(
+            "/api/recommend/stream",
+            headers=auth_headers,
+            json={
+                "university": "Rice",
+                "program_id": "rice-bioe-2025",
+                "completed": ["MATH 212"],
+                "credits_target": 15,
+            },
+        )
+
+    def test_stream_requires_auth(self, client: TestClient):
+        """Test that the stream endpoint requires authentication"""
+        response = client.post("/api/recommend/stream", json={"university": "Rice", "program_id": "x"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_streams_recommendations_then_done(self, client: TestClient, program, auth_headers: dict):
+        """Test one event per recommendation, then notes in a done event"""
+        streams_before = stream_metrics.streams
+        response = self.post(client, auth_headers, fake_openai())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert [e for e, _ in events] == ["recommendation", "recommendation", "done"]
+        assert events[0][1] == RECOMMENDATION
+        assert events[-1][1] == {"notes": ["Lab heavy"], "assumptions": [], "warnings": []}
+
+        stats = client.get("/metrics").json()["application"]["recommend_stream"]
+        assert stats["streams"] == streams_before + 1
+        assert stats["time_to_first_recommendation_seconds"]["p50"] is not None
+
+    def test_invalid_recommendations_skipped(self, client: TestClient, program, auth_headers: dict):
+        """Test objects missing CourseRecommendation fields are not sent"""
+        document = json.dumps({"recommendations": [{"code": "BIOE 310"}, RECOMMENDATION]})
+        events = parse_sse(self.post(client, auth_headers, fake_openai(document)).text)
+        assert [e for e, _ in events] == ["recommendation", "done"]
+
+    def test_provider_error(self, client: TestClient, program, auth_headers: dict):
+        """Test failures end with error and done events"""
+        events = parse_sse(self.post(client, auth_headers, fake_openai(error=RuntimeError("boom"))).text)
+        assert [e for e, _ in events] == ["error", "done"]
+        assert "boom" in events[-1][1]["warnings"][0]
+
+    def test_unknown_program(self, client: TestClient, auth_headers: dict):
+        """Test an unknown program fails before the stream starts"""
+        response = self.post(client, auth_headers, fake_openai())
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.unit
+def test_stream_metrics_percentiles():
+    """Test time-to-first-recommendation percentiles"""
+    metrics = StreamMetrics()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record(seconds, 1.0, recommendations=2)
+    metrics.record(None, 0.5, recommendations=0, error=True)
+    stats = metrics.stats()
+    assert stats["streams"] == 5
+    assert stats["errors"] == 1
+    assert stats["time_to_first_recommendation_seconds"]["p50"] == 0.3
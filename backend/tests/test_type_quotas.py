@@ -0,0 +1,70 @@
+"""
+Tests for per-type retrieval quotas
+"""
+import pytest
+from app.core.config import settings
+from app.services.pgvector_search import build_search_query
+from app.services.rag import RAGService
+from app.services.vector_index import apply_type_quotas, index_registry
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestTypeQuotas:
+    """Test type-partitioned retrieval with per-type quotas"""
+
+    def _catalog(self, db_session):
+        for i, vector in enumerate([[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.8, 0.2, 0.0]]):
+            add_embedding(db_session, vector, f"BIOE {252 + i}")
+        add_embedding(db_session, [0.0, 0.0, 1.0], "CORE", type="requirement")
+
+    def test_quota_reserves_requirement_slots(self, db_session, monkeypatch):
+        """Requirements far from the query still make the top k"""
+        self._catalog(db_session)
+        service = RAGService(db_session)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: [1.0, 0.0, 0.0])
+
+        plain = service.retrieve_context("rice-bioe-2025", [], query="intro", k=2)
+        monkeypatch.setattr(settings, "RETRIEVAL_TYPE_QUOTAS", {"requirement": 1})
+        with_quota = service.retrieve_context("rice-bioe-2025", [], query="intro", k=2)
+
+        assert [r["type"] for r in plain] == ["course", "course"]
+        assert [r["type"] for r in with_quota] == ["course", "requirement"]
+        assert with_quota[0]["metadata"] == {"code": "BIOE 252"}
+
+    def test_small_partition_served_from_memory(self, db_session):
+        """Cached partitions come back hydrated, so no text lookup is needed"""
+        self._catalog(db_session)
+        index = index_registry.get(db_session, "rice-bioe-2025")
+        results = index.search_partitioned([1.0, 0.0, 0.0], 1, {"requirement": -1})
+
+        assert set(index.partitions) == {"course", "requirement"}
+        requirement = [r for r in results if r["type"] == "requirement"][0]
+        assert requirement["content_text"] == "code: CORE"
+        assert [r["type"] for r in results] == ["course", "requirement"]
+
+    def test_apply_type_quotas(self):
+        """Reserved results keep their rank order; the rest fill remaining slots"""
+        results = [
+            {"id": 1, "type": "course", "distance": 0.1},
+            {"id": 2, "type": "course", "distance": 0.2},
+            {"id": 3, "type": "requirement", "distance": 0.3},
+            {"id": 4, "type": "requirement", "distance": 0.4},
+        ]
+
+        assert [r["id"] for r in apply_type_quotas(results, 2, {})] == [1, 2]
+        assert [r["id"] for r in apply_type_quotas(results, 2, {"requirement": 1})] == [1, 3]
+        assert [r["id"] for r in apply_type_quotas(results, 3, {"requirement": -1})] == [1, 3, 4]
+
+    def test_pgvector_query_filters_type(self, monkeypatch):
+        """Per-type pgvector queries filter on embeddings.type"""
+        from sqlalchemy.dialects import postgresql
+
+        monkeypatch.setattr(settings, "VECTOR_STORAGE", "pgvector")
+        statement = build_search_query("rice-bioe-2025", [1.0, 0.0, 0.0], None, type="requirement")
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert "embeddings.type = %(type_1)s" in sql
+        assert "LIMIT" not in sql
@@ -0,0 +1,243 @@
+"""
+Tests for the in-memory embedding index
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from app.models import Embedding
+from app.services.rag import RAGService
+from app.services.vector_index import (
+    IndexRegistry,
+    ProgramIndex,
+    hydrate_results,
+    index_registry,
+    normalize_rows,
+)
+from tests.conftest import add_embedding
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestVectorStorage:
+    """Test float32 binary vector storage"""
+
+    def test_vector_round_trip(self, db_session):
+        """Vectors come back as float32 arrays"""
+        embedding = add_embedding(db_session, [0.5, 0.25, 1.0], "BIOE 252")
+        db_session.expire_all()
+
+        stored = db_session.query(Embedding).get(embedding.id)
+        assert stored.vector.dtype == np.float32
+        assert stored.vector.tolist() == [0.5, 0.25, 1.0]
+
+    def test_dimension_enforced_on_write(self, db_session):
+        """Writing a vector of the wrong dimension is rejected"""
+        with pytest.raises(Exception, match="3 dimensions"):
+            add_embedding(db_session, [1.0, 0.0], "BIOE 252")
+        db_session.rollback()
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestProgramIndex:
+    """Test vectorized index build and search"""
+
+    def test_build_normalizes_vectors(self, db_session):
+        """Rows are stored as unit-length float32 vectors"""
+        add_embedding(db_session, [3.0, 4.0, 0.0], "BIOE 252")
+
+        index = ProgramIndex.build(db_session, "rice-bioe-2025")
+        assert len(index) == 1
+        assert index.vectors.dtype.name == "float32"
+        assert abs(float(index.vectors[0] @ index.vectors[0]) - 1.0) < 1e-6
+
+    def test_search_orders_by_distance(self, db_session):
+        """Search returns nearest ids first, without text"""
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        bioe_252 = add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        bioe_320 = add_embedding(db_session, [1.0, 1.0, 0.0], "BIOE 320")
+
+        index = ProgramIndex.build(db_session, "rice-bioe-2025")
+        results = index.search([1.0, 0.1, 0.0], k=2)
+
+        assert [r["id"] for r in results] == [bioe_252.id, bioe_320.id]
+        assert set(results[0]) == {"id", "type", "distance"}
+        assert results[0]["distance"] < results[1]["distance"]
+
+    def test_hydrate_results(self, db_session):
+        """Winners are hydrated into retrieve_context's shape, in order"""
+        first = add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        second = add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+
+        hydrated = hydrate_results(db_session, [
+            {"id": second.id, "distance": 0.1},
+            {"id": 9999, "distance": 0.2},
+            {"id": first.id, "distance": 0.3},
+        ])
+
+        assert [r["metadata"]["code"] for r in hydrated] == ["BIOE 252", "BIOE 310"]
+        assert set(hydrated[0]) == {
+            "id", "program_id", "type", "content_text", "metadata", "distance"
+        }
+        assert hydrated[0]["distance"] == 0.1
+
+    def test_search_dimension_mismatch(self, db_session):
+        """Mismatched query vectors score like cosine_similarity (distance 1)"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+
+        index = ProgramIndex.build(db_session, "rice-bioe-2025")
+        results = index.search([1.0, 0.0], k=5)
+        assert len(results) == 1
+        assert abs(results[0]["distance"] - 1.0) < 1e-6
+
+    def test_registry_rebuilds_when_catalog_changes(self, db_session):
+        """The cached index is rebuilt after embeddings are added"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        first = index_registry.get(db_session, "rice-bioe-2025")
+        assert index_registry.get(db_session, "rice-bioe-2025") is first
+
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        second = index_registry.get(db_session, "rice-bioe-2025")
+        assert second is not first
+        assert len(second) == 2
+
+    def test_retrieve_context_uses_index(self, db_session, monkeypatch):
+        """retrieve_context ranks through the index and re-ranks by prereqs"""
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+
+        service = RAGService(db_session)
+        monkeypatch.setattr(service, "generate_embedding", lambda text: [0.0, 1.0, 0.0])
+
+        results = service.retrieve_context(
+            program_id="rice-bioe-2025",
+            completed_courses=[],
+            query="biomechanics",
+            k=1,
+        )
+        assert len(results) == 1
+        assert results[0]["metadata"]["code"] == "BIOE 310"
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestIndexRegistry:
+    """Test lazily loaded, memory-capped index shards"""
+
+    def _programs(self, db_session, names):
+        for name in names:
+            for i in range(3):
+                add_embedding(db_session, [1.0, float(i), 0.0], f"BIOE {250 + i}", program_id=name)
+
+    def test_evicts_least_recently_used(self, db_session):
+        """Shards above the cap are evicted coldest first and reload on demand"""
+        self._programs(db_session, ["a", "b", "c"])
+        size = IndexRegistry(max_bytes=0).get(db_session, "a").estimate_nbytes()
+        registry = IndexRegistry(max_bytes=int(size * 2.5))
+
+        registry.get(db_session, "a")
+        registry.get(db_session, "b")
+        registry.get(db_session, "a")  # "b" is now the coldest
+        registry.get(db_session, "c")
+
+        assert registry.peek("b") is None
+        assert registry.peek("a") is not None and registry.peek("c") is not None
+        stats = registry.stats()
+        assert (stats["loads"], stats["hits"], stats["evictions"]) == (3, 1, 1)
+        assert stats["shards"] == 2
+        assert stats["resident_bytes"] == 2 * size <= stats["max_bytes"]
+
+        registry.get(db_session, "b")
+        assert registry.stats()["loads"] == 4
+        assert registry.peek("a") is None
+
+    def test_keeps_newest_shard_over_cap(self, db_session):
+        """A shard larger than the cap is still served"""
+        self._programs(db_session, ["a"])
+        registry = IndexRegistry(max_bytes=1)
+
+        assert len(registry.get(db_session, "a")) == 3
+        assert registry.peek("a") is not None
+        assert registry.stats()["evictions"] == 0
+
+
+class KeywordEmbeddings:
+    """Fake embeddings API: one axis per keyword, records each request's inputs"""
+
+    KEYWORDS = ("bio", "mech", "chem")
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests.append(texts)
+        data = [
+            SimpleNamespace(
+                index=i,
+                embedding=[float(keyword in text.lower()) for keyword in self.KEYWORDS],
+            )
+            for i, text in enumerate(texts)
+        ]
+        return SimpleNamespace(data=data)
+
+
+@pytest.mark.rag
+@pytest.mark.unit
+@pytest.mark.usefixtures("small_dimension")
+class TestBatchedRetrieval:
+    """Test retrieve_context_many"""
+
+    def _service(self, db_session):
+        add_embedding(db_session, [1.0, 0.0, 0.0], "BIOE 252")
+        add_embedding(db_session, [0.0, 1.0, 0.0], "BIOE 310")
+        add_embedding(db_session, [0.0, 0.0, 1.0], "CHEM 121")
+        service = RAGService(db_session)
+        embeddings = KeywordEmbeddings()
+        service.client = SimpleNamespace(embeddings=embeddings)
+        return service, embeddings
+
+    def test_one_embedding_call_for_all_queries(self, db_session):
+        """Queries are embedded together and ranked independently"""
+        service, embeddings = self._service(db_session)
+        results = service.retrieve_context_many(
+            "rice-bioe-2025",
+            completed_courses=[[], [], []],
+            queries=["bio intro", "mech design", "chem lab"],
+            k=1,
+        )
+
+        assert embeddings.requests == [["bio intro", "mech design", "chem lab"]]
+        assert [r[0]["metadata"]["code"] for r in results] == ["BIOE 252", "BIOE 310", "CHEM 121"]
+
+    def test_matches_single_query_retrieval(self, db_session):
+        """Batched results equal retrieve_context, with per-student re-ranking"""
+        service, _ = self._service(db_session)
+        completed = [["CHEM 121"], []]
+        queries = ["bio chem", "bio chem"]
+
+        batched = service.retrieve_context_many("rice-bioe-2025", completed, queries, k=3)
+        single = [
+            service.retrieve_context("rice-bioe-2025", c, query=q, k=3)
+            for c, q in zip(completed, queries)
+        ]
+
+        assert batched == single
+        assert batched[0][0]["metadata"]["code"] == "CHEM 121"
+        assert batched[1][0]["metadata"]["code"] != "CHEM 121"
+
+    def test_search_many_matches_search(self):
+        """One matrix product gives the same rankings as per-query search"""
+        rng = np.random.default_rng(3)
+        vectors = normalize_rows(rng.normal(size=(50, 3)).astype(np.float32))
+        ids = np.arange(1, 51, dtype=np.int64)
+        index = ProgramIndex("big-program", ids, vectors, ["course"] * 50, (50, 50))
+        queries = [rng.normal(size=3).tolist() for _ in range(5)] + [[0.0, 0.0, 0.0], [1.0]]
+
+        for batched, single in zip(index.search_many(queries, 4), [index.search(q, 4) for q in queries]):
+            assert [r["id"] for r in batched] == [r["id"] for r in single]
+            assert np.allclose([r["distance"] for r in batched], [r["distance"] for r in single], atol=1e-6)
@@ -32,19 +32,27 @@ export default function CompletedCoursesInput({
       try {
         const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
         const res = await fetch(
-          `${apiUrl}/api/search?program_id=${programId}&q=${encodeURIComponent(input)}&limit=5`
+          `${apiUrl}/api/courses/autocomplete?program_id=${programId}&q=${encodeURIComponent(input)}&limit=5`,
+          { signal: controller.signal }
         )
         if (res.ok) {
           const data = await res.json()
           setSuggestions(data)
         }
       } catch (err) {
-        console.error('Error fetching suggestions:', err)
+        if ((err as Error).name !== 'AbortError') {
+          console.error('Error fetching suggestions:', err)
+        }
       }
     }
 
-    const debounce = setTimeout(fetchSuggestions, 300)
-    return () => clearTimeout(debounce)
+    // Autocomplete is cheap, so only a short debounce; stale requests are aborted
+    const controller = new AbortController()
+    const debounce = setTimeout(fetchSuggestions, 100)
+    return () => {
+      clearTimeout(debounce)
+      controller.abort()
+    }
   }, [input, programId])
 
   const addCourse = (code: string) => {